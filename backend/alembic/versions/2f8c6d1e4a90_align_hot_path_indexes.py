@@ -0,0 +1,45 @@
+"""Align hot path indexes with current queries
+
+Revision ID: 2f8c6d1e4a90
+Revises: 9b4e2f7a1c38
+Create Date: 2026-10-18 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8c6d1e4a90'
+down_revision: Union[str, Sequence[str], None] = '9b4e2f7a1c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Session start ab tables.active_session_id / status se chalta hai; open-session-by-table lookup koi nahi karta
+    op.drop_index('ix_game_sessions_open_by_table', table_name='game_sessions')
+    # Player timeline hamesha timestamp ASC mein padhi jaati hai (IN list ke saath bhi), DESC LIMIT 1 wali query nahi rahi
+    op.drop_index('ix_player_changes_session_id_timestamp', table_name='player_changes')
+    op.create_index('ix_player_changes_session_id_timestamp', 'player_changes', ['session_id', 'timestamp'])
+    # Dashboard rebuild ORDER BY tableName, id: id bhi index mein, toh same naam wale tables ka alag sort nahi
+    op.create_index('ix_tables_cafe_id_tableName_id', 'tables', ['cafe_id', 'tableName', 'id'])
+    op.drop_index('ix_tables_cafe_id_tableName', table_name='tables')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_tables_cafe_id_tableName', 'tables', ['cafe_id', 'tableName'])
+    op.drop_index('ix_tables_cafe_id_tableName_id', table_name='tables')
+    op.drop_index('ix_player_changes_session_id_timestamp', table_name='player_changes')
+    op.create_index(
+        'ix_player_changes_session_id_timestamp', 'player_changes',
+        ['session_id', sa.text('"timestamp" DESC')],
+    )
+    op.create_index(
+        'ix_game_sessions_open_by_table', 'game_sessions', ['table_id'],
+        postgresql_where=sa.text('"endTime" IS NULL'),
+    )
@@ -0,0 +1,60 @@
+"""Add revenue rollups
+
+Revision ID: 3c9e1f6a2b7d
+Revises: 815d73fe4389
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1f6a2b7d'
+down_revision: Union[str, Sequence[str], None] = '815d73fe4389'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('revenue_rollups',
+    sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('cafe_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('staff_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hour', sa.Integer(), nullable=False),
+    sa.Column('paymentMethod', postgresql.ENUM('cash', 'online', name='paymentmethod', create_type=False), nullable=False),
+    sa.Column('tableType', postgresql.ENUM('pool', 'snooker', name='tabletype', create_type=False), nullable=False),
+    sa.Column('totalRevenue', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('paymentCount', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cafe_id'], ['cafes.id']),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id']),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cafe_id', 'staff_id', 'day', 'hour', 'paymentMethod', 'tableType', name='uq_revenue_rollups_bucket')
+    )
+
+    # Purane payments ka backfill, yahin: analytics sirf rollup padhta hai, khaali table = zero revenue.
+    # Buckets rollup.bucket_for jaise settings.ANALYTICS_TIMEZONE mein, Alembic chalane wali machine ke zone mein nahi.
+    local_time = '(p."paymentTimestamp" AT TIME ZONE :zone)'
+    op.execute(sa.text(f"""
+        INSERT INTO revenue_rollups
+            (cafe_id, staff_id, day, hour, "paymentMethod", "tableType", "totalRevenue", "paymentCount")
+        SELECT t.cafe_id, gs.staff_id,
+               CAST({local_time} AS DATE),
+               CAST(EXTRACT(HOUR FROM {local_time}) AS INTEGER),
+               p."paymentMethod", t."tableType", SUM(p."totalAmount"), COUNT(*)
+        FROM payments p
+        JOIN game_sessions gs ON gs.id = p.session_id
+        JOIN tables t ON t.id = gs.table_id
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """).bindparams(zone=settings.ANALYTICS_TIMEZONE))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('revenue_rollups')
@@ -0,0 +1,53 @@
+"""Denormalize live table state
+
+Revision ID: 5e2b8d4f1c6a
+Revises: a41d7c2e9f03
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8d4f1c6a'
+down_revision: Union[str, Sequence[str], None] = 'a41d7c2e9f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('game_sessions', sa.Column('current_players', sa.Integer(), nullable=True))
+    op.add_column('tables', sa.Column('active_session_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_tables_active_session_id', 'tables', 'game_sessions', ['active_session_id'], ['id'],
+        ondelete='SET NULL'
+    )
+
+    # Maujooda data se backfill
+    op.execute("""
+        UPDATE game_sessions SET current_players = (
+            SELECT pc."numberOfPlayers" FROM player_changes pc
+            WHERE pc.session_id = game_sessions.id
+            ORDER BY pc."timestamp" DESC LIMIT 1
+        )
+    """)
+    op.execute("""
+        UPDATE tables SET active_session_id = (
+            SELECT gs.id FROM game_sessions gs
+            WHERE gs.table_id = tables.id AND gs."endTime" IS NULL
+            ORDER BY gs."startTime" DESC LIMIT 1
+        )
+        WHERE tables.status = 'in_use'
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_tables_active_session_id', 'tables', type_='foreignkey')
+    op.drop_column('tables', 'active_session_id')
+    op.drop_column('game_sessions', 'current_players')
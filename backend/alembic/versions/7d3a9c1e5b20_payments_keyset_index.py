@@ -0,0 +1,31 @@
+"""Payments keyset pagination index
+
+Revision ID: 7d3a9c1e5b20
+Revises: 5e2b8d4f1c6a
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3a9c1e5b20'
+down_revision: Union[str, Sequence[str], None] = '5e2b8d4f1c6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (paymentTimestamp, id) wala index timestamp-only index ko cover karta hai
+    op.create_index('ix_payments_paymentTimestamp_id', 'payments', ['paymentTimestamp', 'id'])
+    op.drop_index('ix_payments_paymentTimestamp', table_name='payments')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_payments_paymentTimestamp', 'payments', ['paymentTimestamp'])
+    op.drop_index('ix_payments_paymentTimestamp_id', table_name='payments')
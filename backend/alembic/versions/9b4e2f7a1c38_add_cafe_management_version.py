@@ -0,0 +1,28 @@
+"""Add management_version to cafes
+
+Revision ID: 9b4e2f7a1c38
+Revises: 7d3a9c1e5b20
+Create Date: 2026-10-18 18:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2f7a1c38'
+down_revision: Union[str, Sequence[str], None] = '7d3a9c1e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cafes', sa.Column('management_version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cafes', 'management_version')
@@ -0,0 +1,46 @@
+"""Add hot path indexes
+
+Revision ID: a41d7c2e9f03
+Revises: 3c9e1f6a2b7d
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7c2e9f03'
+down_revision: Union[str, Sequence[str], None] = '3c9e1f6a2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tables_cafe_id_tableName', 'tables', ['cafe_id', 'tableName'])
+    op.create_index(
+        'ix_game_sessions_open_by_table', 'game_sessions', ['table_id'],
+        postgresql_where=sa.text('"endTime" IS NULL'),
+    )
+    op.create_index('ix_game_sessions_staff_id', 'game_sessions', ['staff_id'])
+    op.create_index(
+        'ix_player_changes_session_id_timestamp', 'player_changes',
+        ['session_id', sa.text('"timestamp" DESC')],
+    )
+    op.create_index('ix_payments_paymentTimestamp', 'payments', ['paymentTimestamp'])
+    op.create_index('ix_pricing_cafe_id_tableType', 'pricing', ['cafe_id', 'tableType'])
+    op.create_index('ix_revenue_rollups_staff_id_day', 'revenue_rollups', ['staff_id', 'day'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_revenue_rollups_staff_id_day', table_name='revenue_rollups')
+    op.drop_index('ix_pricing_cafe_id_tableType', table_name='pricing')
+    op.drop_index('ix_payments_paymentTimestamp', table_name='payments')
+    op.drop_index('ix_player_changes_session_id_timestamp', table_name='player_changes')
+    op.drop_index('ix_game_sessions_staff_id', table_name='game_sessions')
+    op.drop_index('ix_game_sessions_open_by_table', table_name='game_sessions')
+    op.drop_index('ix_tables_cafe_id_tableName', table_name='tables')
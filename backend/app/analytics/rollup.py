@@ -0,0 +1,106 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core import local_time
+from app.models import models
+
+BUCKET_COLUMNS = ["cafe_id", "staff_id", "day", "hour", "paymentMethod", "tableType"]
+
+def bucket_for(payment_timestamp: datetime):
+    """
+    Payment kis din aur ghante mein gira, settings.ANALYTICS_TIMEZONE mein
+    (wahi timezone jisme analytics 'today' / 'week' / 'month' define karta hai).
+    """
+    payment_timestamp = local_time.localize(payment_timestamp)
+    return payment_timestamp.date(), payment_timestamp.hour
+
+def _insert(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Revenue rollup upsert is not supported on '{dialect}'")
+
+async def record_payment(db: AsyncSession, payment: models.Payment, session: models.GameSession, table: models.Table):
+    """
+    Adds one payment to its rollup bucket. Caller ke transaction mein hi chalta hai,
+    taaki payment aur rollup ek saath commit ya rollback hon.
+    """
+    day, hour = bucket_for(payment.paymentTimestamp)
+    insert = _insert(db)
+    stmt = insert(models.RevenueRollup).values(
+        cafe_id=table.cafe_id,
+        staff_id=session.staff_id,
+        day=day,
+        hour=hour,
+        paymentMethod=payment.paymentMethod,
+        tableType=table.tableType,
+        totalRevenue=payment.totalAmount,
+        paymentCount=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=BUCKET_COLUMNS,
+        set_={
+            "totalRevenue": models.RevenueRollup.totalRevenue + stmt.excluded.totalRevenue,
+            "paymentCount": models.RevenueRollup.paymentCount + stmt.excluded.paymentCount,
+        },
+    )
+    await db.execute(stmt)
+
+def rebuild(db: Session, cafe_id=None, chunk_size: int = 5000) -> int:
+    """
+    Rebuilds the rollup from the raw payments history (optionally for one cafe).
+    Payments ko chunks mein stream karte hain, memory sirf buckets jitni lagti hai.
+    Returns the number of rollup rows written.
+
+    Safe while payments are being logged: on Postgres the rollup table is locked
+    against writes (SHARE ROW EXCLUSIVE) until the caller commits. A payment that
+    already upserted its bucket is waited for and then read from `payments`; one
+    that hasn't yet blocks on the lock and upserts after the rebuild commits, on
+    top of rows that don't include it. Either way it is counted exactly once.
+    SQLite allows only one writer at a time, which gives the same ordering.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Reads (analytics) chalte rehte hain; sirf record_payment ke upserts rukte hain
+        db.execute(text("LOCK TABLE revenue_rollups IN SHARE ROW EXCLUSIVE MODE"))
+
+    delete_query = db.query(models.RevenueRollup)
+    if cafe_id is not None:
+        delete_query = delete_query.filter(models.RevenueRollup.cafe_id == cafe_id)
+    delete_query.delete(synchronize_session=False)
+
+    payments = db.query(
+        models.Payment.paymentTimestamp,
+        models.Payment.paymentMethod,
+        models.Payment.totalAmount,
+        models.GameSession.staff_id,
+        models.Table.cafe_id,
+        models.Table.tableType,
+    ).join(models.GameSession, models.Payment.session_id == models.GameSession.id).join(
+        models.Table, models.GameSession.table_id == models.Table.id
+    )
+    if cafe_id is not None:
+        payments = payments.filter(models.Table.cafe_id == cafe_id)
+
+    buckets = defaultdict(lambda: [Decimal('0'), 0])
+    for payment_timestamp, payment_method, total_amount, staff_id, table_cafe_id, table_type in payments.yield_per(chunk_size):
+        day, hour = bucket_for(payment_timestamp)
+        bucket = buckets[(table_cafe_id, staff_id, day, hour, payment_method, table_type)]
+        bucket[0] += total_amount
+        bucket[1] += 1
+
+    db.bulk_insert_mappings(models.RevenueRollup, [
+        {
+            **dict(zip(BUCKET_COLUMNS, key)),
+            "totalRevenue": total_revenue,
+            "paymentCount": payment_count,
+        }
+        for key, (total_revenue, payment_count) in buckets.items()
+    ])
+    return len(buckets)
@@ -1,6 +1,6 @@
 import uuid
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.db import get_db
 from app.models import models
 from app.schemas import analytics as analytics_schema
@@ -11,24 +11,36 @@ from app.security.dependencies import get_current_owner, get_current_staff
 router = APIRouter()
 
 @router.get("/owner/{cafe_id}", response_model=analytics_schema.OwnerAnalyticsResponse, summary="Get Owner Analytics Report")
-def get_analytics_for_cafe(
+async def get_analytics_for_cafe(
     cafe_id: str,
     period: str, # Add this to accept the query parameter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_owner: models.Owner = Depends(get_current_owner)
 ):
     """
     Retrieves a full analytics report for a specific cafe owned by the current user.
     """
-    return analytics_controller.get_owner_analytics(db=db, cafe_id=cafe_id, period=period, owner_id=current_owner.id)
+    return await analytics_controller.get_owner_analytics(db=db, cafe_id=cafe_id, period=period, owner_id=current_owner.id)
+
+@router.post("/owner/simulate-pricing", response_model=analytics_schema.PricingSimulationResponse, summary="Simulate Pricing on Past Sessions")
+async def simulate_pricing_for_owner(
+    simulation: analytics_schema.PricingSimulationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_owner: models.Owner = Depends(get_current_owner)
+):
+    """
+    Replays completed sessions in a date range under candidate pricing / strategy and
+    returns projected revenue deltas per table type and hour.
+    """
+    return await analytics_controller.simulate_pricing(db=db, simulation=simulation, owner_id=current_owner.id)
 
 @router.get("/staff/today", response_model=analytics_schema.StaffDailyAnalyticsResponse, summary="Get Staff's Daily Analytics")
-def get_daily_analytics_for_staff(
-    db: Session = Depends(get_db),
+async def get_daily_analytics_for_staff(
+    db: AsyncSession = Depends(get_db),
     current_staff: models.Staff = Depends(get_current_staff)
 ):
     """
     Retrieves a simplified analytics report for the current staff member's cafe for today.
     """
-    return analytics_controller.get_staff_daily_analytics(db=db, staff=current_staff)
+    return await analytics_controller.get_staff_daily_analytics(db=db, staff=current_staff)
 
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List
 
+from app.core.fast_json import FastJSONResponse
 from app.db.db import get_db
 from app.schemas import payment as payment_schema
 from app.controllers.bill import payment_controller
@@ -11,23 +12,36 @@ from app.models import models
 router = APIRouter()
 
 @router.post("/", response_model=payment_schema.Payment)
-def log_payment(
+async def log_payment(
     payment: payment_schema.PaymentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_staff: models.Staff = Depends(get_current_staff)
 ):
     """
     Logs a new payment for a completed session.
     """
-    return payment_controller.log_new_payment(db=db, payment_data=payment, staff=current_staff)
+    return await payment_controller.log_new_payment(db=db, payment_data=payment, staff=current_staff)
 
 @router.get("/", response_model=List[payment_schema.Payment])
-def get_payments(
-    db: Session = Depends(get_db),
+async def get_payments(
+    db: AsyncSession = Depends(get_db),
     current_staff: models.Staff = Depends(get_current_staff)
 ):
     """
     Retrieves the payment history for the current staff member for today.
     """
-    return payment_controller.get_payments_for_staff_today(db=db, staff=current_staff)
+    payments = await payment_controller.get_payments_for_staff_today(db=db, staff=current_staff)
+    return FastJSONResponse([payment_controller.payment_payload(payment) for payment in payments])
 
+@router.get("/history", response_model=payment_schema.PaymentHistoryPage)
+async def get_payment_history(
+    filters: Annotated[payment_schema.PaymentHistoryFilters, Query()],
+    db: AsyncSession = Depends(get_db),
+    current_staff: models.Staff = Depends(get_current_staff)
+):
+    """
+    Paginated payment history of the current staff member, newest first.
+    Pass the previous page's `next_cursor` as `cursor` to get the next page.
+    """
+    page = await payment_controller.get_payment_history_for_staff(db=db, staff=current_staff, filters=filters)
+    return FastJSONResponse(payment_controller.history_page_payload(page))
@@ -0,0 +1,47 @@
+import uuid
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import local_time
+from app.db.db import get_db
+from app.controllers.owner import export_controller
+from app.security.dependencies import get_current_owner
+from app.models import models
+
+router = APIRouter()
+
+@router.get("/payments", summary="Export Payments with Sessions, Tables and Staff")
+async def export_payments(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    cafe_id: Optional[uuid.UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_owner: models.Owner = Depends(get_current_owner)
+):
+    """
+    Streams every payment (joined with its session, table, staff and cafe) for the owner's
+    cafes, or just `cafe_id`, as CSV or Parquet. Rows are read in chunks, so the export
+    starts immediately and memory stays flat regardless of the date range.
+    """
+    if start_date and end_date and end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    cafe_ids = await export_controller.resolve_export_cafes(db=db, owner_id=current_owner.id, cafe_id=cafe_id)
+
+    if format == "parquet":
+        if not export_controller.parquet_available():
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export needs pyarrow installed on the server")
+        body = export_controller.stream_payments_parquet(cafe_ids, start_date, end_date)
+        media_type = "application/vnd.apache.parquet"
+    else:
+        body = export_controller.stream_payments_csv(cafe_ids, start_date, end_date)
+        media_type = "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="payments-{local_time.today().isoformat()}.{format}"'},
+    )
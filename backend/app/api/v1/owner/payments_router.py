@@ -0,0 +1,28 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.fast_json import FastJSONResponse
+from app.db.db import get_db
+from app.schemas import payment as payment_schema
+from app.controllers.bill import payment_controller
+from app.security.dependencies import get_current_owner
+from app.models import models
+
+router = APIRouter()
+
+@router.get("/", response_model=payment_schema.PaymentHistoryPage)
+async def get_payment_history(
+    filters: Annotated[payment_schema.OwnerPaymentHistoryFilters, Query()],
+    db: AsyncSession = Depends(get_db),
+    current_owner: models.Owner = Depends(get_current_owner)
+):
+    """
+    Paginated payment history across the owner's cafes (or just `cafe_id`), newest first,
+    filterable by date range, table, payment method and staff.
+    Pass the previous page's `next_cursor` as `cursor` to get the next page.
+    """
+    page = await payment_controller.get_payment_history_for_owner(
+        db=db, owner_id=current_owner.id, cafe_id=filters.cafe_id, filters=filters
+    )
+    return FastJSONResponse(payment_controller.history_page_payload(page))
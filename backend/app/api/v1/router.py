@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from app.api.v1.auth import auth_router
-from app.api.v1.owner import cafe_router, management_router
+from app.api.v1.owner import cafe_router, management_router, export_router, payments_router
 from app.api.v1.staff import staff_router
 from app.api.v1.gameSession import game_session_router
 from app.api.v1.bill import payment_router
@@ -20,6 +20,8 @@ api_router.include_router(auth_router.router, prefix="/auth", tags=["Authenticat
 api_router.include_router(cafe_router.router, prefix="/owner/cafes", tags=["Owner: Cafe Management"])
 api_router.include_router(staff_router.router, prefix="/owner/staff", tags=["Owner: Staff Management"])
 api_router.include_router(management_router.router, prefix="/owner/management", tags=["Owner: Table & Price Management"])
+api_router.include_router(export_router.router, prefix="/owner/exports", tags=["Owner: Data Export"])
+api_router.include_router(payments_router.router, prefix="/owner/payments", tags=["Owner: Payment History"])
 
 # --- Staff Routes ---
 api_router.include_router(staffDashboardRouter, prefix="/staff", tags=["Staff:Dashboard"])
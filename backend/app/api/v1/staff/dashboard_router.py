@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etags import etag_matches
+from app.core.fast_json import FastJSONResponse
 from app.db.db import get_db
 from app.schemas import dashboard as dashboard_schema
 from app.controllers.staff import dashboard_controller
@@ -9,9 +12,48 @@ from app.models import models
 
 router = APIRouter()
 
-@router.get("/dashboard", response_model=dashboard_schema.StaffDashboardResponse)
-def get_dashboard(
-    db: Session = Depends(get_db), 
+@router.get(
+    "/dashboard", response_model=dashboard_schema.StaffDashboardResponse,
+    responses={304: {"description": "Cafe state unchanged since the ETag sent in If-None-Match"}},
+)
+async def get_dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_db), 
     current_staff: models.Staff = Depends(get_current_staff)
 ):
-    return dashboard_controller.get_staff_dashboard_data(db=db, staff=current_staff)
+    """
+    Live table grid. Send the last ETag as If-None-Match: an unchanged cafe gets a 304
+    without touching the database.
+    """
+    etag, body = await dashboard_controller.render_staff_dashboard(db=db, staff=current_staff)
+    headers = {"Cache-Control": "private, no-cache"}
+    if etag:
+        headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(body, headers=headers)
+
+@router.get("/dashboard/quotes", response_model=dashboard_schema.ActiveTableQuotes)
+async def get_active_table_quotes(
+    db: AsyncSession = Depends(get_db),
+    current_staff: models.Staff = Depends(get_current_staff)
+):
+    """
+    What every in-use table would pay if its session ended now. Nothing is written.
+    """
+    return await dashboard_controller.get_active_table_quotes(db=db, staff=current_staff)
+
+@router.get("/dashboard/stream")
+async def stream_dashboard(
+    request: Request,
+    current_staff: models.Staff = Depends(get_current_staff)
+):
+    """
+    Streams per-table dashboard deltas (Server-Sent Events) as sessions start, end or change player count.
+    """
+    cafe_id = dashboard_controller.get_dashboard_cafe_id(current_staff)
+    return StreamingResponse(
+        dashboard_controller.stream_dashboard_updates(request, cafe_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
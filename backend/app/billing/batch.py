@@ -0,0 +1,143 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+from app.models import models
+
+# Strategy codes for the `strategy` array
+STRATEGY_CODES = {
+    models.BillingStrategy.pro_rata: 0,
+    models.BillingStrategy.per_minute: 1,
+    models.BillingStrategy.fixed_hour: 2,
+}
+
+BASE_PLAYERS_ALLOWED = 2  # strategies._calculate_extra_player_cost jaisa hi
+
+
+def to_paise(amount) -> int:
+    """Decimal / str / None rupees ko integer paise mein (ROUND_HALF_UP), None = 0."""
+    if amount is None:
+        return 0
+    return int((Decimal(amount) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_paise(paise) -> Decimal:
+    return Decimal(int(paise)).scaleb(-2)
+
+
+def strategy_codes(strategies) -> np.ndarray:
+    """BillingStrategy values (ya ek hi strategy) ko int codes ke array mein badlein."""
+    if isinstance(strategies, models.BillingStrategy):
+        return np.array([STRATEGY_CODES[strategies]], dtype=np.int8)
+    return np.array([STRATEGY_CODES[models.BillingStrategy(s)] for s in strategies], dtype=np.int8)
+
+
+def _per_minute_paise(minutes, hour_price):
+    # round_half_up(minutes * hour_price / 60) bina floats ke; aadhe paise ke ties _reproduce_decimal_ties mein
+    return (2 * minutes * hour_price + 60) // 120
+
+
+def _reproduce_decimal_ties(extra_minutes, hour, base_charge, extra_player_cost, overtime_charge, time_based_cost, total_amount_due):
+    """
+    strategies.py minutes * (hourPrice / 60) karta hai, rate 28 digits par round hone ke baad. Jahan
+    exact result theek aadha paisa hai, woh tie ke thoda neeche ya upar aata hai (aur base / extra
+    player cost jodne par phir round hota hai), toh round_half_up se alag ho sakta hai. Sirf aise rows
+    par wahi Decimal arithmetic chalate hain, (minutes, prices) ke hisaab se memoized; arrays in place
+    update hote hain.
+    """
+    memo = {}
+    for i in np.flatnonzero(extra_minutes * hour % 60 == 30):
+        key = (int(extra_minutes[i]), int(hour[i]), int(base_charge[i]), int(extra_player_cost[i]))
+        if key not in memo:
+            minutes, hour_paise, base, extra = key
+            overtime = minutes * (from_paise(hour_paise) / Decimal('60'))
+            time_based = from_paise(base) + overtime
+            memo[key] = (to_paise(overtime), to_paise(time_based), to_paise(time_based + from_paise(extra)))
+        overtime_charge[i], time_based_cost[i], total_amount_due[i] = memo[key]
+
+
+def _timed_extra_player_paise(extra_player_us, session_us, extra_price, untimed_cost):
+    """round_half_up(price * extra_player_us / session_us), jahan timeline hai; baaki rows untimed_cost."""
+    extra_us, session, price, untimed = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.int64) for a in (extra_player_us, session_us, extra_price, untimed_cost))
+    )
+    timed = session > 0
+    # 2 * price * extra_us int64 mein na samaye (bahut lambe sessions) toh Python ints par
+    bound = 2 * int(price.max(initial=0)) * int(extra_us.max(initial=0)) + int(session.max(initial=0))
+    dtype = np.int64 if bound < np.iinfo(np.int64).max else object
+    extra_us, session, price = extra_us.astype(dtype), session.astype(dtype), price.astype(dtype)
+    timed_cost = (2 * price * extra_us + session) // (2 * np.maximum(session, 1))
+    return np.where(timed, timed_cost, untimed).astype(np.int64)
+
+
+def calculate_bills(
+    duration_minutes,
+    final_player_count,
+    hour_price_paise,
+    half_hour_price_paise,
+    extra_player_price_paise,
+    strategy,
+    extra_player_us=None,
+    session_us=None,
+) -> dict:
+    """
+    Prices many sessions in one vectorized pass, in integer paise.
+
+    Every argument is an array (or a scalar, broadcast to the batch). `strategy`
+    holds STRATEGY_CODES values, so one batch can mix cafes with different billing
+    strategies. `extra_player_us` / `session_us` are the player_timeline.ExtraPlayerTime
+    fields per session; rows with session_us > 0 bill extra players by time present,
+    the rest (no timeline) by `final_player_count`. Each returned array equals
+    `to_paise(...)` of the matching field from the scalar functions in strategies.py,
+    for every row.
+    """
+    minutes, players, hour, half_hour, extra_price, code = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.int64) for a in (
+            duration_minutes, final_player_count, hour_price_paise,
+            half_hour_price_paise, extra_player_price_paise, strategy,
+        ))
+    )
+    is_pro_rata = code == STRATEGY_CODES[models.BillingStrategy.pro_rata]
+    is_per_minute = code == STRATEGY_CODES[models.BillingStrategy.per_minute]
+    is_fixed_hour = code == STRATEGY_CODES[models.BillingStrategy.fixed_hour]
+    if not np.all(is_pro_rata | is_per_minute | is_fixed_hour):
+        raise ValueError("Unknown billing strategy code in batch")
+
+    # Pro-rata: pehle 30 min ka half-hour price, uske baad per-minute
+    pro_rata_extra_minutes = np.where(minutes > 30, minutes - 30, 0)
+    pro_rata_overtime = np.where(minutes > 30, _per_minute_paise(pro_rata_extra_minutes, hour), 0)
+
+    # Per-minute: shuru se hi per-minute
+    per_minute_cost = _per_minute_paise(minutes, hour)
+
+    # Fixed-hour: 30 min tak half-hour price, warna agle ghante tak round-up (kam se kam 1 ghanta)
+    hours_played = np.maximum(-(-minutes // 60), 1)
+    fixed_hour_cost = np.where(minutes <= 30, half_hour, hours_played * hour)
+
+    base_charge = np.select([is_pro_rata, is_per_minute], [half_hour, 0], default=fixed_hour_cost)
+    overtime_charge = np.select([is_pro_rata, is_per_minute], [pro_rata_overtime, per_minute_cost], default=0)
+    extra_minutes_played = np.select([is_pro_rata, is_per_minute], [pro_rata_extra_minutes, minutes], default=0)
+    time_based_cost = np.select(
+        [is_pro_rata, is_per_minute], [half_hour + pro_rata_overtime, per_minute_cost], default=fixed_hour_cost
+    )
+
+    extra_player_cost = np.maximum(players - BASE_PLAYERS_ALLOWED, 0) * extra_price
+    if extra_player_us is not None:
+        extra_player_cost = _timed_extra_player_paise(extra_player_us, session_us, extra_price, extra_player_cost)
+    total_amount_due = time_based_cost + extra_player_cost
+    # Fixed-hour rows ke extra_minutes_played 0 hain, toh woh kabhi tie nahi
+    _reproduce_decimal_ties(
+        extra_minutes_played, hour, base_charge, extra_player_cost, overtime_charge, time_based_cost, total_amount_due
+    )
+
+    return {
+        "total_minutes_played": minutes,
+        "base_charge": base_charge,
+        "extra_minutes_played": extra_minutes_played,
+        "per_minute_rate": (2 * hour + 60) // 120,
+        "overtime_charge": overtime_charge,
+        "time_based_cost": time_based_cost,
+        "final_player_count": players,
+        "extra_player_cost": extra_player_cost,
+        "total_amount_due": total_amount_due,
+    }
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+BASE_PLAYERS_ALLOWED = 2  # strategies._calculate_extra_player_cost jaisa hi
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class ExtraPlayerTime:
+    """
+    Extra players integrated over a session: `extra_player_us` is the sum of
+    (players above the base) x (microseconds they were at the table), `session_us`
+    the session length. Their ratio is the time-weighted average of extra players.
+    """
+
+    def __init__(self, extra_player_us: int, session_us: int):
+        self.extra_player_us = extra_player_us
+        self.session_us = session_us
+
+    @property
+    def average_extra_players(self) -> Decimal:
+        return Decimal(self.extra_player_us) / Decimal(self.session_us)
+
+    def cost(self, extra_player_price: Decimal) -> Decimal:
+        # Pehle multiply, phir divide: exact paise ties waise hi rehte hain
+        return Decimal(extra_player_price) * Decimal(self.extra_player_us) / Decimal(self.session_us)
+
+
+def integrate_extra_players(changes, start_time: datetime, end_time: datetime, base_players: int = BASE_PLAYERS_ALLOWED):
+    """
+    One pass over a session's (timestamp, numberOfPlayers) changes, ordered by
+    timestamp. The first change's count applies from the session start; changes
+    outside [start_time, end_time] are clamped to it. Returns None when there is
+    nothing to integrate (no changes or a zero-length session).
+    """
+    session_us = (end_time - start_time) // _MICROSECOND
+    if session_us <= 0 or not changes:
+        return None
+
+    extra_player_us = 0
+    cursor = start_time
+    current_players = changes[0][1]
+    for timestamp, players in changes:
+        timestamp = min(max(timestamp, start_time), end_time)
+        if timestamp > cursor:
+            extra_player_us += max(current_players - base_players, 0) * ((timestamp - cursor) // _MICROSECOND)
+            cursor = timestamp
+        current_players = players
+    extra_player_us += max(current_players - base_players, 0) * ((end_time - cursor) // _MICROSECOND)
+    return ExtraPlayerTime(extra_player_us, session_us)
+
+
+def running_extra_players(extra_player_us: int, players_since: datetime, players: int, start_time: datetime,
+                          now: datetime, base_players: int = BASE_PLAYERS_ALLOWED):
+    """
+    Extra players of a session that is still running: `extra_player_us` integrated
+    up to `players_since`, plus the current `players` from then until `now`.
+    Live dashboard quote ke liye, bina player timeline dobara padhe.
+    """
+    session_us = (now - start_time) // _MICROSECOND
+    if session_us <= 0:
+        return None
+    since = min(max(players_since, start_time), now)
+    extra_player_us += max(players - base_players, 0) * ((now - since) // _MICROSECOND)
+    return ExtraPlayerTime(extra_player_us, session_us)
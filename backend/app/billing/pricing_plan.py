@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from app.billing import strategies
+from app.billing.batch import to_paise, STRATEGY_CODES
+from app.models import models
+
+
+@dataclass(frozen=True)
+class PricingPlan:
+    """
+    A cafe's rate card for one table type, compiled once: prices converted to
+    Decimal (and paise for the batch engine), per-minute rate precomputed and the
+    cafe's billing strategy already resolved to its function.
+
+    It duck-types as a Pricing row, so the strategy functions take it directly.
+    """
+    cafe_id: str
+    tableType: models.TableType
+    billingStrategy: models.BillingStrategy
+    hourPrice: Decimal
+    halfHourPrice: Decimal
+    extraPlayerPrice: Decimal
+    per_minute_rate: Decimal
+    hour_price_paise: int
+    half_hour_price_paise: int
+    extra_player_price_paise: int
+    strategy_code: int
+    calculate: object
+
+    def bill(self, duration_minutes: int, final_player_count: int, extra_player_time=None) -> dict:
+        """Strategy ka bill plus average_extra_players; session end aur live quote dono yahi use karte hain."""
+        bill = self.calculate(duration_minutes, self, final_player_count, extra_player_time)
+        bill["average_extra_players"] = (
+            extra_player_time.average_extra_players.quantize(Decimal('0.01')) if extra_player_time else None
+        )
+        return bill
+
+
+def compile_plan(cafe_id, billing_strategy: models.BillingStrategy, pricing_rule: models.Pricing) -> PricingPlan:
+    # Unregistered strategy par calculate None rehta hai; controller isko 500 mein badalta hai
+    calculate = strategies.get_strategy(billing_strategy)
+    hour_price = Decimal(pricing_rule.hourPrice)
+    half_hour_price = Decimal(pricing_rule.halfHourPrice)
+    extra_player_price = Decimal(pricing_rule.extraPlayerPrice or '0.0')
+    return PricingPlan(
+        cafe_id=str(cafe_id),
+        tableType=pricing_rule.tableType,
+        billingStrategy=billing_strategy,
+        hourPrice=hour_price,
+        halfHourPrice=half_hour_price,
+        extraPlayerPrice=extra_player_price,
+        per_minute_rate=hour_price / Decimal('60'),
+        hour_price_paise=to_paise(hour_price),
+        half_hour_price_paise=to_paise(half_hour_price),
+        extra_player_price_paise=to_paise(extra_player_price),
+        strategy_code=STRATEGY_CODES.get(billing_strategy, -1),
+        calculate=calculate,
+    )
@@ -1,11 +1,40 @@
 import math
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from app.models import models
 
-def _calculate_extra_player_cost(pricing_rule: models.Pricing, final_player_count: int) -> Decimal:
+# BillingStrategy -> bill function(duration_minutes, pricing_rule, final_player_count, extra_player_time=None) -> dict
+STRATEGY_REGISTRY = {}
+
+def register_strategy(strategy: models.BillingStrategy):
+    """
+    Decorator jo bill function ko ek BillingStrategy ke liye register karta hai.
+    Naya strategy = enum value + registered function, controller badalne ki zaroorat nahi.
+    """
+    def decorator(func):
+        STRATEGY_REGISTRY[strategy] = func
+        return func
+    return decorator
+
+def get_strategy(strategy: models.BillingStrategy):
+    return STRATEGY_REGISTRY.get(strategy)
+
+def _per_minute_rate(pricing_rule) -> Decimal:
+    # Compiled PricingPlan mein rate pehle se calculate hota hai
+    rate = getattr(pricing_rule, "per_minute_rate", None)
+    if rate is not None:
+        return rate
+    return Decimal(pricing_rule.hourPrice) / Decimal('60')
+
+def _calculate_extra_player_cost(pricing_rule: models.Pricing, final_player_count: int, extra_player_time=None) -> Decimal:
     """
     Ek helper function jo sirf extra player ka charge calculate karta hai.
+    extra_player_time (player_timeline.ExtraPlayerTime) mile toh extra players sirf
+    utne hi time ke liye charge hote hain jitni der woh table par the.
     """
+    if extra_player_time is not None:
+        extra_player_price = Decimal(pricing_rule.extraPlayerPrice or '0.0')
+        return extra_player_time.cost(extra_player_price).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
     extra_player_cost = Decimal('0.0')
     base_players_allowed = 2  # Hum 2 players ko base maante hain
     if final_player_count > base_players_allowed:
@@ -14,14 +43,15 @@ def _calculate_extra_player_cost(pricing_rule: models.Pricing, final_player_coun
         extra_player_cost = extra_players * extra_player_price
     return extra_player_cost
 
-def calculate_pro_rata_bill(duration_minutes: int, pricing_rule: models.Pricing, final_player_count: int) -> dict:
+@register_strategy(models.BillingStrategy.pro_rata)
+def calculate_pro_rata_bill(duration_minutes: int, pricing_rule: models.Pricing, final_player_count: int, extra_player_time=None) -> dict:
     """
     Strategy 1: Pro-Rata Billing.
     Pehle 30 min ka fixed charge, uske baad per-minute.
     """
     base_charge = Decimal('0.0')
     extra_minutes_played = 0
-    per_minute_rate = Decimal(pricing_rule.hourPrice) / Decimal('60')
+    per_minute_rate = _per_minute_rate(pricing_rule)
     overtime_charge = Decimal('0.0')
 
     if duration_minutes <= 30:
@@ -32,7 +62,7 @@ def calculate_pro_rata_bill(duration_minutes: int, pricing_rule: models.Pricing,
         overtime_charge = extra_minutes_played * per_minute_rate
 
     time_based_cost = base_charge + overtime_charge
-    extra_player_cost = _calculate_extra_player_cost(pricing_rule, final_player_count)
+    extra_player_cost = _calculate_extra_player_cost(pricing_rule, final_player_count, extra_player_time)
     total_amount_due = time_based_cost + extra_player_cost
 
     return {
@@ -47,14 +77,15 @@ def calculate_pro_rata_bill(duration_minutes: int, pricing_rule: models.Pricing,
         "total_amount_due": total_amount_due,
     }
 
-def calculate_per_minute_bill(duration_minutes: int, pricing_rule: models.Pricing, final_player_count: int) -> dict:
+@register_strategy(models.BillingStrategy.per_minute)
+def calculate_per_minute_bill(duration_minutes: int, pricing_rule: models.Pricing, final_player_count: int, extra_player_time=None) -> dict:
     """
     Strategy 2: Per-Minute Billing.
     Shuru se hi per-minute charge.
     """
-    per_minute_rate = Decimal(pricing_rule.hourPrice) / Decimal('60')
+    per_minute_rate = _per_minute_rate(pricing_rule)
     time_based_cost = duration_minutes * per_minute_rate
-    extra_player_cost = _calculate_extra_player_cost(pricing_rule, final_player_count)
+    extra_player_cost = _calculate_extra_player_cost(pricing_rule, final_player_count, extra_player_time)
     total_amount_due = time_based_cost + extra_player_cost
 
     return {
@@ -69,7 +100,8 @@ def calculate_per_minute_bill(duration_minutes: int, pricing_rule: models.Pricin
         "total_amount_due": total_amount_due,
     }
 
-def calculate_fixed_hour_bill(duration_minutes: int, pricing_rule: models.Pricing, final_player_count: int) -> dict:
+@register_strategy(models.BillingStrategy.fixed_hour)
+def calculate_fixed_hour_bill(duration_minutes: int, pricing_rule: models.Pricing, final_player_count: int, extra_player_time=None) -> dict:
     """
     Strategy 3: Fixed-Hour Billing (Purana System).
     Agle ghante pe round-up karna.
@@ -83,14 +115,14 @@ def calculate_fixed_hour_bill(duration_minutes: int, pricing_rule: models.Pricin
             hours_played = 1
         time_based_cost = hours_played * Decimal(pricing_rule.hourPrice)
 
-    extra_player_cost = _calculate_extra_player_cost(pricing_rule, final_player_count)
+    extra_player_cost = _calculate_extra_player_cost(pricing_rule, final_player_count, extra_player_time)
     total_amount_due = time_based_cost + extra_player_cost
 
     return {
         "total_minutes_played": duration_minutes,
         "base_charge": time_based_cost, # Is model mein base charge hi poora time cost hai
         "extra_minutes_played": 0,
-        "per_minute_rate": Decimal(pricing_rule.hourPrice) / Decimal('60'),
+        "per_minute_rate": _per_minute_rate(pricing_rule),
         "overtime_charge": Decimal('0.0'),
         "time_based_cost": time_based_cost,
         "final_player_count": final_player_count,
@@ -0,0 +1,92 @@
+import time
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from app.core.config import settings
+
+# reserve() ke results
+NEW = "new"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+REPLAY = "replay"
+
+
+class IdempotencyStore:
+    """
+    Remembers the response to each (caller, endpoint, Idempotency-Key) so a
+    retried start / end / payment gets the original response back instead of
+    being processed twice.
+
+    A key is reserved while its first request runs; a duplicate arriving in that
+    window is told to retry later. Only successful responses are stored - a
+    failed request releases the key so the client can retry it. The size limit
+    evicts the oldest completed entries only; a reservation stays until its
+    request finishes.
+
+    Note: har worker process ka apna store hai. A retry that lands on another
+    worker is processed again, which the row-level claims in the session and
+    payment controllers turn into a clean 4xx instead of a duplicate.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        # Sabse purani entries aage hain; expired wali hata do
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry["created_at"] <= self.ttl_seconds:
+                break
+            del self._entries[key]
+
+    def _evict(self):
+        # Sabse purani completed entries pehle. In-progress reservation hat jaaye toh uska
+        # duplicate NEW ban kar dobara process ho jaata, isliye woh kabhi evict nahi hoti
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        completed = (key for key, entry in self._entries.items() if entry["response"] is not None)
+        for key in list(islice(completed, excess)):
+            del self._entries[key]
+
+    def reserve(self, key: tuple, fingerprint: str):
+        """Returns (state, stored_response); stored_response is set only for REPLAY."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {"fingerprint": fingerprint, "response": None, "created_at": now}
+                self._evict()
+                return NEW, None
+            if entry["fingerprint"] != fingerprint:
+                return MISMATCH, None
+            if entry["response"] is None:
+                return IN_PROGRESS, None
+            return REPLAY, entry["response"]
+
+    def complete(self, key: tuple, response: dict):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["response"] = response
+
+    def release(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["response"] is None:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_MAX_KEYS,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+)
@@ -0,0 +1,220 @@
+import copy
+import itertools
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.billing.player_timeline import BASE_PLAYERS_ALLOWED
+from app.models import models
+from app.realtime.broker import dashboard_broker
+
+
+_MICROSECOND = timedelta(microseconds=1)
+
+# Har state change par naya version; dashboard ETag isi se banta hai
+_versions = itertools.count(1)
+
+
+class LiveStateCache:
+    """
+    Per-cafe, in-process cache of what the staff dashboard shows: table status,
+    active session id, start time and current players, plus the cafe's rate card.
+
+    Session controllers write through to it after every commit, so dashboard reads
+    never go to the database once a cafe is warm. Memory is bounded by evicting the
+    least recently used cafe; a missing (or expired) entry is simply rebuilt from
+    the DB by the dashboard controller, which also covers a process restart.
+
+    Note: har worker process ka apna cache hota hai. With multiple workers a write
+    only reaches the worker that served it, so entries also expire after
+    LIVE_STATE_TTL_SECONDS to bound staleness.
+
+    Every write-through bumps a per-cafe write generation, cached or not. A
+    rebuild reads it before loading and passes it to put(); if a write landed
+    in between (and found nothing to update), the snapshot may predate it and
+    is not stored.
+    """
+
+    def __init__(self, max_cafes: int, ttl_seconds: int):
+        self.max_cafes = max_cafes
+        self.ttl_seconds = ttl_seconds
+        self._cafes = OrderedDict()
+        # cafe -> write generation; entry evict hone par bhi rehta hai (ek int per cafe)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _bump_generation(self, key: str):
+        # Lock ke andar hi call karein
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def write_generation(self, cafe_id) -> int:
+        """Rebuild shuru karne se pehle padhein, phir put() ko dein."""
+        with self._lock:
+            return self._generations.get(str(cafe_id), 0)
+
+    def _fresh_entry(self, key: str):
+        # Lock ke andar hi call karein
+        entry = self._cafes.get(key)
+        if entry is None:
+            return None
+        if self.ttl_seconds and time.monotonic() - entry["loaded_at"] > self.ttl_seconds:
+            del self._cafes[key]
+            return None
+        self._cafes.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def _touch(entry):
+        # State badli: naya version, purana rendered payload bekaar
+        entry["version"] = next(_versions)
+        entry["rendered"] = None
+
+    def get(self, cafe_id):
+        """Returns a copy of the cafe's state, or None if it must be rebuilt."""
+        return self.get_versioned(cafe_id)[0]
+
+    def get_versioned(self, cafe_id):
+        """(copy of the state, its version), or (None, None) if it must be rebuilt."""
+        with self._lock:
+            entry = self._fresh_entry(str(cafe_id))
+            if entry is None:
+                return None, None
+            return copy.deepcopy(entry["state"]), entry["version"]
+
+    def version(self, cafe_id):
+        with self._lock:
+            entry = self._fresh_entry(str(cafe_id))
+            return entry["version"] if entry else None
+
+    def put(self, cafe_id, state: dict, generation: int = None):
+        """
+        Stores a freshly loaded state and returns its version. With `generation`
+        (write_generation() from before the load) returns None without storing
+        if the cafe was written to meanwhile.
+        """
+        key = str(cafe_id)
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                return None
+            entry = {"state": copy.deepcopy(state), "loaded_at": time.monotonic()}
+            self._touch(entry)
+            self._cafes[key] = entry
+            self._cafes.move_to_end(key)
+            while len(self._cafes) > self.max_cafes:
+                self._cafes.popitem(last=False)
+            return entry["version"]
+
+    def get_rendered(self, cafe_id, version: int, bucket: int):
+        """Serialized dashboard jo isi version aur time bucket ke liye bana tha, warna None."""
+        with self._lock:
+            entry = self._fresh_entry(str(cafe_id))
+            if entry is None or entry["version"] != version:
+                return None
+            rendered = entry["rendered"]
+            return rendered if rendered is not None and rendered["bucket"] == bucket else None
+
+    def put_rendered(self, cafe_id, version: int, bucket: int, etag: str, body: bytes):
+        with self._lock:
+            entry = self._cafes.get(str(cafe_id))
+            # Beech mein state badal gayi ho toh purana render save nahi karna
+            if entry is not None and entry["version"] == version:
+                entry["rendered"] = {"bucket": bucket, "etag": etag, "body": body}
+
+    def update_table(self, cafe_id, table_id, **fields):
+        """
+        Write-through update for a single table. Agar cafe cache mein nahi hai toh
+        kuch nahi karna, agla dashboard read usse DB se bana lega.
+        """
+        with self._lock:
+            self._bump_generation(str(cafe_id))
+            entry = self._cafes.get(str(cafe_id))
+            if entry is None:
+                return
+            table_state = entry["state"]["tables"].get(str(table_id))
+            if table_state is None:
+                # Naya table jo cache mein nahi hai: poora cafe dobara load hoga
+                del self._cafes[str(cafe_id)]
+                return
+            table_state.update(fields)
+            self._touch(entry)
+
+    def record_player_change(self, cafe_id, table_id, players: int, at: datetime):
+        """
+        Player count badla: pichhle count ka extra-player time `extra_player_us` mein
+        jod kar naya count `at` se chalu. Live quote isi se bina DB ke banta hai.
+        """
+        with self._lock:
+            self._bump_generation(str(cafe_id))
+            entry = self._cafes.get(str(cafe_id))
+            if entry is None:
+                return
+            table_state = entry["state"]["tables"].get(str(table_id))
+            if table_state is None:
+                del self._cafes[str(cafe_id)]
+                return
+            since = table_state.get("players_since")
+            if since is not None and at > since:
+                extra_players = max((table_state["current_players"] or 0) - BASE_PLAYERS_ALLOWED, 0)
+                table_state["extra_player_us"] += extra_players * ((at - since) // _MICROSECOND)
+                table_state["players_since"] = at
+            table_state["current_players"] = players
+            self._touch(entry)
+
+    def invalidate(self, cafe_id):
+        with self._lock:
+            self._bump_generation(str(cafe_id))
+            self._cafes.pop(str(cafe_id), None)
+
+    def clear(self):
+        with self._lock:
+            for key in self._generations:
+                self._bump_generation(key)
+            self._cafes.clear()
+
+
+table_state_cache = LiveStateCache(
+    max_cafes=settings.LIVE_STATE_MAX_CAFES,
+    ttl_seconds=settings.LIVE_STATE_TTL_SECONDS,
+)
+
+
+def _apply_table_change(cafe_id, table_id, **fields):
+    """Cache ko update karein aur cafe ke live subscribers ko delta bhejein."""
+    table_state_cache.update_table(cafe_id, table_id, **fields)
+    dashboard_broker.publish(cafe_id, "table", {"id": table_id, **fields})
+
+
+def invalidate_cafe(cafe_id):
+    """Tables/pricing badalne par: cache hatao aur clients ko poora grid refetch karne bolo."""
+    table_state_cache.invalidate(cafe_id)
+    dashboard_broker.publish(cafe_id, "resync", {})
+
+
+def mark_session_started(cafe_id, table_id, session_id, start_time, players: int):
+    _apply_table_change(
+        cafe_id, table_id,
+        status=models.TableStatus.in_use.value,
+        current_session_id=session_id,
+        startTime=start_time,
+        current_players=players,
+    )
+    # Quote ke liye player timeline (clients ko nahi bhejte)
+    table_state_cache.update_table(cafe_id, table_id, extra_player_us=0, players_since=start_time)
+
+
+def mark_players_changed(cafe_id, table_id, players: int):
+    table_state_cache.record_player_change(cafe_id, table_id, players, datetime.now(timezone.utc))
+    dashboard_broker.publish(cafe_id, "table", {"id": table_id, "current_players": players})
+
+
+def mark_session_ended(cafe_id, table_id):
+    _apply_table_change(
+        cafe_id, table_id,
+        status=models.TableStatus.available.value,
+        current_session_id=None,
+        startTime=None,
+        current_players=None,
+    )
+    table_state_cache.update_table(cafe_id, table_id, extra_player_us=None, players_since=None)
@@ -0,0 +1,86 @@
+import time
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.billing.pricing_plan import compile_plan
+from app.core.config import settings
+from app.models import models
+
+
+class PricingPlanCache:
+    """
+    Compiled pricing plans per cafe ({TableType: PricingPlan}). A miss loads the
+    cafe's strategy and all its pricing rows in one query; set_pricing_for_cafe and
+    the cafe controller invalidate the cafe in this worker.
+
+    Each entry remembers the cafes.management_version it was loaded at (every
+    pricing change bumps it). Billing passes the version it read in its own
+    transaction, so a bill is never priced from plans older than the database,
+    whichever worker changed them. Display-only reads (dashboard quotes) skip the
+    check and pick up other workers' changes within PRICING_PLAN_TTL_SECONDS.
+    """
+
+    def __init__(self, max_cafes: int, ttl_seconds: int):
+        self.max_cafes = max_cafes
+        self.ttl_seconds = ttl_seconds
+        self._cafes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_cached(self, cafe_id, version=None):
+        """Cafe ke plans agar cache mein (aur fresh, aur `version` diya ho toh usi version ke) hain, warna None."""
+        key = str(cafe_id)
+        with self._lock:
+            entry = self._cafes.get(key)
+            if entry is None:
+                return None
+            stale = version is not None and entry["version"] != version
+            if stale or (self.ttl_seconds and time.monotonic() - entry["loaded_at"] > self.ttl_seconds):
+                del self._cafes[key]
+                return None
+            self._cafes.move_to_end(key)
+            return entry["plans"]
+
+    def put(self, cafe_id, plans: dict, version=None):
+        key = str(cafe_id)
+        with self._lock:
+            self._cafes[key] = {"plans": plans, "version": version, "loaded_at": time.monotonic()}
+            self._cafes.move_to_end(key)
+            while len(self._cafes) > self.max_cafes:
+                self._cafes.popitem(last=False)
+
+    async def get_plans(self, db: AsyncSession, cafe_id, version=None) -> dict:
+        """`version`: cafes.management_version jo caller ne abhi padha; cached plans purane hon toh reload."""
+        plans = self.get_cached(cafe_id, version)
+        if plans is None:
+            # Outer join: bina pricing wale cafe ki bhi ek row aati hai, toh uska version bhi cache hota hai
+            rows = (await db.execute(
+                select(models.Cafe.billingStrategy, models.Cafe.management_version, models.Pricing)
+                .outerjoin(models.Pricing, models.Pricing.cafe_id == models.Cafe.id)
+                .where(models.Cafe.id == cafe_id)
+            )).all()
+            plans = {
+                pricing.tableType: compile_plan(cafe_id, strategy, pricing)
+                for strategy, _, pricing in rows if pricing is not None
+            }
+            self.put(cafe_id, plans, rows[0].management_version if rows else None)
+        return plans
+
+    async def get_plan(self, db: AsyncSession, cafe_id, table_type: models.TableType):
+        return (await self.get_plans(db, cafe_id)).get(table_type)
+
+    def invalidate(self, cafe_id):
+        with self._lock:
+            self._cafes.pop(str(cafe_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._cafes.clear()
+
+
+pricing_plan_cache = PricingPlanCache(
+    max_cafes=settings.PRICING_PLAN_CACHE_MAX_CAFES,
+    ttl_seconds=settings.PRICING_PLAN_TTL_SECONDS,
+)
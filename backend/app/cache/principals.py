@@ -0,0 +1,84 @@
+import time
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """
+    In-process TTL cache of authenticated principals (Owner / Staff rows), keyed by
+    the token's subject, role, owner flag and cafe. A hit means the auth dependencies
+    don't touch the database at all.
+
+    Only column values are stored; every hit builds a fresh detached instance, so
+    requests never share (or accidentally attach) the same ORM object. Staff changes
+    through staff_controller invalidate by mobile number, cafe deletes by cafe id;
+    other workers catch up within PRINCIPAL_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry["loaded_at"] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            model, values = entry["model"], entry["values"]
+        return _detached_copy(model, values)
+
+    def put(self, key: tuple, obj):
+        """obj ki columns snapshot karke cache karein; caller ko bhi ek detached copy milti hai."""
+        if not self.ttl_seconds:
+            return obj
+        model = type(obj)
+        values = {attr.key: getattr(obj, attr.key) for attr in inspect(model).column_attrs}
+        with self._lock:
+            self._entries[key] = {"model": model, "values": values, "loaded_at": time.monotonic()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return _detached_copy(model, values)
+
+    def invalidate_subject(self, mobileNo: str):
+        """Is mobile number (token 'sub') ke saare entries hata dein."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == mobileNo]:
+                del self._entries[key]
+
+    def invalidate_cafe(self, cafe_id):
+        """Cafe delete hone par uske staff ke entries (aur us cafe ke owner-as-staff tokens) hata dein."""
+        cafe_id = str(cafe_id)
+        with self._lock:
+            for key in [
+                k for k, entry in self._entries.items()
+                if k[3] == cafe_id or str(entry["values"].get("cafe_id")) == cafe_id
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _detached_copy(model, values: dict):
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,34 @@
+"""
+Rebuilds the revenue_rollups table from payment history. The migration that
+creates the table already backfills it; use this to repair drift. It can run
+while the app is serving: payment logging waits for the rebuild to commit.
+
+Usage:
+    python -m app.commands.backfill_revenue_rollup              # saare cafes
+    python -m app.commands.backfill_revenue_rollup --cafe-id <uuid>
+"""
+import argparse
+
+from app.db.db import SessionLocal
+from app.analytics import rollup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the revenue rollup table from payments.")
+    parser.add_argument("--cafe-id", help="Only rebuild this cafe's rollup rows")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows_written = rollup.rebuild(db, cafe_id=args.cafe_id)
+        db.commit()
+    except:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"Revenue rollup rebuilt: {rows_written} rows written.")
+
+
+if __name__ == "__main__":
+    main()
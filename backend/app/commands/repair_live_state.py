@@ -0,0 +1,104 @@
+"""
+Finds and repairs drift in the denormalized live-state columns:
+tables.active_session_id / tables.status and game_sessions.current_players.
+
+Usage:
+    python -m app.commands.repair_live_state            # drift dhoondo aur theek karo
+    python -m app.commands.repair_live_state --dry-run  # sirf report
+"""
+import argparse
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.db import SessionLocal
+from app.models import models
+
+
+def find_and_repair_drift(db: Session, repair: bool = True) -> list:
+    """
+    Source of truth is the normalized data: open game_sessions (endTime IS NULL)
+    and the latest player_changes row of each session. Returns a list of
+    human-readable drift descriptions; fixes them in the session if `repair`.
+    """
+    problems = []
+
+    # Har table ka sabse naya open session
+    open_sessions = db.query(models.GameSession).filter(
+        models.GameSession.endTime == None
+    ).order_by(models.GameSession.table_id, models.GameSession.startTime.desc()).all()
+    latest_open_by_table = {}
+    for game_session in open_sessions:
+        latest_open_by_table.setdefault(game_session.table_id, game_session)
+
+    for table in db.query(models.Table).all():
+        expected_session = latest_open_by_table.get(table.id)
+        expected_session_id = expected_session.id if expected_session else None
+        if table.active_session_id != expected_session_id:
+            problems.append(
+                f"table {table.id}: active_session_id {table.active_session_id} != {expected_session_id}"
+            )
+            if repair:
+                table.active_session_id = expected_session_id
+
+        if expected_session and table.status != models.TableStatus.in_use:
+            problems.append(f"table {table.id}: has an open session but status is {table.status.value}")
+            if repair:
+                table.status = models.TableStatus.in_use
+        elif not expected_session and table.status == models.TableStatus.in_use:
+            problems.append(f"table {table.id}: marked In Use without an open session")
+            if repair:
+                table.status = models.TableStatus.available
+
+    # Open sessions ka current_players latest PlayerChange se match hona chahiye
+    latest_players = db.query(
+        models.PlayerChange.session_id.label("session_id"),
+        models.PlayerChange.numberOfPlayers.label("numberOfPlayers"),
+        func.row_number().over(
+            partition_by=models.PlayerChange.session_id,
+            order_by=models.PlayerChange.timestamp.desc()
+        ).label("position")
+    ).subquery()
+    rows = db.query(models.GameSession, latest_players.c.numberOfPlayers).outerjoin(
+        latest_players, latest_players.c.session_id == models.GameSession.id
+    ).filter(
+        models.GameSession.endTime == None,
+        (latest_players.c.position == 1) | (latest_players.c.position == None)
+    ).all()
+    for game_session, latest_count in rows:
+        if game_session.current_players != latest_count:
+            problems.append(
+                f"session {game_session.id}: current_players {game_session.current_players} != {latest_count}"
+            )
+            if repair:
+                game_session.current_players = latest_count
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and repair denormalized table/session state.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report drift, do not fix it")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        problems = find_and_repair_drift(db, repair=not args.dry_run)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    for problem in problems:
+        print(problem)
+    action = "found" if args.dry_run else "repaired"
+    print(f"{len(problems)} drift issue(s) {action}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,23 @@
 import uuid
 import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, extract
 from decimal import Decimal
 from fastapi import HTTPException
-from datetime import datetime, date, timedelta
+from datetime import datetime, timedelta
+from app.analytics import simulator
+from app.billing.batch import to_paise, STRATEGY_CODES
+from app.cache.pricing_plans import pricing_plan_cache
+from app.core import local_time
 from app.models import models
+from app.schemas import analytics as analytics_schema
 
-def get_owner_analytics(db: Session, cafe_id: str, period: str, owner_id: str):
+async def get_owner_analytics(db: AsyncSession, cafe_id: str, period: str, owner_id: str):
     """
     Calculates and returns the performance analytics for a specific cafe owned by the current owner.
     """
     # First, verify the owner actually owns this cafe
-    cafe = db.query(models.Cafe).filter(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id).first()
+    cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id))
     if not cafe:
         # This will prevent analytics from being loaded for a cafe not owned by the user
         return {
@@ -21,8 +26,8 @@ def get_owner_analytics(db: Session, cafe_id: str, period: str, owner_id: str):
         }
 
     # --- CORRECTED TIMEZONE LOGIC ---
-    # We calculate the start date using the server's local timezone
-    today = date.today()
+    # We calculate the start date in ANALYTICS_TIMEZONE, the zone the rollup buckets use
+    today = local_time.today()
     if period == 'today':
         start_date = datetime.combine(today, datetime.min.time())
     elif period == 'week':
@@ -33,27 +38,31 @@ def get_owner_analytics(db: Session, cafe_id: str, period: str, owner_id: str):
         # Default to week if an invalid period is provided
         start_date = datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time())
 
-    # This query now correctly fetches payments for the selected cafe within the local time period
-    payments = db.query(models.Payment).join(models.GameSession).join(models.Table).filter(
-        models.Table.cafe_id == cafe_id,
-        models.Payment.paymentTimestamp >= start_date
-    ).all()
+    # Raw payments ki jagah pre-aggregated rollup: kaam buckets ke hisaab se, payments ke nahi
+    rows = (await db.execute(select(
+        models.RevenueRollup.paymentMethod,
+        models.RevenueRollup.hour,
+        func.sum(models.RevenueRollup.totalRevenue).label("revenue"),
+        func.sum(models.RevenueRollup.paymentCount).label("payment_count")
+    ).where(
+        models.RevenueRollup.cafe_id == cafe_id,
+        models.RevenueRollup.day >= start_date.date()
+    ).group_by(models.RevenueRollup.paymentMethod, models.RevenueRollup.hour))).all()
 
-    total_revenue = sum(p.totalAmount for p in payments)
-    total_sessions = len(set(p.session_id for p in payments))
-    
-    revenue_by_method = {
-        "Cash": sum(p.totalAmount for p in payments if p.paymentMethod == models.PaymentMethod.cash),
-        "Online": sum(p.totalAmount for p in payments if p.paymentMethod == models.PaymentMethod.online)
-    }
+    total_revenue = Decimal('0')
+    # Har session ka ek hi payment hota hai (session_id unique), isliye count == sessions
+    total_sessions = 0
+    revenue_by_method = {"Cash": Decimal('0'), "Online": Decimal('0')}
+    hour_counts = {}
+    for payment_method, hour, revenue, payment_count in rows:
+        total_revenue += revenue
+        total_sessions += payment_count
+        revenue_by_method[payment_method.value] += revenue
+        hour_counts[int(hour)] = hour_counts.get(int(hour), 0) + payment_count
 
     # Peak hours calculation (simplified)
-    if payments:
-        hour_counts = {}
-        for p in payments:
-            hour = p.paymentTimestamp.hour
-            hour_counts[hour] = hour_counts.get(hour, 0) + 1
-        peak_hour = max(hour_counts, key=hour_counts.get)
+    if hour_counts:
+        peak_hour = max(sorted(hour_counts), key=hour_counts.get)
         peak_hours_str = f"{peak_hour}:00 - {peak_hour+1}:00"
     else:
         peak_hours_str = "N/A"
@@ -65,40 +74,83 @@ def get_owner_analytics(db: Session, cafe_id: str, period: str, owner_id: str):
         "revenue_by_payment_method": revenue_by_method
     }
 
-def get_staff_daily_analytics(db: Session, staff: models.Staff):
+async def get_staff_daily_analytics(db: AsyncSession, staff: models.Staff):
     """
     Calculates and returns the daily performance analytics for the current staff member.
     """
-    # Use the server's local timezone to define the start of today
-    today_start_local = datetime.combine(date.today(), datetime.min.time())
+    # Start of today in ANALYTICS_TIMEZONE, the zone the rollup buckets use
+    today_start_local = datetime.combine(local_time.today(), datetime.min.time())
 
-    # Query all payments made by this staff member today
-    payments_today = db.query(models.Payment).join(models.GameSession).filter(
-        models.GameSession.staff_id == staff.id,
-        models.Payment.paymentTimestamp >= today_start_local
-    ).all()
+    # Aaj ke payments ka total, payment method ke hisaab se, rollup table se
+    rows = (await db.execute(select(
+        models.RevenueRollup.paymentMethod,
+        func.sum(models.RevenueRollup.totalRevenue).label("revenue"),
+        func.sum(models.RevenueRollup.paymentCount).label("payment_count")
+    ).where(
+        models.RevenueRollup.staff_id == staff.id,
+        models.RevenueRollup.day >= today_start_local.date()
+    ).group_by(models.RevenueRollup.paymentMethod))).all()
 
     # Initialize analytics counters
     total_revenue = Decimal('0.0')
     cash_collected = Decimal('0.0')
     online_collected = Decimal('0.0')
-    # Use a set to count unique sessions managed
-    sessions_managed = set()
+    sessions_managed = 0
 
-    # Calculate totals by iterating through the payments
-    for payment in payments_today:
-        total_revenue += payment.totalAmount
-        sessions_managed.add(payment.session_id)
-        if payment.paymentMethod == models.PaymentMethod.cash:
-            cash_collected += payment.totalAmount
-        elif payment.paymentMethod == models.PaymentMethod.online:
-            online_collected += payment.totalAmount
+    for payment_method, revenue, payment_count in rows:
+        total_revenue += revenue
+        sessions_managed += payment_count
+        if payment_method == models.PaymentMethod.cash:
+            cash_collected += revenue
+        elif payment_method == models.PaymentMethod.online:
+            online_collected += revenue
             
     return {
         "total_revenue": total_revenue,
-        "sessions_managed": len(sessions_managed),
+        "sessions_managed": sessions_managed,
         "cash_collected": cash_collected,
         "online_collected": online_collected,
     }
 
+async def simulate_pricing(db: AsyncSession, simulation: analytics_schema.PricingSimulationRequest, owner_id: str):
+    """
+    Replays the owner's completed sessions in the date range under candidate pricing
+    and/or strategy, and compares them with the current pricing.
+    """
+    if simulation.end_date < simulation.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+    stmt = select(models.Cafe).where(models.Cafe.owner_id == owner_id)
+    if simulation.cafe_ids:
+        stmt = stmt.where(models.Cafe.id.in_(simulation.cafe_ids))
+    cafes = (await db.scalars(stmt)).all()
+    if simulation.cafe_ids and len(cafes) != len(set(simulation.cafe_ids)):
+        raise HTTPException(status_code=404, detail="Cafe not found or not owned by you")
+
+    candidate_rules = {rule.tableType: rule for rule in simulation.pricing}
+    baseline_plans, candidate_plans = {}, {}
+    for cafe in cafes:
+        strategy = simulation.billingStrategy or cafe.billingStrategy
+        if strategy not in STRATEGY_CODES or cafe.billingStrategy not in STRATEGY_CODES:
+            raise HTTPException(status_code=400, detail=f"Billing strategy '{strategy.value}' cannot be simulated")
+        plans = await pricing_plan_cache.get_plans(db, cafe.id)
+        for table_type in models.TableType:
+            key = (str(cafe.id), table_type)
+            plan = plans.get(table_type)
+            if plan:
+                baseline_plans[key] = simulator.PlanParams(
+                    plan.hour_price_paise, plan.half_hour_price_paise, plan.extra_player_price_paise, plan.strategy_code
+                )
+            rule = candidate_rules.get(table_type) or plan
+            if rule:
+                candidate_plans[key] = simulator.PlanParams(
+                    to_paise(rule.hourPrice), to_paise(rule.halfHourPrice), to_paise(rule.extraPlayerPrice),
+                    STRATEGY_CODES[strategy]
+                )
 
+    # Date range ANALYTICS_TIMEZONE mein (baaki analytics jaisa), end_date bhi shamil
+    start = local_time.start_of_day(simulation.start_date)
+    end = local_time.start_of_day(simulation.end_date + timedelta(days=1))
+    return await simulator.replay_sessions(
+        db, [cafe.id for cafe in cafes], start, end, baseline_plans, candidate_plans
+    )
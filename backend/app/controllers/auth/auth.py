@@ -1,39 +1,41 @@
 from datetime import timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models import models
 from app.schemas import auth as auth_schema
-from app.security.Hash import Hasher
+from app.cache.principals import principal_cache
+from app.security.Hash import pin_hash_pool
 from app.security.jwt import create_access_token
 from app.core.config import settings
 
-def register_owner(db: Session, owner: auth_schema.OwnerCreate):
-    db_owner = db.query(models.Owner).filter(models.Owner.mobileNo == owner.mobileNo).first()
+async def register_owner(db: AsyncSession, owner: auth_schema.OwnerCreate):
+    db_owner = await db.scalar(select(models.Owner).where(models.Owner.mobileNo == owner.mobileNo))
     if db_owner:
         raise HTTPException(status_code=400, detail="Mobile number already registered")
     
-    hashed_pin = Hasher.get_password_hash(owner.pin)
+    hashed_pin = await pin_hash_pool.hash(owner.pin)
     new_owner = models.Owner(
         ownerName=owner.ownerName,
         mobileNo=owner.mobileNo,
         pinHash=hashed_pin
     )
     db.add(new_owner)
-    db.commit()
-    db.refresh(new_owner)
+    await db.commit()
+    await db.refresh(new_owner)
     return new_owner
 
 
-def login_for_access_token(db: Session, form_data: auth_schema.OAuth2PasswordRequestForm):
+async def login_for_access_token(db: AsyncSession, form_data: auth_schema.OAuth2PasswordRequestForm):
     mobile_no = form_data.username
     
-    user = db.query(models.Owner).filter(models.Owner.mobileNo == mobile_no).first()
+    user = await db.scalar(select(models.Owner).where(models.Owner.mobileNo == mobile_no))
     role = "owner"
     pin_hash_to_check = user.pinHash if user else None
     
     if not user:
-        user = db.query(models.Staff).filter(models.Staff.mobileNo == mobile_no).first()
+        user = await db.scalar(select(models.Staff).where(models.Staff.mobileNo == mobile_no))
         role = "staff"
         pin_hash_to_check = user.pin if user else None
 
@@ -43,13 +45,23 @@ def login_for_access_token(db: Session, form_data: auth_schema.OAuth2PasswordReq
             detail="User not found. Please register as an owner first.",
         )
 
-    if not Hasher.verify_password(form_data.password, pin_hash_to_check):
+    is_valid, new_hash = await pin_hash_pool.verify_and_update(form_data.password, pin_hash_to_check)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="The PIN you entered is incorrect.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    # BCRYPT_ROUNDS badla hai toh sahi PIN milte hi naye cost se rehash kar dein
+    if new_hash:
+        if role == "owner":
+            user.pinHash = new_hash
+        else:
+            user.pin = new_hash
+        await db.commit()
+        principal_cache.invalidate_subject(user.mobileNo)
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.mobileNo, "role": role}, 
@@ -59,11 +71,11 @@ def login_for_access_token(db: Session, form_data: auth_schema.OAuth2PasswordReq
     # Also add role to the response here for consistency
     return {"access_token": access_token, "token_type": "bearer", "role": role}
 
-def assume_staff_role(db: Session, cafe_id: str, owner: models.Owner):
-    cafe = db.query(models.Cafe).filter(
+async def assume_staff_role(db: AsyncSession, cafe_id: str, owner: models.Owner):
+    cafe = await db.scalar(select(models.Cafe).where(
         models.Cafe.id == cafe_id,
         models.Cafe.owner_id == owner.id
-    ).first()
+    ))
 
     if not cafe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found or not owned by you")
@@ -1,16 +1,29 @@
-from sqlalchemy.orm import Session, joinedload
+import base64
+import binascii
+import uuid
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, contains_eager
 from fastapi import HTTPException, status
-from datetime import datetime, date, timezone
+from datetime import datetime, timedelta, timezone
 
 from app.models import models
 from app.schemas import payment as payment_schema
+from app.analytics import rollup
+from app.core import local_time, metrics
 
-def log_new_payment(db: Session, payment_data: payment_schema.PaymentCreate, staff: models.Staff):
+async def log_new_payment(db: AsyncSession, payment_data: payment_schema.PaymentCreate, staff: models.Staff):
     # This function remains correct
-    session = db.query(models.GameSession).join(models.Table).filter(
-        models.GameSession.id == payment_data.game_session_id,
-        models.Table.cafe_id == staff.cafe_id
-    ).first()
+    session = await db.scalar(
+        select(models.GameSession).join(models.GameSession.table).where(
+            models.GameSession.id == payment_data.game_session_id,
+            models.Table.cafe_id == staff.cafe_id
+        ).options(
+            contains_eager(models.GameSession.table),
+            joinedload(models.GameSession.payment),
+        ).with_for_update(of=models.GameSession)
+    )
 
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found in this cafe")
@@ -28,26 +41,138 @@ def log_new_payment(db: Session, payment_data: payment_schema.PaymentCreate, sta
         timePlayedInMinutes=duration_minutes
     )
     db.add(new_payment)
-    db.commit()
-    db.refresh(new_payment)
-    return new_payment
+    try:
+        await db.flush()
+    except IntegrityError:
+        # payments.session_id unique hai: saath chal rahe doosre request ne payment pehle likh di
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This session has already been paid for")
+    # paymentTimestamp server par set hota hai, rollup bucket ke liye wahi chahiye
+    await db.refresh(new_payment)
+    await rollup.record_payment(db, new_payment, session, session.table)
+    await db.commit()
+    metrics.record_payment(new_payment.paymentMethod, new_payment.totalAmount)
+
+    # Response schema ko game_session.table chahiye
+    return await db.scalar(
+        select(models.Payment).where(models.Payment.id == new_payment.id).options(
+            joinedload(models.Payment.game_session).joinedload(models.GameSession.table)
+        ).execution_options(populate_existing=True)
+    )
+
+def payment_payload(payment: models.Payment) -> dict:
+    """payment_schema.Payment ke fields, FastJSONResponse ke liye (game_session.table loaded hona chahiye)."""
+    return {
+        "id": payment.id,
+        "totalAmount": payment.totalAmount,
+        "paymentMethod": payment.paymentMethod,
+        "paymentTimestamp": payment.paymentTimestamp,
+        "game_session": {"table": {"tableName": payment.game_session.table.tableName}},
+    }
+
+def history_page_payload(page: dict) -> dict:
+    return {"items": [payment_payload(payment) for payment in page["items"]], "next_cursor": page["next_cursor"]}
 
 # --- CORRECTED FUNCTION ---
-def get_payments_for_staff_today(db: Session, staff: models.Staff):
+async def get_payments_for_staff_today(db: AsyncSession, staff: models.Staff):
     """
     Fetches all payments recorded by the current staff member for the current day,
-    using the server's local timezone.
+    in ANALYTICS_TIMEZONE.
     """
-    # Get the start of today in the server's local timezone
-    today_start_local = datetime.combine(date.today(), datetime.min.time())
+    # Get the start of today in ANALYTICS_TIMEZONE
+    today_start_local = local_time.start_of_day(local_time.today())
     
     # The query now correctly compares local timestamps
-    payments = db.query(models.Payment).join(models.GameSession).filter(
-        models.GameSession.staff_id == staff.id,
-        models.Payment.paymentTimestamp >= today_start_local
-    ).options(
-        joinedload(models.Payment.game_session).joinedload(models.GameSession.table)
-    ).order_by(models.Payment.paymentTimestamp.desc()).all()
+    payments = await db.scalars(
+        select(models.Payment).join(models.GameSession).where(
+            models.GameSession.staff_id == staff.id,
+            models.Payment.paymentTimestamp >= today_start_local
+        ).options(
+            joinedload(models.Payment.game_session).joinedload(models.GameSession.table)
+        ).order_by(models.Payment.paymentTimestamp.desc())
+    )
     
-    return payments
+    return payments.all()
+
+# --- Paginated Payment History ---
+
+HISTORY_PAGE_MAX = 200
+
+def encode_payment_cursor(payment: models.Payment) -> str:
+    raw = f"{payment.paymentTimestamp.isoformat()}|{payment.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_payment_cursor(cursor: str):
+    try:
+        timestamp, payment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), uuid.UUID(payment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+async def get_payment_history(
+    db: AsyncSession,
+    cafe_ids: list,
+    filters: payment_schema.PaymentHistoryFilters,
+    staff_id: uuid.UUID | None = None,
+):
+    """
+    One page of payments, newest first, for the given cafes.
+
+    Keyset pagination on (paymentTimestamp, id): the next page starts strictly after
+    the last row of this one, so page 1000 costs the same index seek as page 1
+    (OFFSET would scan and throw away every earlier row). `staff_id` scopes the
+    history to one staff member and overrides the filter.
+    """
+    if filters.start_date and filters.end_date and filters.end_date < filters.start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    limit = min(filters.limit, HISTORY_PAGE_MAX)
+    stmt = (
+        select(models.Payment)
+        .join(models.Payment.game_session)
+        .join(models.GameSession.table)
+        .where(models.Table.cafe_id.in_(cafe_ids))
+        .options(contains_eager(models.Payment.game_session).contains_eager(models.GameSession.table))
+        .order_by(models.Payment.paymentTimestamp.desc(), models.Payment.id.desc())
+        .limit(limit + 1)
+    )
+
+    # Dates ANALYTICS_TIMEZONE mein, baaki analytics jaisa; end_date bhi shamil
+    if filters.start_date:
+        stmt = stmt.where(models.Payment.paymentTimestamp >= local_time.start_of_day(filters.start_date))
+    if filters.end_date:
+        stmt = stmt.where(models.Payment.paymentTimestamp < local_time.start_of_day(filters.end_date + timedelta(days=1)))
+    if filters.table_id:
+        stmt = stmt.where(models.GameSession.table_id == filters.table_id)
+    if filters.payment_method:
+        stmt = stmt.where(models.Payment.paymentMethod == filters.payment_method)
+    staff_id = staff_id or filters.staff_id
+    if staff_id:
+        stmt = stmt.where(models.GameSession.staff_id == staff_id)
+    if filters.cursor:
+        cursor_timestamp, cursor_id = decode_payment_cursor(filters.cursor)
+        stmt = stmt.where(
+            tuple_(models.Payment.paymentTimestamp, models.Payment.id) < tuple_(cursor_timestamp, cursor_id)
+        )
+
+    payments = (await db.scalars(stmt)).all()
+    has_more = len(payments) > limit
+    payments = payments[:limit]
+    return {
+        "items": payments,
+        "next_cursor": encode_payment_cursor(payments[-1]) if has_more else None,
+    }
+
+async def get_payment_history_for_owner(
+    db: AsyncSession, owner_id: uuid.UUID, cafe_id: uuid.UUID | None, filters: payment_schema.PaymentHistoryFilters
+):
+    stmt = select(models.Cafe.id).where(models.Cafe.owner_id == owner_id)
+    if cafe_id:
+        stmt = stmt.where(models.Cafe.id == cafe_id)
+    cafe_ids = (await db.scalars(stmt)).all()
+    if cafe_id and not cafe_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found or not owned by you")
+    return await get_payment_history(db, cafe_ids, filters)
 
+async def get_payment_history_for_staff(db: AsyncSession, staff: models.Staff, filters: payment_schema.PaymentHistoryFilters):
+    # Staff ko sirf apne cafe mein apne hi payments dikhte hain (jaise /staff/payments today wala)
+    return await get_payment_history(db, [staff.cafe_id], filters, staff_id=staff.id)
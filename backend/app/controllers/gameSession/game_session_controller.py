@@ -1,19 +1,38 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, contains_eager
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
+from itertools import groupby
 import math
-from decimal import Decimal
+import uuid
 from app.models import models
 from app.schemas import game_session as game_session_schema
-from app.billing import strategies
+from app.billing import player_timeline
+from app.cache import live_state
+from app.cache.pricing_plans import pricing_plan_cache
+from app.core import metrics
 
-def start_new_session(db: Session, session_data: game_session_schema.SessionStart, staff: models.Staff):
-    table = db.query(models.Table).filter(models.Table.id == session_data.table_id).first()
-    if not table or table.status != models.TableStatus.available:
+async def start_new_session(db: AsyncSession, session_data: game_session_schema.SessionStart, staff: models.Staff):
+    # Table ko ek conditional UPDATE se claim karein: do devices ek saath tap karein toh
+    # row lock ki wajah se doosra UPDATE 'Available' nahi paata aur 0 rows badalta hai
+    claim = await db.execute(
+        update(models.Table).where(
+            models.Table.id == session_data.table_id,
+            models.Table.cafe_id == staff.cafe_id,
+            models.Table.status == models.TableStatus.available,
+        ).values(status=models.TableStatus.in_use).execution_options(synchronize_session=False)
+    )
+    if claim.rowcount != 1:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Table is not available")
 
     # Create the new session
-    new_session = models.GameSession(table_id=session_data.table_id, staff_id=staff.id)
+    new_session = models.GameSession(
+        id=uuid.uuid4(),
+        table_id=session_data.table_id,
+        staff_id=staff.id,
+        current_players=session_data.initial_player_count
+    )
     db.add(new_session)
     
     # IMPORTANT: Create the initial PlayerChange record
@@ -22,14 +41,34 @@ def start_new_session(db: Session, session_data: game_session_schema.SessionStar
         numberOfPlayers=session_data.initial_player_count
     )
     db.add(initial_players)
+    await db.flush()
+
+    await db.execute(
+        update(models.Table).where(models.Table.id == session_data.table_id)
+        .values(active_session_id=new_session.id).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    # Response mein table aur player_changes bhi jaate hain, isliye eager load karke dobara padhein
+    new_session = await db.scalar(
+        select(models.GameSession).where(models.GameSession.id == new_session.id).options(
+            selectinload(models.GameSession.table),
+            selectinload(models.GameSession.player_changes),
+        ).execution_options(populate_existing=True)
+    )
 
-    table.status = models.TableStatus.in_use
-    db.commit()
-    db.refresh(new_session)
+    # Live dashboard cache ko write-through update karein
+    live_state.mark_session_started(
+        staff.cafe_id, session_data.table_id, new_session.id, new_session.startTime, session_data.initial_player_count
+    )
+    metrics.record_session_started(staff.cafe_id)
     return new_session
 
-def update_player_count(db: Session, change_data: game_session_schema.PlayerChange, staff: models.Staff):
-    session = db.query(models.GameSession).filter(models.GameSession.id == change_data.session_id).first()
+async def update_player_count(db: AsyncSession, change_data: game_session_schema.PlayerChange, staff: models.Staff):
+    session = await db.scalar(
+        select(models.GameSession).where(models.GameSession.id == change_data.session_id)
+        .options(joinedload(models.GameSession.table))
+    )
     if not session or session.endTime is not None:
         raise HTTPException(status_code=404, detail="Active session not found")
     
@@ -42,62 +81,194 @@ def update_player_count(db: Session, change_data: game_session_schema.PlayerChan
         numberOfPlayers=change_data.new_player_count
     )
     db.add(new_change)
-    db.commit()
+    session.current_players = change_data.new_player_count
+    await db.commit()
+
+    live_state.mark_players_changed(session.table.cafe_id, session.table_id, change_data.new_player_count)
     return {"message": "Player count updated successfully"}
 
-def end_existing_session(db: Session, session_id: str, staff: models.Staff):
-    session = db.query(models.GameSession).filter(
-        models.GameSession.id == session_id, 
-        models.GameSession.endTime == None
-    ).first()
+async def end_existing_session(db: AsyncSession, session_id: str, staff: models.Staff):
+    # Cafe ka management_version bhi isi query mein: pricing plan cache usse check hota hai
+    row = (await db.execute(
+        select(models.GameSession, models.Cafe.management_version)
+        .join(models.GameSession.table).join(models.Table.cafe)
+        .where(
+            models.GameSession.id == session_id, 
+            models.GameSession.endTime == None
+        ).options(
+            contains_eager(models.GameSession.table),
+        # Session row lock: retry / doosra device lock ke baad endTime set dekhta hai aur 404 paata hai
+        ).with_for_update(of=models.GameSession)
+    )).first()
+    session, management_version = row if row else (None, None)
 
-    if not session or session.staff.cafe_id != staff.cafe_id:
+    # Session ka table staff ke cafe ka hona chahiye
+    if not session or session.table.cafe_id != staff.cafe_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Active session not found")
 
-    # --- Naya "Traffic Cop" Logic ---
-    
-    # 1. Basic details calculate karein
-    session.endTime = datetime.now(timezone.utc)
-    duration = session.endTime - session.startTime
-    duration_minutes = math.ceil(duration.total_seconds() / 60)
-
     table = session.table
-    cafe = table.cafe
-    billing_strategy = cafe.billingStrategy # Cafe ki strategy fetch karein
 
-    pricing_rule = db.query(models.Pricing).filter(
-        models.Pricing.cafe_id == table.cafe_id,
-        models.Pricing.tableType == table.tableType
-    ).first()
+    # Cafe ki strategy + rates pehle se compiled plan mein hain (cache hit par koi pricing query nahi)
+    pricing_plan = _plan_for(await pricing_plan_cache.get_plans(db, table.cafe_id, management_version), table)
 
-    if not pricing_rule:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pricing for this table type is not set")
+    # Poori player timeline ek hi ordered query mein; extra players sirf apne time ke liye charge hote hain
+    player_changes = (await db.execute(
+        select(models.PlayerChange.timestamp, models.PlayerChange.numberOfPlayers)
+        .where(models.PlayerChange.session_id == session.id)
+        .order_by(models.PlayerChange.timestamp)
+    )).all()
 
-    latest_player_change = db.query(models.PlayerChange).filter(
-        models.PlayerChange.session_id == session.id
-    ).order_by(models.PlayerChange.timestamp.desc()).first()
-    
-    final_player_count = latest_player_change.numberOfPlayers if latest_player_change else 0
-
-    # 2. Strategy ke hisaab se sahi calculation engine chunein
-    calculation_function = None
-    if billing_strategy == models.BillingStrategy.pro_rata:
-        calculation_function = strategies.calculate_pro_rata_bill
-    elif billing_strategy == models.BillingStrategy.per_minute:
-        calculation_function = strategies.calculate_per_minute_bill
-    elif billing_strategy == models.BillingStrategy.fixed_hour:
-        calculation_function = strategies.calculate_fixed_hour_bill
-    else:
+    bill_details = _close_session(session, pricing_plan, player_changes, datetime.now(timezone.utc))
+    await db.commit()
+
+    live_state.mark_session_ended(table.cafe_id, table.id)
+    metrics.record_session_ended(table.cafe_id, pricing_plan.billingStrategy)
+
+    # Final response mein session_id add karke bhej dein
+    return {"session_id": str(session.id), **bill_details}
+
+def _plan_for(plans: dict, table: models.Table):
+    pricing_plan = plans.get(table.tableType)
+    if not pricing_plan:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pricing for this table type is not set")
+    if pricing_plan.calculate is None:
         raise HTTPException(status_code=500, detail="Unknown billing strategy configured for this cafe")
+    return pricing_plan
+
+def _close_session(session: models.GameSession, pricing_plan, player_changes, end_time: datetime) -> dict:
+    """
+    Session ko end_time par band karta hai aur bill banata hai (commit caller karta hai).
+    `player_changes` is session ki (timestamp, numberOfPlayers) timeline hai, time ke order mein.
+    """
+    # 1. Basic details calculate karein
+    session.endTime = end_time
+    duration = session.endTime - session.startTime
+    duration_minutes = math.ceil(duration.total_seconds() / 60)
+    final_player_count = session.current_players or 0
+
+    extra_player_time = player_timeline.integrate_extra_players(player_changes, session.startTime, session.endTime)
+
+    # 2. Plan mein cafe ki strategy ka registered bill function hai (average_extra_players bhi wahi bharta hai)
+    bill_details = pricing_plan.bill(duration_minutes, final_player_count, extra_player_time)
 
-    # 3. Chune hue engine se bill calculate karwayein
-    bill_details = calculation_function(duration_minutes, pricing_rule, final_player_count)
-    
     # Baaki updates waise ke waise
+    table = session.table
     table.status = models.TableStatus.available
+    table.active_session = None
     session.timePlayedInMinutes = duration_minutes
-    db.commit()
+    return bill_details
 
-    # Final response mein session_id add karke bhej dein
-    return {"session_id": str(session.id), **bill_details}
+# --- Bulk operations (tournament nights) ---
+
+def _reject_duplicates(ids: list, what: str):
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Duplicate {what} in request")
+
+async def start_bulk_sessions(db: AsyncSession, bulk_data: game_session_schema.BulkSessionStart, staff: models.Staff):
+    """
+    Starts sessions on many tables in one transaction: all of them start, or none.
+    Tables are locked (SELECT ... FOR UPDATE, id order) before the availability check.
+    """
+    table_ids = [item.table_id for item in bulk_data.sessions]
+    _reject_duplicates(table_ids, "tables")
+
+    # id order mein lock: do overlapping bulk requests ek doosre ka deadlock na banayein
+    tables = (await db.scalars(
+        select(models.Table).where(
+            models.Table.id.in_(table_ids),
+            models.Table.cafe_id == staff.cafe_id,
+        ).order_by(models.Table.id).with_for_update()
+    )).all()
+    if len(tables) != len(table_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more tables were not found in this cafe")
+    busy = sorted(table.tableName for table in tables if table.status != models.TableStatus.available)
+    if busy:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tables not available: {', '.join(busy)}")
+
+    # Ids yahin bana lete hain taaki sessions aur player changes do bulk INSERTs mein jaayein
+    session_ids = {item.table_id: uuid.uuid4() for item in bulk_data.sessions}
+    await db.execute(insert(models.GameSession), [
+        {
+            "id": session_ids[item.table_id],
+            "table_id": item.table_id,
+            "staff_id": staff.id,
+            "current_players": item.initial_player_count,
+        }
+        for item in bulk_data.sessions
+    ])
+    await db.execute(insert(models.PlayerChange), [
+        {"session_id": session_ids[item.table_id], "numberOfPlayers": item.initial_player_count}
+        for item in bulk_data.sessions
+    ])
+    for table in tables:
+        table.status = models.TableStatus.in_use
+        table.active_session_id = session_ids[table.id]
+    await db.commit()
+
+    new_sessions = (await db.scalars(
+        select(models.GameSession).where(models.GameSession.id.in_(list(session_ids.values()))).options(
+            selectinload(models.GameSession.table),
+            selectinload(models.GameSession.player_changes),
+        ).execution_options(populate_existing=True)
+    )).all()
+    by_table = {new_session.table_id: new_session for new_session in new_sessions}
+
+    for item in bulk_data.sessions:
+        new_session = by_table[item.table_id]
+        live_state.mark_session_started(
+            staff.cafe_id, item.table_id, new_session.id, new_session.startTime, item.initial_player_count
+        )
+        metrics.record_session_started(staff.cafe_id)
+    # Request wale order mein hi wapas
+    return [by_table[item.table_id] for item in bulk_data.sessions]
+
+async def end_bulk_sessions(db: AsyncSession, bulk_data: game_session_schema.BulkSessionEnd, staff: models.Staff):
+    """
+    Ends many sessions in one transaction and returns every bill. Sessions and
+    their tables are locked first; one query loads all the player timelines.
+    """
+    session_ids = bulk_data.session_ids
+    _reject_duplicates(session_ids, "sessions")
+
+    rows = (await db.execute(
+        select(models.GameSession, models.Cafe.management_version)
+        .join(models.GameSession.table).join(models.Table.cafe).where(
+            models.GameSession.id.in_(session_ids),
+            models.GameSession.endTime == None,
+            models.Table.cafe_id == staff.cafe_id,
+        ).options(contains_eager(models.GameSession.table))
+        .order_by(models.Table.id).with_for_update(of=[models.GameSession, models.Table])
+    )).all()
+    sessions = [session for session, _ in rows]
+    if len(sessions) != len(session_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more active sessions were not found")
+
+    # Sab sessions staff ke cafe ke hain, toh ek hi management_version
+    plans = await pricing_plan_cache.get_plans(db, staff.cafe_id, rows[0].management_version)
+    session_plans = {session.id: _plan_for(plans, session.table) for session in sessions}
+
+    timelines = {
+        session_id: list(changes)
+        for session_id, changes in groupby((await db.execute(
+            select(models.PlayerChange.session_id, models.PlayerChange.timestamp, models.PlayerChange.numberOfPlayers)
+            .where(models.PlayerChange.session_id.in_(session_ids))
+            .order_by(models.PlayerChange.session_id, models.PlayerChange.timestamp)
+        )).all(), key=lambda row: row.session_id)
+    }
+
+    # Sab tables ek hi waqt par band (ek hi end time)
+    end_time = datetime.now(timezone.utc)
+    bills = {
+        session.id: _close_session(
+            session, session_plans[session.id],
+            [(row.timestamp, row.numberOfPlayers) for row in timelines.get(session.id, [])],
+            end_time,
+        )
+        for session in sessions
+    }
+    await db.commit()
 
+    for session in sessions:
+        live_state.mark_session_ended(staff.cafe_id, session.table_id)
+        metrics.record_session_ended(staff.cafe_id, session_plans[session.id].billingStrategy)
+    return {"bills": [{"session_id": str(session_id), **bills[session_id]} for session_id in session_ids]}
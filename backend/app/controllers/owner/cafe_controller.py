@@ -1,23 +1,51 @@
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models import models
 from app.schemas import cafe as cafe_schema
+from app.cache import live_state
+from app.cache.pricing_plans import pricing_plan_cache
+from app.cache.principals import principal_cache
+from app.core import metrics
+from app.core.etags import make_stable_etag
 
 
-def create_cafe(db: Session, cafe: cafe_schema.CafeCreate, owner: models.Owner):
+async def bump_management_version(db: AsyncSession, *cafe_ids):
+    """
+    Caller ke transaction mein cafes.management_version +1; uske commit ke saath hi
+    lagta hai, toh har worker ko naya version (aur naya ETag) turant dikhta hai.
+    """
+    cafe_ids = {cafe_id for cafe_id in cafe_ids if cafe_id is not None}
+    if not cafe_ids:
+        return
+    await db.execute(
+        update(models.Cafe)
+        .where(models.Cafe.id.in_(cafe_ids))
+        .values(management_version=models.Cafe.management_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+async def get_management_version(db: AsyncSession, cafe_id, owner_id):
+    """Cafe ka management_version, ya None agar cafe nahi hai / owner ka nahi hai."""
+    return await db.scalar(select(models.Cafe.management_version).where(
+        models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id
+    ))
+
+
+async def create_cafe(db: AsyncSession, cafe: cafe_schema.CafeCreate, owner: models.Owner):
     new_cafe = models.Cafe(
         cafeName=cafe.cafeName,
         billingStrategy=cafe.billingStrategy,
         owner_id=owner.id
     )
     db.add(new_cafe)
-    db.flush()
+    await db.flush()
 
     # --- Naya, Smart Logic ---
     # Check karein ki is owner ka primary staff profile pehle se hai ya nahi
-    existing_staff_profile = db.query(models.Staff).filter(models.Staff.mobileNo == owner.mobileNo).first()
+    existing_staff_profile = await db.scalar(select(models.Staff).where(models.Staff.mobileNo == owner.mobileNo))
     
     # Sirf tabhi banayein jab pehle se na ho (yaani, yeh owner ka pehla cafe hai)
     if not existing_staff_profile:
@@ -29,29 +57,46 @@ def create_cafe(db: Session, cafe: cafe_schema.CafeCreate, owner: models.Owner):
         )
         db.add(owner_as_staff)
     
-    db.commit()
-    db.refresh(new_cafe)
+    await db.commit()
+    await db.refresh(new_cafe)
     return new_cafe
 
 
-def get_cafes_by_owner(db: Session, owner_id: uuid.UUID):
-    return db.query(models.Cafe).filter(models.Cafe.owner_id == owner_id).all()
+async def get_cafes_by_owner(db: AsyncSession, owner_id: uuid.UUID):
+    return (await db.scalars(select(models.Cafe).where(models.Cafe.owner_id == owner_id))).all()
+
+async def get_cafes_etag(db: AsyncSession, owner_id: uuid.UUID) -> str:
+    # Naya / delete hua cafe id set badalta hai, update version badalta hai
+    rows = (await db.execute(
+        select(models.Cafe.id, models.Cafe.management_version)
+        .where(models.Cafe.owner_id == owner_id)
+        .order_by(models.Cafe.id)
+    )).all()
+    return make_stable_etag("cafes", owner_id, *(f"{cafe_id}:{version}" for cafe_id, version in rows))
 
-def get_cafe_by_id(db: Session, cafe_id: uuid.UUID, owner_id: uuid.UUID):
-    db_cafe = db.query(models.Cafe).filter(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id).first()
+async def get_cafe_by_id(db: AsyncSession, cafe_id: uuid.UUID, owner_id: uuid.UUID):
+    db_cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id))
     if not db_cafe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found")
     return db_cafe
 
-def update_cafe(db: Session, cafe_id: uuid.UUID, cafe: cafe_schema.CafeUpdate, owner_id: uuid.UUID):
-    db_cafe = get_cafe_by_id(db, cafe_id, owner_id)
+async def update_cafe(db: AsyncSession, cafe_id: uuid.UUID, cafe: cafe_schema.CafeUpdate, owner_id: uuid.UUID):
+    db_cafe = await get_cafe_by_id(db, cafe_id, owner_id)
     db_cafe.cafeName = cafe.cafeName
-    db.commit()
-    db.refresh(db_cafe)
+    await bump_management_version(db, cafe_id)
+    await db.commit()
+    await db.refresh(db_cafe)
+    live_state.invalidate_cafe(cafe_id)
+    pricing_plan_cache.invalidate(cafe_id)
     return db_cafe
 
-def delete_cafe(db: Session, cafe_id: uuid.UUID, owner_id: uuid.UUID):
-    db_cafe = get_cafe_by_id(db, cafe_id, owner_id)
-    db.delete(db_cafe)
-    db.commit()
+async def delete_cafe(db: AsyncSession, cafe_id: uuid.UUID, owner_id: uuid.UUID):
+    db_cafe = await get_cafe_by_id(db, cafe_id, owner_id)
+    await db.delete(db_cafe)
+    await db.commit()
+    live_state.invalidate_cafe(cafe_id)
+    pricing_plan_cache.invalidate(cafe_id)
+    # Cafe ke saath uska staff bhi delete hua
+    principal_cache.invalidate_cafe(cafe_id)
+    metrics.forget_cafe(cafe_id)
     return {"message": "Cafe deleted successfully"}
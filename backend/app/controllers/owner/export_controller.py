@@ -0,0 +1,164 @@
+import csv
+import enum
+import io
+import uuid
+from datetime import datetime, date, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.core import local_time
+from app.db.db import AsyncSessionLocal
+from app.models import models
+
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    "payment_id", "paymentTimestamp", "paymentMethod", "totalAmount",
+    "session_id", "startTime", "endTime", "current_players",
+    "table_id", "tableName", "tableType",
+    "staff_id", "staffName",
+    "cafe_id", "cafeName",
+]
+
+
+async def resolve_export_cafes(db: AsyncSession, owner_id: uuid.UUID, cafe_id: uuid.UUID | None):
+    """Owner ke cafes jinka data export hoga (ek cafe diya ho toh ownership check ke saath)."""
+    stmt = select(models.Cafe.id).where(models.Cafe.owner_id == owner_id)
+    if cafe_id:
+        stmt = stmt.where(models.Cafe.id == cafe_id)
+    cafe_ids = (await db.scalars(stmt)).all()
+    if cafe_id and not cafe_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found or not owned by you")
+    return cafe_ids
+
+
+def _export_query(cafe_ids, start_date: date | None, end_date: date | None):
+    stmt = (
+        select(
+            models.Payment.id, models.Payment.paymentTimestamp, models.Payment.paymentMethod, models.Payment.totalAmount,
+            models.GameSession.id, models.GameSession.startTime, models.GameSession.endTime, models.GameSession.current_players,
+            models.Table.id, models.Table.tableName, models.Table.tableType,
+            models.Staff.id, models.Staff.staffName,
+            models.Cafe.id, models.Cafe.cafeName,
+        )
+        .join(models.GameSession, models.Payment.session_id == models.GameSession.id)
+        .join(models.GameSession.table)
+        .join(models.Cafe, models.Table.cafe_id == models.Cafe.id)
+        .outerjoin(models.Staff, models.GameSession.staff_id == models.Staff.id)
+        .where(models.Table.cafe_id.in_(cafe_ids))
+        .order_by(models.Payment.paymentTimestamp)
+    )
+    # Dates ANALYTICS_TIMEZONE mein, baaki analytics jaisa; end_date bhi shamil
+    if start_date:
+        stmt = stmt.where(models.Payment.paymentTimestamp >= local_time.start_of_day(start_date))
+    if end_date:
+        stmt = stmt.where(models.Payment.paymentTimestamp < local_time.start_of_day(end_date + timedelta(days=1)))
+    return stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _parquet_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+async def _stream_rows(cafe_ids, start_date, end_date):
+    """
+    Export query ke rows chunks mein. Injected get_db session yahan use nahi ho sakta:
+    FastAPI yield dependencies ko StreamingResponse ki body chalne se pehle hi close kar
+    deta hai, toh stream shuru hote hi wo session band mil jaata. Isliye generator apna
+    AsyncSessionLocal kholta hai aur stream khatam (ya client disconnect) hone par band
+    karta hai. Postgres par ye server-side cursor hota hai, toh memory chunk jitni hi
+    rehti hai.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_export_query(cafe_ids, start_date, end_date))
+        async for chunk in result.partitions(EXPORT_CHUNK_SIZE):
+            yield chunk
+
+
+async def stream_payments_csv(cafe_ids, start_date: date | None, end_date: date | None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # Header turant bhej dein, taaki download foran shuru ho
+    yield buffer.getvalue().encode()
+    async for rows in _stream_rows(cafe_ids, start_date, end_date):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter ka output yahan jama hota hai; har row group ke baad drain hota hai."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    string, ts = pa.string(), pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("payment_id", string), ("paymentTimestamp", ts), ("paymentMethod", string), ("totalAmount", pa.decimal128(10, 2)),
+        ("session_id", string), ("startTime", ts), ("endTime", ts), ("current_players", pa.int32()),
+        ("table_id", string), ("tableName", string), ("tableType", string),
+        ("staff_id", string), ("staffName", string),
+        ("cafe_id", string), ("cafeName", string),
+    ])
+
+
+async def stream_payments_parquet(cafe_ids, start_date: date | None, end_date: date | None):
+    # pyarrow sirf Parquet export ke liye chahiye, baaki app iske bina chalta hai
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in _stream_rows(cafe_ids, start_date, end_date):
+            columns = zip(*rows)
+            batch = pa.RecordBatch.from_arrays([
+                pa.array([_parquet_value(value) for value in column], type=field.type)
+                for column, field in zip(columns, schema)
+            ], schema=schema)
+            # Har chunk ek row group; bytes turant client ko
+            writer.write_batch(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
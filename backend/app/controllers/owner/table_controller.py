@@ -1,54 +1,87 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models import models
 from app.schemas import table as table_schema, pricing as pricing_schema
+from app.cache import live_state
+from app.cache.pricing_plans import pricing_plan_cache
+from app.controllers.owner.cafe_controller import bump_management_version, get_management_version
+from app.core.etags import make_stable_etag
 
 # --- Table Management Logic ---
 
-def create_table_for_cafe(db: Session, table: table_schema.TableCreate, owner_id: str):
+async def create_table_for_cafe(db: AsyncSession, table: table_schema.TableCreate, owner_id: str):
     # Verify the owner actually owns the cafe
-    db_cafe = db.query(models.Cafe).filter(models.Cafe.id == table.cafe_id, models.Cafe.owner_id == owner_id).first()
+    db_cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == table.cafe_id, models.Cafe.owner_id == owner_id))
     if not db_cafe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found or not owned by you")
     
     new_table = models.Table(**table.model_dump())
     db.add(new_table)
-    db.commit()
-    db.refresh(new_table)
+    await bump_management_version(db, table.cafe_id)
+    await db.commit()
+    await db.refresh(new_table)
+    live_state.invalidate_cafe(new_table.cafe_id)
     return new_table
 
-def get_tables_for_cafe(db: Session, cafe_id: str, owner_id: str):
+async def get_tables_for_cafe(db: AsyncSession, cafe_id: str, owner_id: str):
     # Verify ownership
-    db_cafe = db.query(models.Cafe).filter(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id).first()
+    db_cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id))
     if not db_cafe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found or not owned by you")
         
-    return db.query(models.Table).filter(models.Table.cafe_id == cafe_id).all()
+    return (await db.scalars(select(models.Table).where(models.Table.cafe_id == cafe_id))).all()
+
+async def get_tables_etag(db: AsyncSession, cafe_id: str, owner_id: str) -> str:
+    """
+    Tables list ka ETag: cafe ka management_version plus jo tables abhi Available nahi hain.
+    Status har session start/end par badalta hai, usse version bump nahi hota (hot path
+    par cafe row lock ho jata), toh woh yahin ek narrow query mein aa jata hai.
+    """
+    rows = (await db.execute(
+        select(models.Cafe.management_version, models.Table.id, models.Table.status)
+        .outerjoin(models.Table, and_(
+            models.Table.cafe_id == models.Cafe.id,
+            models.Table.status != models.TableStatus.available,
+        ))
+        .where(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id)
+        .order_by(models.Table.id)
+    )).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found or not owned by you")
+    busy = (f"{table_id}:{table_status.value}" for _, table_id, table_status in rows if table_id is not None)
+    return make_stable_etag("tables", cafe_id, rows[0].management_version, *busy)
 
 # --- Pricing Management Logic ---
 
-def get_pricing_for_cafe(db: Session, cafe_id: str, owner_id: str):
+async def get_pricing_for_cafe(db: AsyncSession, cafe_id: str, owner_id: str):
     # Verify ownership
-    db_cafe = db.query(models.Cafe).filter(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id).first()
+    db_cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == cafe_id, models.Cafe.owner_id == owner_id))
     if not db_cafe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found")
         
     # Return all pricing rules for the cafe
-    return db.query(models.Pricing).filter(models.Pricing.cafe_id == cafe_id).all() or []
+    return (await db.scalars(select(models.Pricing).where(models.Pricing.cafe_id == cafe_id))).all() or []
+
+async def get_pricing_etag(db: AsyncSession, cafe_id: str, owner_id: str) -> str:
+    version = await get_management_version(db, cafe_id, owner_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found")
+    return make_stable_etag("pricing", cafe_id, version)
 
 # --- CORRECTED PRICING LOGIC ---
-def set_pricing_for_cafe(db: Session, pricing: pricing_schema.PricingSet, owner_id: str):
+async def set_pricing_for_cafe(db: AsyncSession, pricing: pricing_schema.PricingSet, owner_id: str):
     # Verify ownership
-    db_cafe = db.query(models.Cafe).filter(models.Cafe.id == pricing.cafe_id, models.Cafe.owner_id == owner_id).first()
+    db_cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == pricing.cafe_id, models.Cafe.owner_id == owner_id))
     if not db_cafe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found")
 
     # Check if a pricing rule for this table type already exists for this cafe
-    db_pricing = db.query(models.Pricing).filter(
+    db_pricing = await db.scalar(select(models.Pricing).where(
         models.Pricing.cafe_id == pricing.cafe_id,
         models.Pricing.tableType == pricing.tableType
-    ).first()
+    ))
 
     if db_pricing:
         # If it exists, update it
@@ -59,9 +92,12 @@ def set_pricing_for_cafe(db: Session, pricing: pricing_schema.PricingSet, owner_
         # If it does not exist, create a new one
         db_pricing = models.Pricing(**pricing.model_dump())
         db.add(db_pricing)
+    await bump_management_version(db, pricing.cafe_id)
     
     # This is the crucial step that was missing: commit the changes to the database
-    db.commit()
-    db.refresh(db_pricing)
+    await db.commit()
+    await db.refresh(db_pricing)
+    live_state.invalidate_cafe(pricing.cafe_id)
+    pricing_plan_cache.invalidate(pricing.cafe_id)
     return db_pricing
 
@@ -1,57 +1,249 @@
-from sqlalchemy.orm import Session
+import asyncio
+import math
+import time
+from itertools import groupby
+from fastapi import Request
+from sqlalchemy import select, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.base import NO_VALUE
 from datetime import datetime, timezone
 from app.models import models
+from app.billing import player_timeline
+from app.core import fast_json
+from app.core.config import settings
+from app.core.etags import make_etag
+from app.cache.live_state import table_state_cache
+from app.cache.pricing_plans import pricing_plan_cache
+from app.realtime.broker import dashboard_broker
+from app.core import metrics
 
-def get_staff_dashboard_data(db: Session, staff: models.Staff): # Yahaan 'staff' object ek Owner bhi ho sakta hai
-    # --- NAYA, CORRECTED LOGIC ---
-    # Hum pehle check karenge ki 'staff' object ke paas .cafe attribute hai ya nahi,
-    # jo hamare dependency ne add kiya tha.
-    if hasattr(staff, 'cafe') and staff.cafe is not None:
-        cafe = staff.cafe
-        cafe_id = cafe.id
-    else:
-        # Agar yeh ek normal staff member hai, toh uski default properties use karein
-        cafe = staff.cafe
-        cafe_id = staff.cafe_id
-
-    tables = db.query(models.Table).filter(models.Table.cafe_id == cafe_id).order_by(models.Table.tableName).all()
-    pricing_rules = db.query(models.Pricing).filter(models.Pricing.cafe_id == cafe_id).all()
+HEARTBEAT_SECONDS = 15
+LIVE_STATE_LOAD_ATTEMPTS = 2
 
-    table_statuses = []
-    for table in tables:
-        status_info = {
+def _format_elapsed(start_time: datetime, now: datetime) -> str:
+    elapsed = now - start_time
+    hours, remainder = divmod(elapsed.total_seconds(), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}"
+
+def _resolve_cafe(staff: models.Staff):
+    """
+    Owner-as-staff ke case mein dependency ne .cafe attach kiya hota hai, usko prefer karein.
+    Relationship pehle se loaded na ho toh sirf cafe_id use karte hain (koi lazy load nahi).
+    """
+    cafe = inspect(staff).attrs.cafe.loaded_value
+    if cafe is not NO_VALUE and cafe is not None:
+        return cafe, cafe.id
+    return None, staff.cafe_id
+
+async def load_cafe_live_state(db: AsyncSession, cafe_id, cafe: models.Cafe = None) -> dict:
+    """
+    Builds the live dashboard state of a cafe straight from the database.
+    Used to (re)populate the live-state cache, e.g. after a restart.
+    """
+    if cafe is None:
+        cafe = await db.scalar(select(models.Cafe).where(models.Cafe.id == cafe_id))
+
+    # Table row par hi active session ka pointer hai, aur session par current player count:
+    # ek simple join, query count cafe ke size par depend nahi karta.
+    rows = (await db.execute(select(models.Table, models.GameSession).outerjoin(
+        models.GameSession, models.Table.active_session_id == models.GameSession.id
+    ).where(
+        models.Table.cafe_id == cafe_id
+    ).order_by(models.Table.tableName, models.Table.id))).all()
+
+    pricing_rules = (await db.scalars(select(models.Pricing).where(models.Pricing.cafe_id == cafe_id))).all()
+
+    tables = {}
+    for table, active_session in rows:
+        table_state = {
             "id": table.id,
             "tableName": table.tableName,
             "tableType": table.tableType.value,
-            "status": table.status.value
+            "status": table.status.value,
+            "current_session_id": None,
+            "startTime": None,
+            "current_players": None,
+            "extra_player_us": None,
+            "players_since": None,
         }
-        if table.status == models.TableStatus.in_use:
-            active_session = db.query(models.GameSession).filter(
-                models.GameSession.table_id == table.id,
-                models.GameSession.endTime == None
-            ).first()
-            
-            if active_session:
-                now = datetime.now(timezone.utc)
-                elapsed = now - active_session.startTime
-                
-                hours, remainder = divmod(elapsed.total_seconds(), 3600)
-                minutes, seconds = divmod(remainder, 60)
-
-                status_info["current_session_id"] = active_session.id
-                status_info["startTime"] = active_session.startTime
-                status_info["elapsed_time"] = f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}"
-                
-                latest_player_change = db.query(models.PlayerChange).filter(
-                    models.PlayerChange.session_id == active_session.id
-                ).order_by(models.PlayerChange.timestamp.desc()).first()
-                status_info["current_players"] = latest_player_change.numberOfPlayers if latest_player_change else 0
-        
-        table_statuses.append(status_info)
+        if table.status == models.TableStatus.in_use and active_session:
+            table_state["current_session_id"] = active_session.id
+            table_state["startTime"] = active_session.startTime
+            table_state["current_players"] = active_session.current_players or 0
+
+        tables[str(table.id)] = table_state
+
+    # Running sessions ki player timeline ek hi query mein (sirf rebuild par), live quote ke liye
+    running = {
+        str(state["current_session_id"]): state for state in tables.values() if state["current_session_id"] is not None
+    }
+    if running:
+        timeline_rows = (await db.execute(
+            select(models.PlayerChange.session_id, models.PlayerChange.timestamp, models.PlayerChange.numberOfPlayers)
+            .where(models.PlayerChange.session_id.in_([state["current_session_id"] for state in running.values()]))
+            .order_by(models.PlayerChange.session_id, models.PlayerChange.timestamp)
+        )).all()
+        for session_id, rows in groupby(timeline_rows, key=lambda row: str(row.session_id)):
+            state = running[session_id]
+            changes = [(row.timestamp, row.numberOfPlayers) for row in rows]
+            players_since = max(changes[-1][0], state["startTime"])
+            extra_player_time = player_timeline.integrate_extra_players(changes, state["startTime"], players_since)
+            state["extra_player_us"] = extra_player_time.extra_player_us if extra_player_time else 0
+            state["players_since"] = players_since
+
+    # DB se fresh state aayi hai, isi se active tables gauge bhi sync kar lein
+    metrics.set_active_tables(cafe_id, sum(1 for t in tables.values() if t["current_session_id"] is not None))
 
     return {
-        "cafeName": cafe.cafeName, 
+        "cafeName": cafe.cafeName if cafe else "",
+        "tables": tables,
+        "pricing_rules": [
+            {
+                "tableType": rule.tableType.value,
+                "hourPrice": rule.hourPrice,
+                "halfHourPrice": rule.halfHourPrice,
+                "extraPlayerPrice": rule.extraPlayerPrice,
+            }
+            for rule in pricing_rules
+        ],
+    }
+
+async def _get_live_state(db: AsyncSession, staff: models.Staff):
+    cafe, cafe_id = _resolve_cafe(staff)
+
+    # Warm cache se seedha jawab, DB ko touch kiye bina
+    state, version = table_state_cache.get_versioned(cafe_id)
+    for _ in range(LIVE_STATE_LOAD_ATTEMPTS):
+        if version is not None:
+            break
+        # Load ke dauraan koi write commit hua toh snapshot shayad usse pehle ka hai: store nahi
+        # hota (version None), dobara load karte hain. Dono baar race ho toh state bina cache ke.
+        generation = table_state_cache.write_generation(cafe_id)
+        state = await load_cafe_live_state(db, cafe_id, cafe)
+        version = table_state_cache.put(cafe_id, state, generation)
+    return cafe_id, state, version
+
+def _dashboard_payload(state: dict, plans: dict, now: datetime) -> dict:
+    """Exactly the StaffDashboardResponse fields (cache ke internal fields bahar)."""
+    table_statuses = []
+    for table_state in state["tables"].values():
+        elapsed_time = current_bill = None
+        if table_state["startTime"] is not None:
+            elapsed_time = _format_elapsed(table_state["startTime"], now)
+            quote = _quote_running_table(table_state, plans, now)
+            current_bill = quote["total_amount_due"] if quote else None
+        table_statuses.append({
+            "id": table_state["id"],
+            "tableName": table_state["tableName"],
+            "tableType": table_state["tableType"],
+            "status": table_state["status"],
+            "current_session_id": table_state["current_session_id"],
+            "startTime": table_state["startTime"],
+            "elapsed_time": elapsed_time,
+            "current_players": table_state["current_players"],
+            "current_bill": current_bill,
+        })
+
+    return {
+        "cafeName": state["cafeName"], 
         "tables": table_statuses,
-        "pricing_rules": pricing_rules
+        "pricing_rules": [
+            {"tableType": rule["tableType"], "hourPrice": rule["hourPrice"], "halfHourPrice": rule["halfHourPrice"]}
+            for rule in state["pricing_rules"]
+        ],
+        "generated_at": now,
     }
 
+async def render_staff_dashboard(db: AsyncSession, staff: models.Staff): # Yahaan 'staff' object ek Owner bhi ho sakta hai
+    """
+    The dashboard as (etag, JSON bytes). Bytes are cached per live-state version
+    and DASHBOARD_SNAPSHOT_SECONDS window, so repeat polls of an unchanged cafe
+    cost a dict lookup: no DB, no serialization. elapsed_time / current_bill are
+    as of `generated_at`, at most one window old.
+    """
+    _, cafe_id = _resolve_cafe(staff)
+    window = settings.DASHBOARD_SNAPSHOT_SECONDS
+    bucket = int(time.time() // window) if window > 0 else None
+
+    version = table_state_cache.version(cafe_id)
+    if version is not None and bucket is not None:
+        rendered = table_state_cache.get_rendered(cafe_id, version, bucket)
+        if rendered is not None:
+            return rendered["etag"], rendered["body"]
+
+    cafe_id, state, version = await _get_live_state(db, staff)
+    # Warm pricing plan cache par koi query nahi; miss par poore cafe ke liye ek
+    plans = await pricing_plan_cache.get_plans(db, cafe_id)
+    body = fast_json.dumps(_dashboard_payload(state, plans, datetime.now(timezone.utc)))
+    if bucket is None or version is None:
+        return None, body
+    etag = make_etag(version, bucket)
+    table_state_cache.put_rendered(cafe_id, version, bucket, etag, body)
+    return etag, body
+
+def _quote_running_table(table_state: dict, plans: dict, now: datetime):
+    """
+    Bill the running session would get if it ended `now`, same strategy functions
+    as end_existing_session. Read-only: kuch likhte nahi. None agar pricing set nahi hai.
+    """
+    plan = plans.get(models.TableType(table_state["tableType"]))
+    if plan is None or plan.calculate is None:
+        return None
+    start_time = table_state["startTime"]
+    players = table_state["current_players"] or 0
+    duration_minutes = math.ceil((now - start_time).total_seconds() / 60)
+
+    extra_player_time = None
+    if table_state.get("players_since") is not None:
+        extra_player_time = player_timeline.running_extra_players(
+            table_state["extra_player_us"], table_state["players_since"], players, start_time, now
+        )
+    return plan.bill(duration_minutes, players, extra_player_time)
+
+async def get_active_table_quotes(db: AsyncSession, staff: models.Staff):
+    """Quotes every in-use table of the staff member's cafe in one call (live state + cached plans)."""
+    cafe_id, state, _ = await _get_live_state(db, staff)
+    plans = await pricing_plan_cache.get_plans(db, cafe_id)
+    now = datetime.now(timezone.utc)
+
+    quotes = []
+    for table_state in state["tables"].values():
+        if table_state["current_session_id"] is None:
+            continue
+        quote = _quote_running_table(table_state, plans, now)
+        if quote is None:
+            continue
+        quotes.append({
+            "table_id": table_state["id"],
+            "tableName": table_state["tableName"],
+            "session_id": str(table_state["current_session_id"]),
+            "startTime": table_state["startTime"],
+            **quote,
+        })
+    return {"quoted_at": now, "quotes": quotes}
+
+def get_dashboard_cafe_id(staff: models.Staff):
+    _, cafe_id = _resolve_cafe(staff)
+    return cafe_id
+
+async def stream_dashboard_updates(request: Request, cafe_id):
+    """
+    Server-Sent Events stream of per-table deltas for one cafe.
+    Client pehle /dashboard se poora grid leta hai, phir yahan se sirf changes aate hain.
+    """
+    queue = dashboard_broker.subscribe(cafe_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Proxies connection band na karein isliye ek SSE comment
+                yield ": keep-alive\n\n"
+                continue
+            yield message
+    finally:
+        dashboard_broker.unsubscribe(cafe_id, queue)
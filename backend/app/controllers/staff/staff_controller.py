@@ -1,24 +1,30 @@
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.cache import live_state
+from app.cache.principals import principal_cache
+from app.controllers.owner.cafe_controller import bump_management_version, get_management_version
+from app.core import metrics
+from app.core.etags import make_stable_etag
 from app.models import models
 from app.schemas import staff as staff_schema
-from app.security.Hash import Hasher
+from app.security.Hash import pin_hash_pool
 
-def get_staff_and_verify_ownership(db: Session, staff_id: uuid.UUID, owner_id: uuid.UUID):
+async def get_staff_and_verify_ownership(db: AsyncSession, staff_id: uuid.UUID, owner_id: uuid.UUID):
     """
     Helper function to get a staff member and verify the current owner has permission to manage them.
     """
-    staff = db.query(models.Staff).filter(models.Staff.id == staff_id).first()
+    staff = await db.scalar(select(models.Staff).where(models.Staff.id == staff_id))
     if not staff:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Staff not found")
     
     # Check if the owner owns the cafe this staff belongs to
-    cafe = db.query(models.Cafe).filter(
+    cafe = await db.scalar(select(models.Cafe).where(
         models.Cafe.id == staff.cafe_id,
         models.Cafe.owner_id == owner_id
-    ).first()
+    ))
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -27,12 +33,12 @@ def get_staff_and_verify_ownership(db: Session, staff_id: uuid.UUID, owner_id: u
     return staff
 
 
-def create_staff_for_cafe(db: Session, staff: staff_schema.StaffCreate, owner_id: uuid.UUID):
+async def create_staff_for_cafe(db: AsyncSession, staff: staff_schema.StaffCreate, owner_id: uuid.UUID):
     # 1. Verify the owner owns the cafe they're adding staff to
-    cafe = db.query(models.Cafe).filter(
+    cafe = await db.scalar(select(models.Cafe).where(
         models.Cafe.id == staff.cafe_id,
         models.Cafe.owner_id == owner_id
-    ).first()
+    ))
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,8 +46,8 @@ def create_staff_for_cafe(db: Session, staff: staff_schema.StaffCreate, owner_id
         )
 
     # 2. Check if the mobile number is already in use by an owner or other staff
-    existing_user_owner = db.query(models.Owner).filter(models.Owner.mobileNo == staff.mobileNo).first()
-    existing_user_staff = db.query(models.Staff).filter(models.Staff.mobileNo == staff.mobileNo).first()
+    existing_user_owner = await db.scalar(select(models.Owner).where(models.Owner.mobileNo == staff.mobileNo))
+    existing_user_staff = await db.scalar(select(models.Staff).where(models.Staff.mobileNo == staff.mobileNo))
     if existing_user_owner or existing_user_staff:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,7 +55,7 @@ def create_staff_for_cafe(db: Session, staff: staff_schema.StaffCreate, owner_id
         )
 
     # 3. Hash the pin
-    hashed_pin = Hasher.get_password_hash(staff.pin)
+    hashed_pin = await pin_hash_pool.hash(staff.pin)
 
     # 4. Create the new staff member
     db_staff = models.Staff(
@@ -60,45 +66,79 @@ def create_staff_for_cafe(db: Session, staff: staff_schema.StaffCreate, owner_id
     )
     
     db.add(db_staff)
-    db.commit()
-    db.refresh(db_staff)
+    await bump_management_version(db, staff.cafe_id)
+    await db.commit()
+    await db.refresh(db_staff)
     
     return db_staff
 
-def get_staff_by_cafe(db: Session, cafe_id: uuid.UUID, owner_id: uuid.UUID):
+async def get_staff_by_cafe(db: AsyncSession, cafe_id: uuid.UUID, owner_id: uuid.UUID):
     # Verify owner owns the cafe before listing its staff
-    cafe = db.query(models.Cafe).filter(
+    cafe = await db.scalar(select(models.Cafe).where(
         models.Cafe.id == cafe_id,
         models.Cafe.owner_id == owner_id
-    ).first()
+    ))
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cafe not found or you do not have permission to access it."
         )
-    return db.query(models.Staff).filter(models.Staff.cafe_id == cafe_id).all()
+    return (await db.scalars(select(models.Staff).where(models.Staff.cafe_id == cafe_id))).all()
 
-def update_staff_details(db: Session, staff_id: uuid.UUID, staff_update: staff_schema.StaffUpdate, owner_id: uuid.UUID):
-    db_staff = get_staff_and_verify_ownership(db, staff_id, owner_id)
+async def get_staff_etag(db: AsyncSession, cafe_id: uuid.UUID, owner_id: uuid.UUID) -> str:
+    version = await get_management_version(db, cafe_id, owner_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cafe not found or you do not have permission to access it."
+        )
+    return make_stable_etag("staff", cafe_id, version)
+
+async def update_staff_details(db: AsyncSession, staff_id: uuid.UUID, staff_update: staff_schema.StaffUpdate, owner_id: uuid.UUID):
+    db_staff = await get_staff_and_verify_ownership(db, staff_id, owner_id)
 
     # Check if the new mobile number is already taken by another user
     if staff_update.mobileNo != db_staff.mobileNo:
-        existing_user_owner = db.query(models.Owner).filter(models.Owner.mobileNo == staff_update.mobileNo).first()
-        existing_user_staff = db.query(models.Staff).filter(models.Staff.mobileNo == staff_update.mobileNo).first()
+        existing_user_owner = await db.scalar(select(models.Owner).where(models.Owner.mobileNo == staff_update.mobileNo))
+        existing_user_staff = await db.scalar(select(models.Staff).where(models.Staff.mobileNo == staff_update.mobileNo))
         if existing_user_owner or existing_user_staff:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="A user with this mobile number already exists."
             )
 
+    old_mobileNo = db_staff.mobileNo
     db_staff.staffName = staff_update.staffName
     db_staff.mobileNo = staff_update.mobileNo
-    db.commit()
-    db.refresh(db_staff)
+    await bump_management_version(db, db_staff.cafe_id)
+    await db.commit()
+    await db.refresh(db_staff)
+    # Purane (aur naye) number wale cached principals ab stale hain
+    principal_cache.invalidate_subject(old_mobileNo)
+    principal_cache.invalidate_subject(db_staff.mobileNo)
     return db_staff
 
-def delete_staff_member(db: Session, staff_id: uuid.UUID, owner_id: uuid.UUID):
-    db_staff = get_staff_and_verify_ownership(db, staff_id, owner_id)
-    db.delete(db_staff)
-    db.commit()
+async def delete_staff_member(db: AsyncSession, staff_id: uuid.UUID, owner_id: uuid.UUID):
+    db_staff = await get_staff_and_verify_ownership(db, staff_id, owner_id)
+    mobileNo = db_staff.mobileNo
+    # Staff ke sessions cascade se delete honge; jo abhi chal rahe hain unke tables pehle free karein
+    freed = await db.execute(
+        update(models.Table).where(models.Table.active_session_id.in_(
+            select(models.GameSession.id).where(
+                models.GameSession.staff_id == db_staff.id, models.GameSession.endTime.is_(None)
+            )
+        )).values(status=models.TableStatus.available, active_session_id=None)
+        .returning(models.Table.cafe_id)
+        .execution_options(synchronize_session=False)
+    )
+    # Har freed table ki ek row (set nahi): gauge har table ke liye ghatna chahiye
+    freed_cafe_ids = freed.scalars().all()
+    await db.delete(db_staff)
+    await bump_management_version(db, db_staff.cafe_id)
+    await db.commit()
+    principal_cache.invalidate_subject(mobileNo)
+    for cafe_id in freed_cafe_ids:
+        metrics.record_table_freed(cafe_id)
+    for cafe_id in set(freed_cafe_ids):
+        live_state.invalidate_cafe(cafe_id)
     return {"message": "Staff member deleted successfully"}
@@ -5,8 +5,54 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./billiards.db")
+    # Async driver wala URL; set na ho toh DATABASE_URL se derive hota hai (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: str | None = os.getenv("ASYNC_DATABASE_URL")
+
+    # --- Connection pool (har worker process ka apna pool hota hai) ---
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    # -1 = kabhi recycle nahi; managed Postgres idle connections kaat deta hai toh isse kam rakhein
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # Isse slow requests (ms) slowest queries ke saath log hote hain
+    SLOW_REQUEST_THRESHOLD_MS: float = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+    # /metrics aur /health/db-pool ke liye bearer token (Prometheus `authorization` config); set na ho toh dono band (404)
+    METRICS_TOKEN: str | None = os.getenv("METRICS_TOKEN") or None
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "a_very_secret_key")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 # 1 day
 
+    # --- PIN hashing (bcrypt) ---
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Har app worker ke apne hashing processes; 0 = thread pool fallback
+    PIN_HASH_WORKERS: int = int(os.getenv("PIN_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # Isse zyada logins queue mein hon toh 503 + Retry-After
+    PIN_HASH_MAX_PENDING: int = int(os.getenv("PIN_HASH_MAX_PENDING", "64"))
+
+    # Analytics ke din / ghante (rollup buckets, "today", date filters) is IANA timezone mein.
+    # Alembic backfill bhi yahi padhta hai, toh migration chalane wali machine ka timezone matter nahi karta.
+    ANALYTICS_TIMEZONE: str = os.getenv("ANALYTICS_TIMEZONE", "UTC")
+
+    # --- Live table-state cache (staff dashboard) ---
+    LIVE_STATE_MAX_CAFES: int = int(os.getenv("LIVE_STATE_MAX_CAFES", "500"))
+    # Multiple workers ke case mein stale entries isse zyada der tak nahi rehti
+    LIVE_STATE_TTL_SECONDS: int = int(os.getenv("LIVE_STATE_TTL_SECONDS", "60"))
+    # Serialized dashboard bytes isse zyada purane nahi hote (elapsed_time / current_bill); 0 = har poll par naya
+    DASHBOARD_SNAPSHOT_SECONDS: int = int(os.getenv("DASHBOARD_SNAPSHOT_SECONDS", "15"))
+    # Compiled pricing plans: billing har baar cafes.management_version se check karta hai; yeh TTL sirf
+    # dashboard quotes jaise display reads ke liye hai (pricing badalne par isi process mein turant invalidate)
+    PRICING_PLAN_TTL_SECONDS: int = int(os.getenv("PRICING_PLAN_TTL_SECONDS", "60"))
+    PRICING_PLAN_CACHE_MAX_CAFES: int = int(os.getenv("PRICING_PLAN_CACHE_MAX_CAFES", "500"))
+
+    # --- Idempotency-Key replay (session start / end, payments) ---
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+    # --- Authenticated principal cache (0 = disabled) ---
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
 settings = Settings()
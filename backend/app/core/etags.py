@@ -0,0 +1,46 @@
+import hashlib
+import uuid
+
+from fastapi import Request, Response
+
+# Restart ke baad counters phir 1 se shuru hote hain; boot id se purane ETags match nahi honge
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join([_BOOT_ID, *(str(part) for part in parts)]) + '"'
+
+
+def make_stable_etag(*parts) -> str:
+    """
+    ETag for values that come from the database (e.g. cafes.management_version):
+    no boot id, so every worker and every restart gives the same tag.
+    """
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return '"' + digest.hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """If-None-Match check (weak comparison, jaisa GET ke liye RFC 9110 kehta hai)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+# OpenAPI docs ke liye, conditional GET routes par
+NOT_MODIFIED_RESPONSES = {304: {"description": "Unchanged since the ETag sent in If-None-Match"}}
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Sets ETag / Cache-Control on the route's response and returns a bodiless 304
+    if the client already has this version; None means build the full response.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
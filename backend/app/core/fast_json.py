@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson nahi hai toh stdlib json, output wahi rehta hai
+    orjson = None
+
+
+def _default(value):
+    # Pydantic ki JSON output jaisa: Decimal string ("70.00"), baaki orjson khud sambhalta hai
+    if isinstance(value, Decimal):
+        return str(value)
+    if orjson is None:
+        if isinstance(value, UUID):
+            return str(value)
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, datetime):
+            iso = value.isoformat()
+            return iso[:-6] + "Z" if iso.endswith("+00:00") else iso
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for hot read endpoints that skips response_model validation.
+
+    Routes return this with a payload already shaped like their response_model
+    (the model stays on the route for the OpenAPI docs). Decimal, UUID, enum and
+    datetime values serialize exactly as the Pydantic path would.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import re
+
+from app.cache.idempotency import idempotency_store, NEW, IN_PROGRESS, MISMATCH
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Sirf yahi POST endpoints Idempotency-Key samajhte hain
+IDEMPOTENT_PATHS = re.compile(
+    r"^/api/v1/staff/sessions/(start|end/[^/]+|bulk/start|bulk/end)$|^/api/v1/staff/payments/?$"
+)
+
+
+def _json_response(status: int, detail: str, extra_headers=()):
+    body = json.dumps({"detail": detail}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *extra_headers]
+    return status, headers, body
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key support for session start / end and payment logging.
+
+    A POST carrying the header is keyed by (Authorization, path, key) and
+    fingerprinted by its body. The first successful response is stored and
+    replayed for retries with `Idempotent-Replayed: true`; reusing a key with a
+    different body is a 422, and a retry while the first attempt is still
+    running gets a 409 with Retry-After.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not IDEMPOTENT_PATHS.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        raw_key = headers.get(HEADER)
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            await self._send(send, *_json_response(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"))
+            return
+
+        # Body ek baar padh ke fingerprint, phir app ko wahi body dobara dete hain
+        body, more_body = b"", True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        caller = hashlib.sha256(headers.get(b"authorization", b"")).hexdigest()
+        key = (caller, scope["path"], raw_key.decode("latin-1"))
+        state, stored = idempotency_store.reserve(key, hashlib.sha256(body).hexdigest())
+        if state == MISMATCH:
+            await self._send(send, *_json_response(422, "Idempotency-Key was already used with a different request"))
+            return
+        if state == IN_PROGRESS:
+            await self._send(send, *_json_response(
+                409, "A request with this Idempotency-Key is still in progress", [(b"retry-after", b"1")]
+            ))
+            return
+        if state != NEW:
+            await self._send(send, stored["status"], stored["headers"] + [(b"idempotent-replayed", b"true")], stored["body"])
+            return
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "headers": [], "body": b""}
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (name, value) for name, value in message.get("headers", [])
+                    if name.lower() not in (b"server-timing", b"set-cookie")
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, send_and_capture)
+        finally:
+            if response["status"] is not None and 200 <= response["status"] < 300:
+                idempotency_store.complete(key, response)
+            else:
+                idempotency_store.release(key)
+
+    @staticmethod
+    async def _send(send, status: int, headers: list, body: bytes):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
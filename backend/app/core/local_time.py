@@ -0,0 +1,27 @@
+"""
+Business-day time. Analytics, revenue rollup buckets and date filters all use
+settings.ANALYTICS_TIMEZONE, so a payment falls on the same day and hour
+whichever machine computes it (app worker, Alembic backfill, CLI rebuild).
+"""
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+ZONE = ZoneInfo(settings.ANALYTICS_TIMEZONE)
+
+
+def today() -> date:
+    return datetime.now(ZONE).date()
+
+
+def start_of_day(day: date) -> datetime:
+    """`day` ki aadhi raat, ANALYTICS_TIMEZONE mein (aware datetime, DB timestamps se compare ke liye)."""
+    return datetime.combine(day, time.min, tzinfo=ZONE)
+
+
+def localize(timestamp: datetime) -> datetime:
+    # Naive timestamps (SQLite) pehle se hi local maane jaate hain
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(ZONE)
@@ -0,0 +1,235 @@
+import bisect
+import threading
+import time
+
+from app.db.pool_metrics import pool_status
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _le(bound) -> str:
+    return f'le="{bound}"'
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value) -> list:
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, floor: float | None = None, **labels):
+        key = self._key(labels)
+        with self._lock:
+            value = self._values.get(key, 0) + amount
+            self._values[key] = value if floor is None else max(value, floor)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry["counts"][index] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def _render_sample(self, key, entry) -> list:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, entry["counts"]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, _le(bound))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, _le('+Inf'))} {entry['count']}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {entry['sum']}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {entry['count']}")
+        return lines
+
+
+# --- HTTP ---
+http_request_duration = Histogram(
+    "billiards_http_request_duration_seconds", "Request latency by route template.", ("method", "route")
+)
+http_requests = Counter(
+    "billiards_http_requests_total", "Requests by route template and status code.", ("method", "route", "status")
+)
+http_request_errors = Counter(
+    "billiards_http_request_errors_total", "Requests that ended in a 5xx or an unhandled exception.", ("method", "route")
+)
+
+# --- Domain ---
+sessions_started = Counter("billiards_sessions_started_total", "Game sessions started.")
+sessions_ended = Counter("billiards_sessions_ended_total", "Game sessions ended.")
+bills_computed = Counter("billiards_bills_computed_total", "Bills computed at session end, by strategy.", ("strategy",))
+payments_logged = Counter("billiards_payments_logged_total", "Payments logged, by method.", ("method",))
+payments_amount = Counter("billiards_payments_amount_total", "Sum of logged payment amounts, by method.", ("method",))
+active_tables = Gauge(
+    "billiards_active_tables", "Tables currently in use, per cafe (as seen by this worker).", ("cafe_id",)
+)
+
+REGISTRY = [
+    http_request_duration, http_requests, http_request_errors,
+    sessions_started, sessions_ended, bills_computed, payments_logged, payments_amount, active_tables,
+]
+
+
+def record_session_started(cafe_id):
+    sessions_started.inc()
+    active_tables.inc(1, cafe_id=cafe_id)
+
+
+def record_session_ended(cafe_id, strategy):
+    sessions_ended.inc()
+    bills_computed.inc(strategy=strategy.value)
+    record_table_freed(cafe_id)
+
+
+def record_table_freed(cafe_id):
+    """Table bina bill ke free hua (e.g. staff delete par uska chalta session); sirf gauge."""
+    # Restart ke baad gauge dashboard load par hi sahi hota hai, tab tak negative na jaaye
+    active_tables.inc(-1, floor=0, cafe_id=cafe_id)
+
+
+def set_active_tables(cafe_id, count: int):
+    active_tables.set(count, cafe_id=cafe_id)
+
+
+def forget_cafe(cafe_id):
+    active_tables.remove(cafe_id=cafe_id)
+
+
+def record_payment(method, amount):
+    method = getattr(method, "value", method)
+    payments_logged.inc(method=method)
+    payments_amount.inc(float(amount), method=method)
+
+
+def _pool_lines(sync_engine, async_engine) -> list:
+    lines = []
+    gauges = [
+        ("checked_out", "Connections currently checked out."),
+        ("idle", "Idle connections in the pool."),
+        ("overflow", "Connections above pool_size (negative = spare capacity)."),
+        ("pool_size", "Configured pool size."),
+    ]
+    counters = [
+        ("checkouts", "Connection checkouts."),
+        ("timeouts", "Checkouts that timed out waiting for a connection."),
+        ("invalidations", "Invalidated connections, including failed pre-pings."),
+        ("wait_seconds_total", "Total time spent waiting for a connection."),
+    ]
+    snapshots = pool_status(sync_engine, async_engine)
+    for field, documentation in gauges:
+        name = f"billiards_db_pool_{field}"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{engine="{engine}"}} {snap[field]}' for engine, snap in snapshots.items() if field in snap]
+    for field, documentation in counters:
+        name = f"billiards_db_pool_{field}" if field.endswith("_total") else f"billiards_db_pool_{field}_total"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} counter"]
+        lines += [f'{name}{{engine="{engine}"}} {snap[field]}' for engine, snap in snapshots.items()]
+    return lines
+
+
+def render_metrics(sync_engine, async_engine) -> str:
+    """Prometheus text exposition format; sab kuch memory se, koi DB query nahi."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_pool_lines(sync_engine, async_engine))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Records latency and status per route template (e.g. /api/v1/staff/sessions/end/{session_id},
+    so ids don't blow up label cardinality). Event streams are counted but not timed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "event_stream": False}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["event_stream"] = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Router match hone ke baad scope mein route hota hai
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=response["status"])
+            if response["status"] >= 500:
+                http_request_errors.inc(method=method, route=route)
+            if not response["event_stream"]:
+                http_request_duration.observe(time.perf_counter() - started, method=method, route=route)
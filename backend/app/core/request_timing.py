@@ -0,0 +1,63 @@
+import logging
+import time
+
+from app.core.config import settings
+from app.db.query_stats import QueryStats, current_query_stats
+
+logger = logging.getLogger("app.slow_requests")
+
+
+class QueryStatsMiddleware:
+    """
+    Per-request SQL instrumentation. Adds a `Server-Timing` header with DB time,
+    query count and app time, and logs requests slower than
+    SLOW_REQUEST_THRESHOLD_MS together with their slowest statements.
+
+    Plain ASGI middleware (not BaseHTTPMiddleware) so streaming responses like the
+    dashboard SSE feed and exports pass through untouched; for those the header
+    covers the work done before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        event_stream = False
+
+        async def send_with_timing(message):
+            nonlocal event_stream
+            if message["type"] == "http.response.start":
+                # SSE connections ghanton khule rehte hain, unhe slow log mein nahi daalna
+                event_stream = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+                app_ms = (time.perf_counter() - started) * 1000
+                header = (
+                    f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= settings.SLOW_REQUEST_THRESHOLD_MS and not event_stream:
+                slowest = " | ".join(
+                    f"{seconds * 1000:.1f} ms {' '.join(statement.split())[:200]}"
+                    for seconds, statement in stats.slowest
+                )
+                logger.warning(
+                    "Slow request %s %s: %.1f ms, %d queries, %.1f ms in DB. Slowest: %s",
+                    scope["method"], scope["path"], elapsed_ms, stats.count, stats.total_seconds * 1000, slowest,
+                )
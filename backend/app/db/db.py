@@ -1,20 +1,68 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
+from app.db.query_stats import instrument_engine
+from app.db.pool_metrics import (
+    InstrumentedQueuePool, InstrumentedAsyncQueuePool, attach_pool_listeners,
+    sync_pool_metrics, async_pool_metrics,
+)
+
+def _async_database_url(url: str) -> str:
+    """Sync DATABASE_URL ko uske async driver wale URL mein badlein."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+def _pool_options(url: str, poolclass) -> dict:
+    """Pool sizing settings se; in-memory SQLite apna single-connection pool hi use karta hai."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")):
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
 
 # Create the SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# Sync engine: create_all, Alembic aur CLI commands (backfill / repair) ke liye
+engine = create_engine(settings.DATABASE_URL, **_pool_options(settings.DATABASE_URL, InstrumentedQueuePool))
+attach_pool_listeners(engine, sync_pool_metrics)
+instrument_engine(engine)
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+# Async engine: saare API requests isi se chalte hain
+ASYNC_DATABASE_URL = _async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool)
+)
+attach_pool_listeners(async_engine.sync_engine, async_pool_metrics)
+instrument_engine(async_engine.sync_engine)
+
+# expire_on_commit=False: commit ke baad attributes padhne par implicit (blocking) reload na ho
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except:
+            await db.rollback()
+            raise
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's connection pool: how long requests wait for a
+    connection, how often the wait times out, and how many connections get
+    invalidated (a failed pre-ping invalidates the connection before retrying).
+    Live checked-out / idle numbers are read straight from the pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+        # QueuePool ke live gauges; doosre pool types (e.g. SQLite :memory:) mein ye nahi hote
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+
+def _timed_get(metrics: PoolMetrics, do_get):
+    started = time.perf_counter()
+    try:
+        return do_get()
+    except exc.TimeoutError:
+        metrics.record_timeout()
+        raise
+    finally:
+        metrics.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        return _timed_get(sync_pool_metrics, super()._do_get)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        return _timed_get(async_pool_metrics, super()._do_get)
+
+
+def attach_pool_listeners(sync_engine, metrics: PoolMetrics):
+    """Connect / invalidate events ko metrics se jodein (async engine ke liye .sync_engine dein)."""
+    event.listen(sync_engine, "connect", lambda dbapi_connection, connection_record: metrics.record_connect())
+    event.listen(
+        sync_engine, "invalidate",
+        lambda dbapi_connection, connection_record, exception: metrics.record_invalidation()
+    )
+
+
+def pool_status(sync_engine, async_engine) -> dict:
+    return {
+        "sync": sync_pool_metrics.snapshot(sync_engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
@@ -0,0 +1,78 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+SLOWEST_STATEMENTS_KEPT = 3
+
+
+class QueryStats:
+    """Queries run while handling one request: count, total DB time and the slowest few."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest = []  # [(seconds, statement)], sabse slow pehle
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        if len(self.slowest) < SLOWEST_STATEMENTS_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_STATEMENTS_KEPT:]
+
+
+# Middleware har request ke liye naya QueryStats set karta hai; async engine ke
+# greenlets bhi isi context mein chalte hain, isliye events sahi request mein judte hain
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+# Process-wide collectors (query_budget), request context ke bahar bhi
+_global_collectors = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_stats_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    for collector in _global_collectors:
+        collector.record(statement, seconds)
+
+
+def instrument_engine(sync_engine):
+    """Engine par timing events lagayein (async engine ke liye .sync_engine dein)."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    Fails if the block runs more than `max_queries` statements on any instrumented
+    engine, e.g. in a test:
+
+        with query_budget(3):
+            client.get("/api/v1/staff/dashboard", headers=auth)
+
+    Counts process-wide, so it also sees queries from TestClient's app thread.
+    """
+    stats = QueryStats()
+    _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _global_collectors.remove(stats)
+    if stats.count > max_queries:
+        statements = "\n".join(statement for _, statement in stats.slowest)
+        raise AssertionError(
+            f"Query budget exceeded: {stats.count} queries, budget {max_queries}. Slowest:\n{statements}"
+        )
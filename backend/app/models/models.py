@@ -1,6 +1,6 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, ForeignKey, text, Enum, DECIMAL, TIMESTAMP, Integer
+from sqlalchemy import Column, String, ForeignKey, text, Enum, DECIMAL, TIMESTAMP, Integer, Date, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import Base
@@ -37,6 +37,8 @@ class Cafe(Base):
     cafeName = Column(String, nullable=False)
     owner_id = Column(UUID(as_uuid=True), ForeignKey('owners.id'), nullable=False)
     billingStrategy = Column(Enum(BillingStrategy), nullable=False, default=BillingStrategy.pro_rata)
+    # Tables / pricing / staff / cafe details badalne par +1; owner management reads ke ETags isi se
+    management_version = Column(Integer, nullable=False, server_default=text("1"))
     owner = relationship("Owner", back_populates="cafes")
     staff = relationship("Staff", back_populates="cafe", cascade="all, delete-orphan")
     tables = relationship("Table", back_populates="cafe", cascade="all, delete-orphan")
@@ -51,6 +53,7 @@ class Staff(Base):
     cafe_id = Column(UUID(as_uuid=True), ForeignKey('cafes.id'), nullable=False)
     cafe = relationship("Cafe", back_populates="staff")
     game_sessions = relationship("GameSession", back_populates="staff", cascade="all, delete-orphan")
+    revenue_rollups = relationship("RevenueRollup", back_populates="staff", cascade="all, delete-orphan")
 
 class Table(Base):
     __tablename__ = 'tables'
@@ -59,8 +62,21 @@ class Table(Base):
     tableType = Column(Enum(TableType), nullable=False)
     status = Column(Enum(TableStatus), nullable=False, default=TableStatus.available)
     cafe_id = Column(UUID(as_uuid=True), ForeignKey('cafes.id'), nullable=False)
+    # Denormalized: table par abhi chal raha session (start/end ke saath same transaction mein set hota hai)
+    active_session_id = Column(
+        UUID(as_uuid=True),
+        # Session delete ho (staff / cafe delete ka cascade) toh pointer NULL, delete fail nahi
+        ForeignKey('game_sessions.id', use_alter=True, name='fk_tables_active_session_id', ondelete='SET NULL'),
+        nullable=True
+    )
     cafe = relationship("Cafe", back_populates="tables")
-    game_sessions = relationship("GameSession", back_populates="table", cascade="all, delete-orphan")
+    game_sessions = relationship(
+        "GameSession", back_populates="table", cascade="all, delete-orphan", foreign_keys="GameSession.table_id"
+    )
+    active_session = relationship("GameSession", foreign_keys=[active_session_id], post_update=True)
+
+# Dashboard: cafe ke tables, naam (phir id) ke order mein
+Index('ix_tables_cafe_id_tableName_id', Table.cafe_id, Table.tableName, Table.id)
 
 class GameSession(Base):
     __tablename__ = 'game_sessions'
@@ -69,12 +85,17 @@ class GameSession(Base):
     endTime = Column(TIMESTAMP(timezone=True), nullable=True)
     table_id = Column(UUID(as_uuid=True), ForeignKey('tables.id'), nullable=False)
     staff_id = Column(UUID(as_uuid=True), ForeignKey('staff.id'), nullable=False)
+    # Denormalized: latest PlayerChange ka numberOfPlayers
+    current_players = Column(Integer, nullable=True)
     
-    table = relationship("Table", back_populates="game_sessions")
+    table = relationship("Table", back_populates="game_sessions", foreign_keys=[table_id])
     staff = relationship("Staff", back_populates="game_sessions")
     player_changes = relationship("PlayerChange", back_populates="game_session", cascade="all, delete-orphan")
     payment = relationship("Payment", back_populates="game_session", uselist=False, cascade="all, delete-orphan")
 
+# Staff ke payments / analytics joins ke liye
+Index('ix_game_sessions_staff_id', GameSession.staff_id)
+
 class PlayerChange(Base):
     __tablename__ = 'player_changes'
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
@@ -83,6 +104,9 @@ class PlayerChange(Base):
     session_id = Column(UUID(as_uuid=True), ForeignKey('game_sessions.id'), nullable=False)
     game_session = relationship("GameSession", back_populates="player_changes")
 
+# Session(s) ki player timeline, timestamp ke order mein
+Index('ix_player_changes_session_id_timestamp', PlayerChange.session_id, PlayerChange.timestamp)
+
 class Payment(Base):
     __tablename__ = 'payments'
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
@@ -93,6 +117,9 @@ class Payment(Base):
     session_id = Column(UUID(as_uuid=True), ForeignKey("game_sessions.id"), unique=True, nullable=False)
     game_session = relationship("GameSession", back_populates="payment")
 
+# Keyset pagination (paymentTimestamp, id) aur date-range filters dono isi se
+Index('ix_payments_paymentTimestamp_id', Payment.paymentTimestamp, Payment.id)
+
 class Pricing(Base):
     __tablename__ = 'pricing'
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
@@ -103,3 +130,28 @@ class Pricing(Base):
     cafe_id = Column(UUID(as_uuid=True), ForeignKey('cafes.id'), nullable=False)
     cafe = relationship("Cafe", back_populates="pricing")
 
+Index('ix_pricing_cafe_id_tableType', Pricing.cafe_id, Pricing.tableType)
+
+class RevenueRollup(Base):
+    """
+    Pre-aggregated revenue: one row per cafe x staff x day x hour x payment method x table type.
+    Backfilled by its migration, maintained by log_new_payment, rebuilt on demand by
+    `python -m app.commands.backfill_revenue_rollup`.
+    """
+    __tablename__ = 'revenue_rollups'
+    __table_args__ = (
+        UniqueConstraint('cafe_id', 'staff_id', 'day', 'hour', 'paymentMethod', 'tableType', name='uq_revenue_rollups_bucket'),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    cafe_id = Column(UUID(as_uuid=True), ForeignKey('cafes.id'), nullable=False)
+    staff_id = Column(UUID(as_uuid=True), ForeignKey('staff.id'), nullable=False)
+    day = Column(Date, nullable=False)
+    hour = Column(Integer, nullable=False)
+    paymentMethod = Column(Enum(PaymentMethod), nullable=False)
+    tableType = Column(Enum(TableType), nullable=False)
+    totalRevenue = Column(DECIMAL(12, 2), nullable=False, default=0)
+    paymentCount = Column(Integer, nullable=False, default=0)
+    staff = relationship("Staff", back_populates="revenue_rollups")
+
+# Staff daily analytics; cafe-wise reads unique constraint ka index use karte hain
+Index('ix_revenue_rollups_staff_id_day', RevenueRollup.staff_id, RevenueRollup.day)
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from fastapi.encoders import jsonable_encoder
+
+
+class DashboardBroker:
+    """
+    In-process pub/sub fan-out of dashboard deltas, one channel per cafe.
+
+    Every subscriber is just an asyncio.Queue on the event loop that owns the
+    stream, so thousands of idle subscribers cost a few objects each and no
+    threads. Controllers are coroutines on that same loop, so publish() puts
+    each message straight into the queues; only a caller on another thread
+    (e.g. a sync script) goes through call_soon_threadsafe. A message is encoded
+    once and the same string is shared by all subscribers of the cafe.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def subscribe(self, cafe_id) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers[str(cafe_id)][queue] = loop
+        return queue
+
+    def unsubscribe(self, cafe_id, queue: asyncio.Queue):
+        key = str(cafe_id)
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is None:
+                return
+            subscribers.pop(queue, None)
+            if not subscribers:
+                del self._subscribers[key]
+
+    def subscriber_count(self, cafe_id=None) -> int:
+        with self._lock:
+            if cafe_id is not None:
+                return len(self._subscribers.get(str(cafe_id), ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, cafe_id, event: str, payload: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(cafe_id), {}).items())
+        if not subscribers:
+            return
+
+        message = f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for queue, loop in subscribers:
+            if loop is current_loop:
+                _offer(queue, message)
+                continue
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # Loop band ho chuka hai, subscriber khud hi hat jayega
+                pass
+
+
+RESYNC_MESSAGE = "event: resync\ndata: {}\n\n"
+
+
+def _offer(queue: asyncio.Queue, message: str):
+    """
+    Slow client ki queue bhar gayi toh purane deltas hata kar usse poora
+    dashboard dobara fetch karne ko bolte hain.
+    """
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC_MESSAGE)
+
+
+dashboard_broker = DashboardBroker()
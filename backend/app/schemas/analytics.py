@@ -1,6 +1,10 @@
+import uuid
+from datetime import date
 from pydantic import BaseModel
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, List
+from app.models.models import BillingStrategy
+from app.schemas.pricing import PricingBase
 
 class RevenueData(BaseModel):
     total_revenue: Decimal
@@ -34,4 +38,31 @@ class StaffDailyAnalyticsResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# --- Owner What-If Pricing Simulator ---
+class PricingSimulationRequest(BaseModel):
+    start_date: date
+    end_date: date
+    # Khaali = owner ke saare cafes
+    cafe_ids: List[uuid.UUID] | None = None
+    # None = har cafe ki apni current strategy
+    billingStrategy: BillingStrategy | None = None
+    # Jin table types ke rules nahi diye, unki current pricing hi rahegi
+    pricing: List[PricingBase] = []
 
+class SimulationBucket(BaseModel):
+    tableType: str
+    hour: int
+    sessions: int
+    baseline_revenue: Decimal
+    projected_revenue: Decimal
+    revenue_delta: Decimal
+    actual_revenue: Decimal
+
+class PricingSimulationResponse(BaseModel):
+    sessions_replayed: int
+    sessions_skipped: int
+    baseline_revenue: Decimal
+    projected_revenue: Decimal
+    revenue_delta: Decimal
+    actual_revenue: Decimal
+    by_table_type_hour: List[SimulationBucket]
@@ -4,6 +4,8 @@ import uuid
 import datetime
 from decimal import Decimal
 
+from .game_session import BillDetails
+
 
 class PricingInfo(BaseModel):
     tableType: str
@@ -22,6 +24,8 @@ class TableStatus(BaseModel):
     startTime: Optional[datetime.datetime] = None # Add this line
     elapsed_time: Optional[str] = None
     current_players: Optional[int] = None
+    # Abhi end karein toh kitna bill banega (read-only estimate)
+    current_bill: Optional[Decimal] = None
 
     class Config:
         from_attributes = True
@@ -30,4 +34,15 @@ class StaffDashboardResponse(BaseModel):
     cafeName: str
     tables: List[TableStatus]
     pricing_rules: List[PricingInfo]
+    # elapsed_time / current_bill kis waqt ke hain
+    generated_at: Optional[datetime.datetime] = None
+
+
+class TableQuote(BillDetails):
+    table_id: uuid.UUID
+    tableName: str
+    startTime: datetime.datetime
 
+class ActiveTableQuotes(BaseModel):
+    quoted_at: datetime.datetime
+    quotes: List[TableQuote]
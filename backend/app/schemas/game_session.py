@@ -53,6 +53,8 @@ class BillDetails(BaseModel):
     time_based_cost: Decimal
     
     final_player_count: int
+    # Time-weighted extra players (player timeline se); purane clients ise ignore kar sakte hain
+    average_extra_players: Optional[Decimal] = None
     extra_player_cost: Decimal
     
     total_amount_due: Decimal
@@ -60,3 +62,15 @@ class BillDetails(BaseModel):
     class Config:
         from_attributes = True
 
+
+# --- Bulk (tournament nights) ---
+BULK_SESSION_MAX = 50
+
+class BulkSessionStart(BaseModel):
+    sessions: List[SessionStart] = Field(..., min_length=1, max_length=BULK_SESSION_MAX)
+
+class BulkSessionEnd(BaseModel):
+    session_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=BULK_SESSION_MAX)
+
+class BulkBillDetails(BaseModel):
+    bills: List[BillDetails]
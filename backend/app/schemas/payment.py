@@ -1,7 +1,8 @@
 import uuid
 from decimal import Decimal
 import datetime
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from app.models.models import PaymentMethod
 
 # --- Nested Schemas for the Response ---
@@ -33,3 +34,22 @@ class Payment(BaseModel):
     class Config:
         from_attributes = True
 
+# --- Paginated History ---
+
+class PaymentHistoryFilters(BaseModel):
+    start_date: Optional[datetime.date] = None
+    end_date: Optional[datetime.date] = None
+    table_id: Optional[uuid.UUID] = None
+    payment_method: Optional[PaymentMethod] = None
+    staff_id: Optional[uuid.UUID] = None
+    # Pichhle page ka next_cursor
+    cursor: Optional[str] = None
+    limit: int = Field(50, ge=1, le=200)
+
+class OwnerPaymentHistoryFilters(PaymentHistoryFilters):
+    # Khaali = owner ke saare cafes
+    cafe_id: Optional[uuid.UUID] = None
+
+class PaymentHistoryPage(BaseModel):
+    items: List[Payment]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,14 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# BCRYPT_ROUNDS badalne par purane hashes "deprecated" maane jaate hain aur login par rehash hote hain
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 class Hasher:
     @staticmethod
@@ -10,3 +18,67 @@ class Hasher:
     @staticmethod
     def get_password_hash(password):
         return pwd_context.hash(password)
+
+    @staticmethod
+    def verify_and_update(plain_password, hashed_password):
+        """(is_valid, new_hash) - new_hash sirf tab milta hai jab cost badal gaya ho."""
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PinHashPool:
+    """
+    Runs bcrypt in a dedicated process pool so PIN checks don't hold the event
+    loop's GIL (a login rush at shift change otherwise stalls every other request).
+
+    At most `max_pending` jobs may be queued or running in this app process; beyond
+    that callers get a 503 with Retry-After instead of piling up behind the pool.
+    PIN_HASH_WORKERS=0 falls back to a thread pool (e.g. where spawning processes
+    isn't allowed).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.workers > 0:
+                # spawn: event loop / DB connections wale parent ko fork nahi karna
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pin-hash")
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins in progress, please retry.",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(Hasher.get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str):
+        return await self._submit(Hasher.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pin_hash_pool = PinHashPool(
+    workers=settings.PIN_HASH_WORKERS,
+    max_pending=settings.PIN_HASH_MAX_PENDING,
+)
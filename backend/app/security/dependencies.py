@@ -1,16 +1,27 @@
+import hmac
+
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.principals import principal_cache
+from app.controllers.owner.cafe_controller import bump_management_version
 from app.core.config import settings
 from app.db.db import get_db
 from app.models import models
 from app.schemas.token import TokenData, Role
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+metrics_scheme = HTTPBearer(auto_error=False)
+
+def _principal_key(token_data: TokenData, kind: str) -> tuple:
+    # (subject, role, owner flag, cafe, kind) - invalidation subject / cafe se match karta hai
+    cafe_id = str(token_data.cafe_id) if token_data.cafe_id else None
+    return (token_data.mobileNo, token_data.role.value, token_data.is_owner, cafe_id, kind)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -36,22 +47,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 
     except (JWTError, ValueError):
         raise credentials_exception
-    
+
+    # Cache hit par koi DB round-trip nahi
+    cache_key = _principal_key(token_data, "user")
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user, token_data
+
     user = None
     if token_data.role == Role.owner:
-        user = db.query(models.Owner).filter(models.Owner.mobileNo == token_data.mobileNo).first()
+        user = await db.scalar(select(models.Owner).where(models.Owner.mobileNo == token_data.mobileNo))
     elif token_data.role == Role.staff:
         if token_data.is_owner:
-            user = db.query(models.Owner).filter(models.Owner.mobileNo == token_data.mobileNo).first()
+            user = await db.scalar(select(models.Owner).where(models.Owner.mobileNo == token_data.mobileNo))
         else: 
-            user = db.query(models.Staff).filter(models.Staff.mobileNo == token_data.mobileNo).first()
+            user = await db.scalar(select(models.Staff).where(models.Staff.mobileNo == token_data.mobileNo))
 
     if user is None:
         raise credentials_exception
-        
-    return user, token_data
 
-def get_current_owner(user_data = Depends(get_current_user)) -> models.Owner:
+    return principal_cache.put(cache_key, user), token_data
+
+async def get_current_owner(user_data = Depends(get_current_user)) -> models.Owner:
     user, token_data = user_data
     if token_data.role != Role.owner:
         raise HTTPException(
@@ -61,7 +78,7 @@ def get_current_owner(user_data = Depends(get_current_user)) -> models.Owner:
     return user
 
 # --- Final, "Self-Healing" Version ---
-def get_current_staff(user_data = Depends(get_current_user), db: Session = Depends(get_db)) -> models.Staff:
+async def get_current_staff(user_data = Depends(get_current_user), db: AsyncSession = Depends(get_db)) -> models.Staff:
     user, token_data = user_data
     if token_data.role != Role.staff:
         raise HTTPException(
@@ -71,10 +88,15 @@ def get_current_staff(user_data = Depends(get_current_user), db: Session = Depen
     
     # Agar owner as a staff act kar raha hai
     if token_data.is_owner:
+        cache_key = _principal_key(token_data, "staff_profile")
+        cached_profile = principal_cache.get(cache_key)
+        if cached_profile is not None:
+            return cached_profile
+
         # Hamesha owner ka primary staff profile hi dhoondein (mobileNo se)
-        owner_staff_profile = db.query(models.Staff).filter(
+        owner_staff_profile = await db.scalar(select(models.Staff).where(
             models.Staff.mobileNo == user.mobileNo
-        ).first()
+        ))
         
         # Agar profile nahi milti (purana cafe)
         if not owner_staff_profile:
@@ -86,18 +108,40 @@ def get_current_staff(user_data = Depends(get_current_user), db: Session = Depen
                 cafe_id=token_data.cafe_id
             )
             db.add(owner_as_staff)
-            db.commit()
-            db.refresh(owner_as_staff)
-            return owner_as_staff
+            await bump_management_version(db, token_data.cafe_id)
+            await db.commit()
+            await db.refresh(owner_as_staff)
+            return principal_cache.put(cache_key, owner_as_staff)
 
         # Sabse important step: Sahi cafe ko dynamically attach karein
         if token_data.cafe_id:
-            cafe_to_act_in = db.query(models.Cafe).filter(models.Cafe.id == token_data.cafe_id).first()
+            cafe_to_act_in = await db.scalar(select(models.Cafe).where(models.Cafe.id == token_data.cafe_id))
             if cafe_to_act_in:
+                previous_cafe_id = owner_staff_profile.cafe_id
                 # Staff object ke cafe ko overwrite karein
                 owner_staff_profile.cafe = cafe_to_act_in
-        
-        return owner_staff_profile
+                # Flush se pehle cafe_id purana hi rehta; cache aur controllers ko naya cafe_id chahiye
+                owner_staff_profile.cafe_id = cafe_to_act_in.id
+                if previous_cafe_id != cafe_to_act_in.id:
+                    # Dono cafes ki staff list badli; bump isi transaction mein, move ke saath hi commit hoga
+                    await bump_management_version(db, previous_cafe_id, cafe_to_act_in.id)
+
+        return principal_cache.put(cache_key, owner_staff_profile)
     
     # Agar normal staff hai, toh user (jo pehle se Staff object hai) return hoga
-    return user
\ No newline at end of file
+    return user
+
+def require_metrics_token(credentials: HTTPAuthorizationCredentials | None = Depends(metrics_scheme)):
+    """
+    Operational endpoints (/metrics, /health/db-pool) ke liye: `Authorization: Bearer <METRICS_TOKEN>`.
+    Token configure nahi hai toh endpoint exist hi nahi karta.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = credentials.credentials if credentials else ""
+    if not hmac.compare_digest(supplied.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
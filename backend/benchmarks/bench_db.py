@@ -0,0 +1,108 @@
+"""
+Database setup shared by the benchmark scripts.
+
+`use_database(url)` must run before anything from `app` is imported, because
+app.db.db builds its engines from DATABASE_URL at import time. `prepare_schema()`
+then gives an empty schema: a SQLite file is deleted and recreated, a Postgres
+database has every app table dropped and recreated - so point it at a
+throwaway database, never a real one.
+
+The models use a few Postgres-isms (gen_random_uuid() / now() server defaults,
+timezone-aware timestamps). On SQLite those are provided here on each
+connection, so the same app code runs on both.
+"""
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_database(url: str, backend_dir: str = BACKEND_DIR, reset: bool = True):
+    """
+    Points the app at `url`. `backend_dir` picks which checkout's `app` gets
+    imported (another one = e.g. a git worktree of an older commit); with
+    reset=False an existing SQLite file is kept.
+    """
+    os.environ["DATABASE_URL"] = url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    # Bench process ko spawn workers ki zarurat nahi; override karna ho toh env mein set karein
+    os.environ.setdefault("PIN_HASH_WORKERS", "0")
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    if reset and url.startswith("sqlite"):
+        path = url.split("///", 1)[-1]
+        if path and path != ":memory:" and os.path.exists(path):
+            os.remove(path)
+
+
+def _sqlite_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("gen_random_uuid", 0, lambda: uuid.uuid4().hex)
+    dbapi_connection.create_function(
+        "now", 0, lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+    )
+
+
+def _sqlite_column_types():
+    from sqlalchemy import types
+
+    class UTCDateTime(types.TypeDecorator):
+        """SQLite timezone nahi rakhta: UTC mein likho, aware UTC wapas do."""
+        impl = types.DateTime
+        cache_ok = True
+
+        def process_bind_param(self, value, dialect):
+            if value is not None and value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value
+
+        def process_result_value(self, value, dialect):
+            if value is not None and value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value
+
+    class CoercedUuid(types.TypeDecorator):
+        """Path params string UUID ke roop mein aate hain; Postgres unhe khud cast karta hai."""
+        impl = types.Uuid
+        cache_ok = True
+
+        def process_bind_param(self, value, dialect):
+            return uuid.UUID(value) if isinstance(value, str) else value
+
+    return UTCDateTime, CoercedUuid
+
+
+def prepare_schema(reset: bool = True):
+    """
+    Empty schema for the configured DATABASE_URL; returns (sync_engine, async_engine).
+    reset=False keeps the existing tables and rows and only installs the SQLite
+    shims. async_engine is None for checkouts from before the async migration.
+    """
+    from sqlalchemy import event, types
+
+    from app.db import db as app_db
+    from app.db.base import Base
+    from app.models import models  # noqa: F401  (tables register on Base.metadata)
+
+    engine, async_engine = app_db.engine, getattr(app_db, "async_engine", None)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_functions)
+        if async_engine is not None:
+            event.listen(async_engine.sync_engine, "connect", _sqlite_functions)
+        UTCDateTime, CoercedUuid = _sqlite_column_types()
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, types.TIMESTAMP):
+                    column.type = UTCDateTime()
+                elif isinstance(column.type, types.Uuid):
+                    column.type = CoercedUuid()
+    elif engine.dialect.name == "postgresql":
+        if reset:
+            Base.metadata.drop_all(engine)
+    else:
+        raise SystemExit(f"Unsupported benchmark database: {engine.dialect.name}")
+
+    if reset:
+        Base.metadata.create_all(engine)
+    return engine, async_engine
@@ -0,0 +1,126 @@
+"""
+Concurrency stress check for table claiming and Idempotency-Key replay.
+
+Against a running API, with a staff login and an available table of that
+staff member's cafe:
+
+  1. fires `--parallel` simultaneous "start session" requests at the table and
+     checks exactly one wins (the rest get 400 "Table is not available");
+  2. ends the winning session with `--parallel` simultaneous requests that share
+     one Idempotency-Key, and checks every 200 carries the same bill;
+  3. does the same for logging the payment, and checks only one payment exists.
+
+    uvicorn main:app --port 8080 --workers 1
+    python benchmarks/claim_race.py --base-url http://localhost:8080 \\
+        --mobile 8000000001 --pin 123456 --table-id <uuid> --parallel 300
+
+Exits with status 1 if any check fails. The table is left available again.
+With several workers, the per-process idempotency store means retries can hit
+another worker: those come back as 404 / 400 (never a second bill or payment).
+"""
+import argparse
+import json
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(base_url, path, token=None, payload=None, form=None, headers=None):
+    headers = dict(headers or {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if form is not None:
+        data = urllib.parse.urlencode(form).encode()
+    else:
+        data = json.dumps(payload or {}).encode()
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(f"{base_url}{path}", data=data, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read() or b"null"), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null"), dict(e.headers)
+
+
+def _fire(parallel, fn):
+    # Barrier: saare threads ek saath chhootein, taaki requests sach mein overlap karein
+    barrier = threading.Barrier(parallel)
+
+    def task():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        return [f.result() for f in [pool.submit(task) for _ in range(parallel)]]
+
+
+def _check(name, ok, detail):
+    print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent table claims and idempotent retries.")
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--mobile", required=True, help="Staff mobile number")
+    parser.add_argument("--pin", required=True)
+    parser.add_argument("--table-id", required=True, help="An available table in the staff member's cafe")
+    parser.add_argument("--parallel", type=int, default=200)
+    args = parser.parse_args()
+
+    status, body, _ = _request(args.base_url, "/api/v1/auth/login", form={"username": args.mobile, "password": args.pin})
+    if status != 200:
+        sys.exit(f"Login failed: {status} {body}")
+    token = body["access_token"]
+    passed = True
+
+    # 1. Saare devices ek hi table claim karte hain
+    starts = _fire(args.parallel, lambda: _request(
+        args.base_url, "/api/v1/staff/sessions/start", token,
+        {"table_id": args.table_id, "initial_player_count": 2},
+    ))
+    statuses = Counter(status for status, _, _ in starts)
+    winners = [body for status, body, _ in starts if status == 200]
+    passed &= _check("claim", len(winners) == 1 and statuses[400] == args.parallel - 1, dict(statuses))
+    if not winners:
+        sys.exit(1)
+    session_id = winners[0]["id"]
+
+    # 2. Ek hi Idempotency-Key ke saath end ke retries
+    end_key = str(uuid.uuid4())
+    ends = _fire(args.parallel, lambda: _request(
+        args.base_url, f"/api/v1/staff/sessions/end/{session_id}", token, headers={"Idempotency-Key": end_key},
+    ))
+    statuses = Counter(status for status, _, _ in ends)
+    bills = {json.dumps(body, sort_keys=True) for status, body, _ in ends if status == 200}
+    replayed = sum(1 for status, _, headers in ends if status == 200 and headers.get("idempotent-replayed"))
+    passed &= _check(
+        "end", statuses[200] >= 1 and len(bills) == 1 and set(statuses) <= {200, 404, 409},
+        f"{dict(statuses)}, {replayed} replayed, {len(bills)} distinct bill(s)",
+    )
+    bill = json.loads(next(iter(bills)))
+
+    # 3. Payment ke retries: sirf ek payment banni chahiye
+    pay_key = str(uuid.uuid4())
+    payments = _fire(args.parallel, lambda: _request(
+        args.base_url, "/api/v1/staff/payments/", token,
+        {"game_session_id": session_id, "total_amount": bill["total_amount_due"], "payment_method": "Cash"},
+        headers={"Idempotency-Key": pay_key},
+    ))
+    statuses = Counter(status for status, _, _ in payments)
+    payment_ids = {body["id"] for status, body, _ in payments if status == 200}
+    passed &= _check(
+        "payment", len(payment_ids) == 1 and set(statuses) <= {200, 400, 409},
+        f"{dict(statuses)}, {len(payment_ids)} distinct payment(s)",
+    )
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Login throughput under concurrency (shift-change rush).
+
+Fires `--requests` logins from `--concurrency` threads at a running API and, at
+the same time, probes `GET /` to show how much the login rush slows down
+everything else. Run it against a server started with different
+PIN_HASH_WORKERS / BCRYPT_ROUNDS values to compare.
+
+    uvicorn main:app --port 8080
+    python benchmarks/login_throughput.py --base-url http://localhost:8080 \\
+        --mobile 9999999999 --pin 123456 --concurrency 32 --requests 256
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _login(base_url, mobile, pin):
+    body = urllib.parse.urlencode({"username": mobile, "password": pin}).encode()
+    request = urllib.request.Request(f"{base_url}/api/v1/auth/login", data=body, method="POST")
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+
+def _probe(base_url, stop, latencies):
+    # Login rush ke dauran ek halka endpoint kitna slow hota hai
+    while not stop.is_set():
+        started = time.perf_counter()
+        with urllib.request.urlopen(f"{base_url}/", timeout=60) as response:
+            response.read()
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.05)
+
+
+def _report(name, latencies):
+    ms = [l * 1000 for l in latencies]
+    print(
+        f"{name:<8} n={len(ms):<5} "
+        f"p50={_percentile(ms, 50):8.1f}ms p95={_percentile(ms, 95):8.1f}ms "
+        f"p99={_percentile(ms, 99):8.1f}ms mean={statistics.fmean(ms) if ms else 0:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput under concurrency.")
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--mobile", required=True)
+    parser.add_argument("--pin", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    stop = threading.Event()
+    probe_latencies = []
+    probe = threading.Thread(target=_probe, args=(base_url, stop, probe_latencies), daemon=True)
+    probe.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: _login(base_url, args.mobile, args.pin), range(args.requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe.join()
+
+    statuses = Counter(status for status, _ in results)
+    ok = [latency for status, latency in results if status == 200]
+    print(f"logins: {len(results)} in {elapsed:.2f}s -> {statuses.get(200, 0) / elapsed:.1f} successful logins/s")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    _report("login", ok)
+    _report("GET /", probe_latencies)
+
+
+if __name__ == "__main__":
+    main()
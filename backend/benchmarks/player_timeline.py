@@ -0,0 +1,54 @@
+"""
+Time-weighted extra-player billing on sessions with many player changes.
+
+Times `integrate_extra_players` plus the bill calculation for sessions with
+hundreds of PlayerChange rows (what end_existing_session does after its single
+ordered fetch). Runs without a database:
+
+    python benchmarks/player_timeline.py --changes 100 500 2000 --repeat 2000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.billing import strategies  # noqa: E402
+from app.billing.player_timeline import integrate_extra_players  # noqa: E402
+
+
+def _session(changes: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 18, 0, tzinfo=timezone.utc)
+    end = start + timedelta(hours=6)
+    step = (end - start) / (changes + 1)
+    timeline = [(start + step * i, rng.randint(1, 8)) for i in range(changes)]
+    return timeline, start, end
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-weighted extra-player billing.")
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rule = SimpleNamespace(hourPrice=Decimal("120.00"), halfHourPrice=Decimal("70.00"), extraPlayerPrice=Decimal("25.00"))
+    for changes in args.changes:
+        timeline, start, end = _session(changes)
+        duration_minutes = int((end - start).total_seconds() // 60)
+
+        def run():
+            extra_player_time = integrate_extra_players(timeline, start, end)
+            return strategies.calculate_pro_rata_bill(duration_minutes, rule, timeline[-1][1], extra_player_time)
+
+        seconds = timeit.timeit(run, number=args.repeat)
+        print(f"changes={changes:<6} {seconds / args.repeat * 1e6:10.1f} us/session  total={run()['total_amount_due']}")
+
+
+if __name__ == "__main__":
+    main()
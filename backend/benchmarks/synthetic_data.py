@@ -0,0 +1,188 @@
+"""
+Deterministic synthetic dataset for the benchmarks: one owner, N cafes with
+staff, tables and pricing, and `history_days` of finished sessions with player
+changes, payments and the matching revenue rollup rows.
+
+Everything is drawn from one seeded RNG, so the same DatasetSpec gives the same
+rows (ids included). History is anchored to the current day so the owner
+analytics windows (today / week / month) always have data.
+
+Rows are written with bulk INSERTs on the sync engine, not through the API,
+in chunks of INSERT_CHUNK as they are generated, so memory stays flat even for
+million-payment datasets.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.analytics import rollup
+from app.billing.player_timeline import integrate_extra_players
+from app.billing.pricing_plan import compile_plan
+from app.models import models
+from app.security.Hash import Hasher
+
+INSERT_CHUNK = 5000
+BENCH_PIN = "123456"
+OWNER_MOBILE = "9000000000"
+
+RATE_CARDS = {
+    models.TableType.pool: {"hourPrice": Decimal("120.00"), "halfHourPrice": Decimal("70.00"), "extraPlayerPrice": Decimal("20.00")},
+    models.TableType.snooker: {"hourPrice": Decimal("200.00"), "halfHourPrice": Decimal("110.00"), "extraPlayerPrice": Decimal("30.00")},
+}
+
+
+@dataclass
+class DatasetSpec:
+    cafes: int = 5
+    tables_per_cafe: int = 10
+    staff_per_cafe: int = 3
+    history_days: int = 30
+    sessions_per_table_per_day: int = 6
+    seed: int = 42
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class SeededCafe:
+    id: str
+    staff_mobiles: list
+    table_ids: list
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    owner_mobile: str
+    pin: str
+    cafes: list = field(default_factory=list)
+    counts: dict = field(default_factory=dict)
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class _ChunkedWriter:
+    """
+    Buffers rows per model and writes every buffer, parents first, whenever one
+    fills up, so a child row never reaches the database before the row it
+    references (Postgres checks the foreign keys).
+    """
+    ORDER = [
+        models.Cafe, models.Staff, models.Table, models.Pricing,
+        models.GameSession, models.PlayerChange, models.Payment,
+    ]
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rows = {model: [] for model in self.ORDER}
+        self.counts = dict.fromkeys(self.ORDER, 0)
+
+    def add(self, model, row: dict):
+        rows = self.rows[model]
+        rows.append(row)
+        if len(rows) >= INSERT_CHUNK:
+            self.flush()
+
+    def flush(self):
+        for model in self.ORDER:
+            rows = self.rows[model]
+            if rows:
+                self.db.execute(insert(model), rows)
+                self.counts[model] += len(rows)
+                rows.clear()
+
+
+def generate(sync_engine, spec: DatasetSpec) -> Dataset:
+    rng = random.Random(spec.seed)
+    strategies = list(models.BillingStrategy)
+    table_types = list(models.TableType)
+    # Ek hi hash sab par; login benchmark mein bcrypt cost BCRYPT_ROUNDS se hi aata hai
+    pin_hash = Hasher.get_password_hash(BENCH_PIN)
+    today = datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    owner_id = _uuid(rng)
+    dataset = Dataset(spec=spec, owner_mobile=OWNER_MOBILE, pin=BENCH_PIN)
+
+    with Session(sync_engine) as db:
+        db.execute(insert(models.Owner), [{"id": owner_id, "ownerName": "Bench Owner", "mobileNo": OWNER_MOBILE, "pinHash": pin_hash}])
+        writer = _ChunkedWriter(db)
+
+        for c in range(spec.cafes):
+            cafe_id = _uuid(rng)
+            strategy = strategies[c % len(strategies)]
+            writer.add(models.Cafe, {"id": cafe_id, "cafeName": f"Bench Cafe {c + 1}", "owner_id": owner_id, "billingStrategy": strategy})
+
+            plans = {}
+            for table_type in table_types:
+                rule = {"id": _uuid(rng), "cafe_id": cafe_id, "tableType": table_type, **RATE_CARDS[table_type]}
+                writer.add(models.Pricing, rule)
+                plans[table_type] = compile_plan(cafe_id, strategy, models.Pricing(**rule))
+
+            staff_ids, staff_mobiles = [], []
+            for s in range(spec.staff_per_cafe):
+                staff_id, mobile = _uuid(rng), f"8{c:04d}{s:05d}"
+                writer.add(models.Staff, {"id": staff_id, "staffName": f"Staff {c + 1}.{s + 1}", "mobileNo": mobile, "pin": pin_hash, "cafe_id": cafe_id})
+                staff_ids.append(staff_id)
+                staff_mobiles.append(mobile)
+
+            table_ids = []
+            for t in range(spec.tables_per_cafe):
+                table_id, table_type = _uuid(rng), table_types[t % len(table_types)]
+                writer.add(models.Table, {
+                    "id": table_id, "tableName": f"T{t + 1:02d}", "tableType": table_type,
+                    "status": models.TableStatus.available, "cafe_id": cafe_id,
+                })
+                table_ids.append(table_id)
+
+                for day in range(spec.history_days, 0, -1):
+                    # Din ke sessions 12:00 se shuru, ek ke baad ek (thode gap ke saath)
+                    cursor = today - timedelta(days=day) + timedelta(hours=12, minutes=rng.randint(0, 59))
+                    for _ in range(spec.sessions_per_table_per_day):
+                        duration = rng.randint(20, 150)
+                        start = cursor
+                        end = start + timedelta(minutes=duration)
+                        cursor = end + timedelta(minutes=rng.randint(5, 30))
+                        session_id = _uuid(rng)
+
+                        players = rng.randint(1, 4)
+                        timeline = [(start, players)]
+                        for _ in range(rng.randint(0, 3)):
+                            players = rng.randint(1, 6)
+                            timeline.append((start + timedelta(minutes=rng.randint(1, duration - 1)), players))
+                        timeline.sort(key=lambda item: item[0])
+                        final_players = timeline[-1][1]
+
+                        writer.add(models.GameSession, {
+                            "id": session_id, "startTime": start, "endTime": end, "table_id": table_id,
+                            "staff_id": rng.choice(staff_ids), "current_players": final_players,
+                        })
+                        for ts, count in timeline:
+                            writer.add(models.PlayerChange, {"id": _uuid(rng), "timestamp": ts, "numberOfPlayers": count, "session_id": session_id})
+                        bill = plans[table_type].bill(duration, final_players, integrate_extra_players(timeline, start, end))
+                        writer.add(models.Payment, {
+                            "id": _uuid(rng), "session_id": session_id, "totalAmount": bill["total_amount_due"],
+                            "timePlayedInMinutes": duration, "paymentTimestamp": end,
+                            "paymentMethod": rng.choice(list(models.PaymentMethod)),
+                        })
+
+            dataset.cafes.append(SeededCafe(id=str(cafe_id), staff_mobiles=staff_mobiles, table_ids=[str(t) for t in table_ids]))
+
+        writer.flush()
+        rollup_rows = rollup.rebuild(db)
+        db.commit()
+
+    counts = writer.counts
+    dataset.counts = {
+        "cafes": counts[models.Cafe], "staff": counts[models.Staff], "tables": counts[models.Table],
+        "sessions": counts[models.GameSession], "player_changes": counts[models.PlayerChange],
+        "payments": counts[models.Payment], "revenue_rollups": rollup_rows,
+    }
+    return dataset
@@ -1,18 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.v1.router import api_router
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.request_timing import QueryStatsMiddleware
 from app.db.base import Base # Import Base
-from app.db.db import engine # Import engine
+from app.db.db import engine, async_engine # Import engine
+from app.db.pool_metrics import pool_status
+from app.security.Hash import pin_hash_pool
+from app.security.dependencies import require_metrics_token
 
 Base.metadata.create_all(engine)
 # This command will create the tables if they don't exist.
 # Alembic is the preferred way for migrations, but this is good for initial setup.
 # Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Shutdown par PIN hashing processes band karein
+    pin_hash_pool.shutdown()
+
 app = FastAPI(
     title="Billiards One API",
     description="API for managing billiards cafes.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- CORS Middleware Setup ---
@@ -29,12 +44,24 @@ origins = [
     "https://www.billiardsone.in",    # "www" version
 ]
 
+# Retried start / end / payment requests (Idempotency-Key header) ka pehla response replay
+app.add_middleware(IdempotencyMiddleware)
+
+# Har request ka query count / DB time (Server-Timing header + slow request log)
+app.add_middleware(QueryStatsMiddleware)
+# Per-route latency histograms + status counts (/metrics par)
+app.add_middleware(MetricsMiddleware)
+
+# CORS sabse bahar (sabse aakhir mein add hota hai): idempotency ke apne 400 / 409 / 422
+# responses par bhi CORS headers lagein, warna browser unhe padh hi nahi paata
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allows all headers
+    # Browser JS inhe tabhi padh sakta hai jab expose hon (409 ka Retry-After, replay marker)
+    expose_headers=["Retry-After", "Idempotent-Replayed"],
 )
 
 app.include_router(api_router, prefix="/api/v1")
@@ -42,3 +69,22 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Billiards One!"}
+
+@app.get("/health/db-pool", dependencies=[Depends(require_metrics_token)])
+def read_db_pool_status():
+    """
+    Connection pool gauges (checked out / idle / overflow) aur counters (wait time, timeouts, invalidations).
+    Same scrape token as /metrics.
+    """
+    return pool_status(engine, async_engine)
+
+@app.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(require_metrics_token)]
+)
+def read_metrics():
+    """
+    Prometheus scrape endpoint. Values are per worker process (memory mein rakhe counters),
+    isliye har worker ko alag scrape karein ya labels se aggregate karein.
+    Needs `Authorization: Bearer <METRICS_TOKEN>`; without METRICS_TOKEN set it is a 404.
+    """
+    return PlainTextResponse(render_metrics(engine, async_engine), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,147 @@
+"""
+Shared test setup: the whole app runs against a throwaway SQLite file, using
+the same Postgres shims as the benchmarks (benchmarks/bench_db.py).
+
+    cd backend && python -m pytest -q
+
+DATABASE_URL has to be set before anything from `app` is imported, isliye yeh
+module level par hota hai, fixtures se pehle.
+"""
+import itertools
+import os
+import re
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Tests mein bcrypt ka kaam sirf chalna hai, mehnga hona nahi
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from benchmarks.bench_db import use_database, prepare_schema  # noqa: E402
+
+use_database(f"sqlite:///{tempfile.mkdtemp(prefix='billiards-tests-')}/test.db")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.db import db as app_db  # noqa: E402
+
+
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    # Postgres hamesha foreign keys check karta hai; SQLite tabhi jab bola jaye
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+event.listen(app_db.engine, "connect", _enforce_foreign_keys)
+event.listen(app_db.async_engine.sync_engine, "connect", _enforce_foreign_keys)
+sync_engine, async_engine = prepare_schema()
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+PIN = "123456"
+_mobiles = itertools.count(9100000000)
+
+# Endpoint (method, route template) -> max queries per request, principal / pricing plan /
+# live state caches thande hon tab bhi. Budget badhana pade toh PR mein wajah likhein: N+1 yahin pakda jaata hai.
+QUERY_BUDGETS = {
+    ("GET", "/api/v1/staff/dashboard"): 8,
+    ("POST", "/api/v1/staff/sessions/start"): 10,
+    ("POST", "/api/v1/staff/sessions/update_players"): 3,
+    ("POST", "/api/v1/staff/sessions/end/{session_id}"): 6,
+    ("POST", "/api/v1/staff/payments/"): 5,
+}
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def _route_template(method: str, path: str):
+    for route in main.app.routes:
+        if method in getattr(route, "methods", ()) and route.path_regex.match(path):
+            return route.path
+    return None
+
+
+@pytest.fixture
+def query_budgets(client):
+    """
+    Enforces QUERY_BUDGETS on every request `client` makes during the test, using
+    the query count QueryStatsMiddleware puts in the Server-Timing header. Yields
+    the (method, route, queries) of each request, for tests that check more.
+    """
+    seen = []
+
+    def check(response):
+        method, route = response.request.method, _route_template(response.request.method, response.request.url.path)
+        match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+        if route is None or match is None:
+            return
+        queries = int(match.group(1))
+        seen.append((method, route, queries))
+        budget = QUERY_BUDGETS.get((method, route))
+        if budget is not None and queries > budget:
+            raise AssertionError(f"{method} {route} ran {queries} queries, budget {budget}")
+
+    client.event_hooks["response"].append(check)
+    try:
+        yield seen
+    finally:
+        client.event_hooks["response"].remove(check)
+
+
+@pytest.fixture
+def sync_db():
+    """Sync session on the test database, for checks that bypass the API."""
+    with Session(sync_engine) as db:
+        yield db
+
+
+@pytest.fixture
+def make_cafe(client):
+    """
+    Factory: a new owner with one cafe, pricing for every table type and
+    `tables` tables. Returns owner / staff auth headers, the cafe and its tables.
+    Har call naya owner banata hai, toh tests ek dusre ka data nahi dekhte.
+    """
+    def make(tables: int = 4, billing_strategy: str = "Pro_Rata"):
+        mobile = str(next(_mobiles))
+        response = client.post("/api/v1/auth/register", json={"ownerName": "Owner", "mobileNo": mobile, "pin": PIN})
+        assert response.status_code == 201, response.text
+        token = client.post("/api/v1/auth/login", data={"username": mobile, "password": PIN}).json()["access_token"]
+        owner = {"Authorization": f"Bearer {token}"}
+
+        cafe = client.post(
+            "/api/v1/owner/cafes/", json={"cafeName": "Test Cafe", "billingStrategy": billing_strategy}, headers=owner
+        ).json()
+        for table_type in ("8-Ball Pool", "Snooker"):
+            response = client.post("/api/v1/owner/management/pricing/", headers=owner, json={
+                "cafe_id": cafe["id"], "tableType": table_type,
+                "hourPrice": "120", "halfHourPrice": "70", "extraPlayerPrice": "20",
+            })
+            assert response.status_code == 200, response.text
+        created = []
+        for i in range(tables):
+            response = client.post("/api/v1/owner/management/tables/", headers=owner, json={
+                "cafe_id": cafe["id"], "tableName": f"T{i:02d}", "tableType": "Snooker" if i % 2 else "8-Ball Pool",
+            })
+            assert response.status_code == 201, response.text
+            created.append(response.json())
+
+        staff_token = client.post(f"/api/v1/auth/assume-role/{cafe['id']}", headers=owner).json()["access_token"]
+        return SimpleNamespace(
+            owner=owner, staff={"Authorization": f"Bearer {staff_token}"}, cafe=cafe, tables=created, mobile=mobile
+        )
+
+    return make
@@ -0,0 +1,112 @@
+"""The vectorized bill engine (simulator) has to agree with the scalar one (session end) to the paisa."""
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.billing import batch
+from app.billing.player_timeline import ExtraPlayerTime, integrate_extra_players
+from app.billing.pricing_plan import compile_plan
+from app.models import models
+
+MONEY_FIELDS = ("base_charge", "per_minute_rate", "overtime_charge", "time_based_cost", "extra_player_cost", "total_amount_due")
+
+
+def _random_session(rng):
+    start = datetime(2026, 10, 1, 18, tzinfo=timezone.utc)
+    end = start + timedelta(seconds=rng.randint(1, 4 * 3600), microseconds=rng.randint(0, 999999))
+    timeline = [(start, rng.randint(1, 4))]
+    for _ in range(rng.randint(0, 4)):
+        timeline.append((start + (end - start) * rng.random(), rng.randint(1, 7)))
+    timeline.sort(key=lambda change: change[0])
+    return end - start, timeline, integrate_extra_players(timeline, start, end)
+
+
+@pytest.mark.parametrize("strategy", list(batch.STRATEGY_CODES))
+def test_batch_matches_the_scalar_bill_with_player_timelines(strategy):
+    rng = random.Random(7)
+    rule = models.Pricing(tableType=models.TableType.pool, hourPrice="133.33", halfHourPrice="71.5", extraPlayerPrice="17.35")
+    plan = compile_plan("cafe", strategy, rule)
+
+    minutes, players, extra_player_us, session_us, expected = [], [], [], [], []
+    for i in range(500):
+        duration, timeline, extra_player_time = _random_session(rng)
+        if i % 10 == 0:
+            extra_player_time = None  # timeline nahi: final player count se bill
+        minutes.append(-(-duration // timedelta(minutes=1)))
+        players.append(timeline[-1][1])
+        extra_player_us.append(extra_player_time.extra_player_us if extra_player_time else 0)
+        session_us.append(extra_player_time.session_us if extra_player_time else 0)
+        expected.append(plan.bill(minutes[-1], players[-1], extra_player_time))
+
+    bills = batch.calculate_bills(
+        minutes, players, plan.hour_price_paise, plan.half_hour_price_paise, plan.extra_player_price_paise,
+        plan.strategy_code, extra_player_us, session_us,
+    )
+    for field in ("extra_player_cost", "total_amount_due"):
+        assert bills[field].tolist() == [batch.to_paise(bill[field]) for bill in expected], field
+
+
+@pytest.mark.parametrize("strategy", list(batch.STRATEGY_CODES))
+@pytest.mark.parametrize("hour_price", ["0.71", "60.05", "60.11", "60.14", "133.33", "250"])
+def test_batch_matches_the_scalar_bill_on_half_paise_ties(strategy, hour_price):
+    # minutes * hourPrice / 60 jahan theek aadha paisa aata hai: scalar per-minute rate ko 28 digits par
+    # round karke multiply karta hai, toh tie ke upar ya neeche jaata hai. Batch ko wahi result dena hai.
+    plan = compile_plan("cafe", strategy, models.Pricing(
+        tableType=models.TableType.pool, hourPrice=hour_price, halfHourPrice="71.5", extraPlayerPrice="17.35",
+    ))
+    minutes = [m for m in range(0, 24 * 60 + 1) for _ in (2, 5)]
+    players = [p for _ in range(0, 24 * 60 + 1) for p in (2, 5)]
+    expected = [plan.bill(m, p) for m, p in zip(minutes, players)]
+
+    bills = batch.calculate_bills(
+        minutes, players, plan.hour_price_paise, plan.half_hour_price_paise, plan.extra_player_price_paise,
+        plan.strategy_code,
+    )
+    for field in bills:
+        scalar = [bill[field] for bill in expected]
+        if field in MONEY_FIELDS:
+            scalar = [batch.to_paise(amount) for amount in scalar]
+        assert bills[field].tolist() == scalar, field
+
+
+def test_timed_extra_player_cost_does_not_overflow_int64():
+    # 6 extra players for 30 days at Rs 1,00,000: 2 * price * extra_us > int64
+    session = ExtraPlayerTime(6 * 30 * 86400 * 10**6, 30 * 86400 * 10**6)
+    plan = compile_plan("cafe", models.BillingStrategy.per_minute, models.Pricing(
+        tableType=models.TableType.pool, hourPrice="100", halfHourPrice="60", extraPlayerPrice="100000",
+    ))
+    bills = batch.calculate_bills(
+        30 * 1440, 8, plan.hour_price_paise, plan.half_hour_price_paise, plan.extra_player_price_paise,
+        plan.strategy_code, session.extra_player_us, session.session_us,
+    )
+    assert bills["extra_player_cost"].dtype == np.int64
+    assert int(bills["extra_player_cost"]) == batch.to_paise(plan.bill(30 * 1440, 8, session)["extra_player_cost"])
+
+
+def test_simulator_replays_what_was_billed_when_players_change(client, make_cafe, query_budgets):
+    cafe = make_cafe(tables=2)
+    for table in cafe.tables:
+        session = client.post(
+            "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 3}, headers=cafe.staff
+        ).json()
+        client.post(
+            "/api/v1/staff/sessions/update_players", json={"session_id": session["id"], "numberOfPlayers": 6},
+            headers=cafe.staff,
+        )
+        bill = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=cafe.staff).json()
+        response = client.post("/api/v1/staff/payments/", headers=cafe.staff, json={
+            "game_session_id": session["id"], "total_amount": bill["total_amount_due"], "payment_method": "Cash",
+        })
+        assert response.status_code == 200, response.text
+
+    today = date.today()
+    response = client.post("/api/v1/analytics/owner/simulate-pricing", headers=cafe.owner, json={
+        "start_date": str(today - timedelta(days=1)), "end_date": str(today + timedelta(days=1)),
+        "cafe_ids": [cafe.cafe["id"]],
+    })
+    assert response.status_code == 200, response.text
+    simulation = response.json()
+    assert simulation["sessions_replayed"] == 2
+    assert simulation["baseline_revenue"] == simulation["actual_revenue"]
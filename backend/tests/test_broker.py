@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+from app.realtime.broker import DashboardBroker, RESYNC_MESSAGE
+
+
+def test_publish_on_the_subscribers_loop_is_delivered_immediately():
+    async def scenario():
+        broker = DashboardBroker()
+        queue = broker.subscribe("cafe")
+        broker.publish("cafe", "table", {"id": "t1"})
+        # Koi loop iteration nahi chahiye: message pehle se queue mein hai
+        return queue.get_nowait()
+
+    assert asyncio.run(scenario()).startswith("event: table\n")
+
+
+def test_publish_from_another_thread_reaches_the_loop():
+    async def scenario():
+        broker = DashboardBroker()
+        queue = broker.subscribe("cafe")
+        thread = threading.Thread(target=broker.publish, args=("cafe", "table", {"id": "t1"}))
+        thread.start()
+        thread.join()
+        return await asyncio.wait_for(queue.get(), timeout=1)
+
+    assert asyncio.run(scenario()).startswith("event: table\n")
+
+
+def test_full_queue_is_replaced_by_a_resync():
+    async def scenario():
+        broker = DashboardBroker(queue_size=2)
+        queue = broker.subscribe("cafe")
+        for i in range(3):
+            broker.publish("cafe", "table", {"id": i})
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [RESYNC_MESSAGE]
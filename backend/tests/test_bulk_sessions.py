@@ -0,0 +1,112 @@
+"""Bulk start / end (tournament nights): all tables or none, never a partial batch."""
+import uuid
+
+from sqlalchemy import func, select
+
+from app.models import models
+
+START = "/api/v1/staff/sessions/bulk/start"
+END = "/api/v1/staff/sessions/bulk/end"
+
+
+def _bulk_start(client, cafe, table_ids, players=2):
+    return client.post(START, headers=cafe.staff, json={
+        "sessions": [{"table_id": table_id, "initial_player_count": players} for table_id in table_ids],
+    })
+
+
+def _statuses(client, cafe):
+    tables = client.get("/api/v1/owner/management/tables/", params={"cafe_id": cafe.cafe["id"]}, headers=cafe.owner)
+    return {table["id"]: table["status"] for table in tables.json()}
+
+
+def _session_count(db, cafe):
+    return db.scalar(select(func.count(models.GameSession.id)).join(models.GameSession.table).where(
+        models.Table.cafe_id == uuid.UUID(cafe.cafe["id"])
+    ))
+
+
+def test_bulk_start_and_end_return_results_in_request_order(client, make_cafe):
+    cafe = make_cafe(tables=3)
+    table_ids = [table["id"] for table in reversed(cafe.tables)]
+
+    response = _bulk_start(client, cafe, table_ids)
+    assert response.status_code == 200, response.text
+    sessions = response.json()
+    assert [session["table"]["id"] for session in sessions] == table_ids
+    assert set(_statuses(client, cafe).values()) == {"In Use"}
+
+    session_ids = [session["id"] for session in sessions][::-1]
+    response = client.post(END, json={"session_ids": session_ids}, headers=cafe.staff)
+    assert response.status_code == 200, response.text
+    assert [bill["session_id"] for bill in response.json()["bills"]] == session_ids
+    assert set(_statuses(client, cafe).values()) == {"Available"}
+
+
+def test_bulk_start_with_one_busy_table_starts_none(client, make_cafe, sync_db):
+    cafe = make_cafe(tables=3)
+    busy = cafe.tables[1]
+    assert _bulk_start(client, cafe, [busy["id"]]).status_code == 200
+
+    response = _bulk_start(client, cafe, [table["id"] for table in cafe.tables])
+
+    assert response.status_code == 400
+    assert busy["tableName"] in response.json()["detail"]
+    assert _session_count(sync_db, cafe) == 1
+    assert [status for table_id, status in _statuses(client, cafe).items() if table_id != busy["id"]] == ["Available"] * 2
+
+
+def test_bulk_start_rejects_duplicate_tables(client, make_cafe, sync_db):
+    cafe = make_cafe(tables=2)
+    table_id = cafe.tables[0]["id"]
+
+    response = _bulk_start(client, cafe, [table_id, cafe.tables[1]["id"], table_id])
+
+    assert response.status_code == 400
+    assert _session_count(sync_db, cafe) == 0
+
+
+def test_bulk_start_with_another_cafes_table_starts_none(client, make_cafe, sync_db):
+    cafe, other = make_cafe(tables=2), make_cafe(tables=1)
+
+    response = _bulk_start(client, cafe, [cafe.tables[0]["id"], other.tables[0]["id"]])
+
+    assert response.status_code == 404
+    assert _session_count(sync_db, cafe) == 0 and _session_count(sync_db, other) == 0
+    assert set(_statuses(client, other).values()) == {"Available"}
+
+
+def test_bulk_end_with_one_unknown_session_ends_none(client, make_cafe):
+    cafe = make_cafe(tables=3)
+    sessions = _bulk_start(client, cafe, [table["id"] for table in cafe.tables]).json()
+    ended = sessions[0]["id"]
+    assert client.post(f"/api/v1/staff/sessions/end/{ended}", headers=cafe.staff).status_code == 200
+
+    response = client.post(END, json={"session_ids": [session["id"] for session in sessions]}, headers=cafe.staff)
+
+    assert response.status_code == 404
+    # Baaki do sessions abhi bhi chal rahe hain
+    statuses = _statuses(client, cafe)
+    assert [statuses[table["id"]] for table in cafe.tables] == ["Available", "In Use", "In Use"]
+
+
+def test_bulk_end_rejects_duplicate_sessions(client, make_cafe):
+    cafe = make_cafe(tables=2)
+    sessions = _bulk_start(client, cafe, [table["id"] for table in cafe.tables]).json()
+
+    response = client.post(END, json={"session_ids": [sessions[0]["id"], sessions[1]["id"], sessions[0]["id"]]}, headers=cafe.staff)
+
+    assert response.status_code == 400
+    assert set(_statuses(client, cafe).values()) == {"In Use"}
+
+
+def test_bulk_end_with_another_cafes_session_ends_none(client, make_cafe):
+    cafe, other = make_cafe(tables=1), make_cafe(tables=1)
+    mine = _bulk_start(client, cafe, [cafe.tables[0]["id"]]).json()[0]
+    theirs = _bulk_start(client, other, [other.tables[0]["id"]]).json()[0]
+
+    response = client.post(END, json={"session_ids": [mine["id"], theirs["id"]]}, headers=cafe.staff)
+
+    assert response.status_code == 404
+    assert set(_statuses(client, cafe).values()) == {"In Use"}
+    assert set(_statuses(client, other).values()) == {"In Use"}
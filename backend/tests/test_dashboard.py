@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.cache import live_state
+from app.cache.live_state import table_state_cache
+from app.cache.pricing_plans import pricing_plan_cache
+from app.controllers.gameSession.game_session_controller import _close_session
+from app.controllers.staff import dashboard_controller
+from app.controllers.staff.dashboard_controller import _dashboard_payload
+from app.models import models
+
+
+def test_dashboard_fields_are_all_computed_at_one_now():
+    started = datetime(2026, 10, 18, 18, 0, tzinfo=timezone.utc)
+    now = started + timedelta(hours=1, minutes=2, seconds=3)
+    state = {
+        "cafeName": "Test Cafe",
+        "pricing_rules": [],
+        "tables": {"t1": {
+            "id": "t1", "tableName": "T01", "tableType": "8-Ball Pool", "status": "In Use",
+            "current_session_id": "s1", "startTime": started, "current_players": 2,
+        }},
+    }
+
+    payload = _dashboard_payload(state, {}, now)
+
+    # Snapshot ka elapsed_time usi `now` se jo generated_at hai, wall clock se nahi
+    assert payload["generated_at"] == now
+    assert payload["tables"][0]["elapsed_time"] == "01:02:03"
+
+
+def test_snapshot_racing_a_write_is_not_cached(client, make_cafe, sync_db, monkeypatch):
+    cafe = make_cafe(tables=2)
+    cafe_id, table_id = cafe.cafe["id"], cafe.tables[0]["id"]
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+    table_state_cache.invalidate(cafe_id)
+    load = dashboard_controller.load_cafe_live_state
+
+    async def load_then_race(db, *args, **kwargs):
+        state = await load(db, *args, **kwargs)
+        if load_then_race.raced:
+            return state
+        load_then_race.raced = True
+        # Snapshot lene ke baad doosri request session start karke commit karti hai; cafe
+        # abhi cache mein nahi, toh uska write-through kuch update nahi karta
+        staff = sync_db.scalar(select(models.Staff).where(models.Staff.cafe_id == uuid.UUID(cafe_id)))
+        session = models.GameSession(table_id=uuid.UUID(table_id), staff_id=staff.id, current_players=2)
+        sync_db.add(session)
+        sync_db.flush()
+        table = sync_db.get(models.Table, uuid.UUID(table_id))
+        table.status, table.active_session_id = models.TableStatus.in_use, session.id
+        sync_db.commit()
+        live_state.mark_session_started(cafe_id, table_id, str(session.id), session.startTime, 2)
+        return state
+
+    load_then_race.raced = False
+    monkeypatch.setattr(dashboard_controller, "load_cafe_live_state", load_then_race)
+
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+    response = client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+
+    tables = {table["id"]: table for table in response.json()["tables"]}
+    assert tables[table_id]["status"] == "In Use"
+
+
+def test_live_quote_matches_the_final_bill_for_the_same_end_time(client, make_cafe, sync_db):
+    cafe = make_cafe(tables=1)
+    cafe_id, table_id = cafe.cafe["id"], cafe.tables[0]["id"]
+    session = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table_id, "initial_player_count": 3}, headers=cafe.staff
+    ).json()
+    client.post(
+        "/api/v1/staff/sessions/update_players", json={"session_id": session["id"], "numberOfPlayers": 5},
+        headers=cafe.staff,
+    )
+    # Player change ko session ke 20 min baad le jaate hain, phir live state DB se dobara banti hai
+    session_id = uuid.UUID(session["id"])
+    db_session = sync_db.get(models.GameSession, session_id)
+    change = sync_db.scalars(
+        select(models.PlayerChange).where(models.PlayerChange.session_id == session_id, models.PlayerChange.numberOfPlayers == 5)
+    ).one()
+    change.timestamp = db_session.startTime + timedelta(minutes=20)
+    sync_db.commit()
+    table_state_cache.invalidate(cafe_id)
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+
+    state, _ = table_state_cache.get_versioned(cafe_id)
+    plans = pricing_plan_cache.get_cached(cafe_id)
+    table_state = state["tables"][table_id]
+    end_time = table_state["startTime"] + timedelta(minutes=47, seconds=13)
+    quote = dashboard_controller._quote_running_table(table_state, plans, end_time)
+
+    timeline = sync_db.execute(
+        select(models.PlayerChange.timestamp, models.PlayerChange.numberOfPlayers)
+        .where(models.PlayerChange.session_id == session_id).order_by(models.PlayerChange.timestamp)
+    ).all()
+    plan = plans[db_session.table.tableType]
+    bill = _close_session(db_session, plan, timeline, db_session.startTime + timedelta(minutes=47, seconds=13))
+    sync_db.rollback()
+
+    assert quote["average_extra_players"] is not None
+    assert quote == bill
+
+
+def test_quotes_cover_only_running_tables(client, make_cafe):
+    cafe = make_cafe(tables=3)
+    session = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": cafe.tables[1]["id"], "initial_player_count": 4},
+        headers=cafe.staff,
+    ).json()
+
+    response = client.get("/api/v1/staff/dashboard/quotes", headers=cafe.staff)
+
+    assert response.status_code == 200, response.text
+    [quote] = response.json()["quotes"]
+    assert quote["table_id"] == cafe.tables[1]["id"] and quote["session_id"] == session["id"]
+    assert quote["final_player_count"] == 4
+    # Pro-rata, pehle 30 min: half-hour price + 2 extra players jitni der khele
+    assert Decimal(quote["base_charge"]) == Decimal("70")
+    assert quote["average_extra_players"] is not None
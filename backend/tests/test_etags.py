@@ -0,0 +1,92 @@
+"""
+Owner management reads (cafes, tables, pricing, staff) carry an ETag built from
+cafes.management_version: the same tag gets a bodiless 304, any write that bumps
+the version gets a 200 with a new tag.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.models import models
+from conftest import PIN
+
+
+def _add_table(client, cafe):
+    return client.post("/api/v1/owner/management/tables/", headers=cafe.owner, json={
+        "cafe_id": cafe.cafe["id"], "tableName": "New", "tableType": "Snooker",
+    })
+
+
+def _reprice(client, cafe):
+    return client.post("/api/v1/owner/management/pricing/", headers=cafe.owner, json={
+        "cafe_id": cafe.cafe["id"], "tableType": "Snooker", "hourPrice": "150", "halfHourPrice": "80", "extraPlayerPrice": "20",
+    })
+
+
+def _add_staff(client, cafe):
+    return client.post("/api/v1/owner/staff/", headers=cafe.owner, json={
+        "staffName": "Asha", "mobileNo": f"84{uuid.uuid4().int % 10**8:08d}", "pin": PIN, "cafe_id": cafe.cafe["id"],
+    })
+
+
+def _rename_cafe(client, cafe):
+    return client.put(f"/api/v1/owner/cafes/{cafe.cafe['id']}", headers=cafe.owner, json={
+        "cafeName": "Renamed Cafe", "billingStrategy": cafe.cafe["billingStrategy"],
+    })
+
+
+ENDPOINTS = {
+    "tables": ("/api/v1/owner/management/tables/", True, _add_table),
+    "pricing": ("/api/v1/owner/management/pricing/", True, _reprice),
+    "staff": ("/api/v1/owner/staff/", True, _add_staff),
+    "cafes": ("/api/v1/owner/cafes/", False, _rename_cafe),
+}
+
+
+def _get(client, cafe, endpoint, etag=None):
+    path, by_cafe, _ = ENDPOINTS[endpoint]
+    headers = {**cafe.owner, **({"If-None-Match": etag} if etag else {})}
+    return client.get(path, params={"cafe_id": cafe.cafe["id"]} if by_cafe else None, headers=headers)
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINTS))
+def test_matching_etag_gets_a_bodiless_304(client, make_cafe, endpoint):
+    cafe = make_cafe(tables=2)
+    first = _get(client, cafe, endpoint)
+    assert first.status_code == 200 and first.headers["etag"]
+
+    response = _get(client, cafe, endpoint, first.headers["etag"])
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == first.headers["etag"]
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINTS))
+def test_write_gives_a_200_with_a_new_etag(client, make_cafe, endpoint):
+    cafe = make_cafe(tables=2)
+    first = _get(client, cafe, endpoint)
+
+    write = ENDPOINTS[endpoint][2](client, cafe)
+    assert write.status_code in (200, 201), write.text
+
+    response = _get(client, cafe, endpoint, first.headers["etag"])
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json() != first.json()
+
+
+@pytest.mark.parametrize("endpoint", list(ENDPOINTS))
+def test_version_bumped_by_another_worker_changes_the_etag(client, make_cafe, sync_db, endpoint):
+    cafe = make_cafe(tables=2)
+    first = _get(client, cafe, endpoint)
+
+    # Doosre worker ka bump_management_version: sirf DB mein, is process ka koi cache nahi
+    sync_db.execute(update(models.Cafe).where(models.Cafe.id == uuid.UUID(cafe.cafe["id"])).values(
+        management_version=models.Cafe.management_version + 1
+    ))
+    sync_db.commit()
+
+    response = _get(client, cafe, endpoint, first.headers["etag"])
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
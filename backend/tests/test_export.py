@@ -0,0 +1,82 @@
+"""
+Owner payment export: the streamed CSV / Parquet carries one row per payment,
+joined with its session, table, staff and cafe, across chunk boundaries.
+"""
+import csv
+import io
+from decimal import Decimal
+
+import pytest
+
+from app.controllers.owner import export_controller
+
+EXPORT = "/api/v1/owner/exports/payments"
+
+
+def _pay(client, cafe, table, method):
+    session = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2}, headers=cafe.staff
+    ).json()
+    bill = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=cafe.staff).json()
+    payment = client.post("/api/v1/staff/payments/", headers=cafe.staff, json={
+        "game_session_id": session["id"], "total_amount": bill["total_amount_due"], "payment_method": method,
+    }).json()
+    return {
+        "payment_id": payment["id"], "session_id": session["id"], "table_id": table["id"],
+        "tableName": table["tableName"], "paymentMethod": method, "totalAmount": Decimal(bill["total_amount_due"]),
+    }
+
+
+@pytest.fixture
+def exported_cafe(client, make_cafe, monkeypatch):
+    cafe = make_cafe(tables=3)
+    make_cafe(tables=1)  # doosre owner ka data export mein nahi aana chahiye
+    cafe.payments = [_pay(client, cafe, table, method) for table, method in zip(cafe.tables, ["Cash", "Online", "Cash"])]
+    # Har row alag chunk mein: stream ke chunk boundaries bhi test hote hain
+    monkeypatch.setattr(export_controller, "EXPORT_CHUNK_SIZE", 1)
+    return cafe
+
+
+def _check_rows(cafe, rows):
+    assert sorted(row["payment_id"] for row in rows) == sorted(payment["payment_id"] for payment in cafe.payments)
+    by_id = {row["payment_id"]: row for row in rows}
+    for payment in cafe.payments:
+        row = by_id[payment["payment_id"]]
+        assert {key: row[key] for key in ("session_id", "table_id", "tableName", "paymentMethod")} == {
+            key: payment[key] for key in ("session_id", "table_id", "tableName", "paymentMethod")
+        }
+        assert Decimal(row["totalAmount"]) == payment["totalAmount"]
+        assert row["cafe_id"] == cafe.cafe["id"] and row["cafeName"] == cafe.cafe["cafeName"]
+        assert row["staffName"]
+
+
+def test_csv_export_streams_every_payment(client, exported_cafe):
+    response = client.get(EXPORT, params={"format": "csv"}, headers=exported_cafe.owner)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames == export_controller.EXPORT_COLUMNS
+    rows = list(reader)
+    _check_rows(exported_cafe, rows)
+    # Rows paymentTimestamp ke order mein
+    assert [row["paymentTimestamp"] for row in rows] == sorted(row["paymentTimestamp"] for row in rows)
+
+
+def test_parquet_export_streams_every_payment(client, exported_cafe):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    response = client.get(EXPORT, params={"format": "parquet"}, headers=exported_cafe.owner)
+
+    assert response.status_code == 200, response.text
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == export_controller.EXPORT_COLUMNS
+    # Chunk size 1: har payment apna row group
+    assert pq.ParquetFile(io.BytesIO(response.content)).num_row_groups == 3
+    _check_rows(exported_cafe, table.to_pylist())
+
+
+def test_export_of_another_owners_cafe_is_a_404(client, make_cafe, exported_cafe):
+    other = make_cafe(tables=1)
+    response = client.get(EXPORT, params={"cafe_id": other.cafe["id"]}, headers=exported_cafe.owner)
+    assert response.status_code == 404
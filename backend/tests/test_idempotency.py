@@ -0,0 +1,94 @@
+"""Two requests racing for the same table / the same Idempotency-Key: exactly one wins."""
+import hashlib
+import json
+import threading
+
+from app.cache.idempotency import IN_PROGRESS, NEW, REPLAY, IdempotencyStore, idempotency_store
+
+ORIGIN = "http://localhost:5173"
+
+
+def _race(client, requests):
+    """Fires the (method, url, kwargs) requests from separate threads at the same moment."""
+    barrier = threading.Barrier(len(requests))
+    responses = [None] * len(requests)
+
+    def send(i, method, url, kwargs):
+        barrier.wait()
+        responses[i] = client.request(method, url, **kwargs)
+
+    threads = [threading.Thread(target=send, args=(i, *request)) for i, request in enumerate(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+def test_simultaneous_starts_on_one_table_give_one_session(client, make_cafe):
+    cafe = make_cafe(tables=1)
+    start = ("POST", "/api/v1/staff/sessions/start", {
+        "json": {"table_id": cafe.tables[0]["id"], "initial_player_count": 2}, "headers": cafe.staff,
+    })
+    for _ in range(5):
+        responses = _race(client, [start, start])
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [200, 400], [response.text for response in responses]
+        assert "not available" in next(r for r in responses if r.status_code == 400).json()["detail"]
+
+        session = next(r for r in responses if r.status_code == 200).json()
+        response = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=cafe.staff)
+        assert response.status_code == 200, response.text
+
+
+def test_simultaneous_retries_with_one_key_start_one_session(client, make_cafe):
+    cafe = make_cafe(tables=1)
+    start = ("POST", "/api/v1/staff/sessions/start", {
+        "json": {"table_id": cafe.tables[0]["id"], "initial_player_count": 2},
+        "headers": {**cafe.staff, "Idempotency-Key": "start-t00"},
+    })
+    responses = _race(client, [start, start])
+    statuses = sorted(response.status_code for response in responses)
+    # Doosra ya toh "abhi chal raha hai" (409) paata hai ya pehle ka replay (200, same session)
+    assert statuses in ([200, 409], [200, 200]), [response.text for response in responses]
+    ids = {response.json()["id"] for response in responses if response.status_code == 200}
+    assert len(ids) == 1
+
+
+def test_size_limit_never_evicts_a_request_in_progress():
+    store = IdempotencyStore(max_entries=2, ttl_seconds=60)
+    assert store.reserve(("caller", "/start", "running"), "a") == (NEW, None)
+    assert store.reserve(("caller", "/start", "done"), "b") == (NEW, None)
+    store.complete(("caller", "/start", "done"), {"status": 200})
+
+    assert store.reserve(("caller", "/start", "new"), "c") == (NEW, None)
+    # Completed wali gayi, chalti hui reservation abhi bhi duplicate ko rokti hai
+    assert store.reserve(("caller", "/start", "running"), "a") == (IN_PROGRESS, None)
+    assert store.reserve(("caller", "/start", "done"), "b") == (NEW, None)
+
+    store.complete(("caller", "/start", "running"), {"status": 200})
+    assert store.reserve(("caller", "/start", "running"), "a") == (REPLAY, {"status": 200})
+
+
+def test_idempotency_errors_carry_cors_headers(client, make_cafe):
+    cafe = make_cafe(tables=1)
+    body = json.dumps({"table_id": cafe.tables[0]["id"], "initial_player_count": 2}).encode()
+    headers = {**cafe.staff, "Content-Type": "application/json", "Origin": ORIGIN}
+    # Pehli request (same key, same body) abhi chal rahi hai, jaise doosre tab se
+    caller = hashlib.sha256(cafe.staff["Authorization"].encode()).hexdigest()
+    key = (caller, "/api/v1/staff/sessions/start", "busy-key")
+    idempotency_store.reserve(key, hashlib.sha256(body).hexdigest())
+    try:
+        response = client.post(
+            "/api/v1/staff/sessions/start", content=body, headers={**headers, "Idempotency-Key": "busy-key"}
+        )
+    finally:
+        idempotency_store.release(key)
+    assert response.status_code == 409
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert "retry-after" in response.headers["access-control-expose-headers"].lower()
+    assert response.headers["retry-after"] == "1"
+
+    response = client.post("/api/v1/staff/sessions/start", content=body, headers={**headers, "Idempotency-Key": "x" * 300})
+    assert response.status_code == 400
+    assert response.headers["access-control-allow-origin"] == ORIGIN
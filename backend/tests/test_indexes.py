@@ -0,0 +1,86 @@
+"""
+The hot-path indexes (migrations a41d7c2e9f03, 7d3a9c1e5b20 and 2f8c6d1e4a90)
+have to be the ones the planner picks for the statements the controllers
+actually run. The statements are recorded while a shift is played through the
+API and checked with SQLite's EXPLAIN QUERY PLAN; Postgres has the same indexes,
+so a query that stops matching its index here stops there too.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.cache.live_state import table_state_cache
+from app.db import db as app_db
+
+# index -> ORDER BY bhi isi index se aana chahiye (alag sort nahi)
+HOT_INDEXES = {
+    # Dashboard rebuild: cafe ke tables, naam (phir id) ke order mein
+    "ix_tables_cafe_id_tableName_id": True,
+    # Staff ki payment history / analytics joins
+    "ix_game_sessions_staff_id": False,
+    # Session end / bulk end / dashboard rebuild: player timeline(s), timestamp ke order mein
+    "ix_player_changes_session_id_timestamp": True,
+    # Owner payment history ka pehla aur agla page (keyset)
+    "ix_payments_paymentTimestamp_id": True,
+    # Pricing plan load
+    "ix_pricing_cafe_id_tableType": False,
+    # Staff analytics, rollup se
+    "ix_revenue_rollups_staff_id_day": False,
+}
+
+_SORT = re.compile(r"TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY")
+
+
+@pytest.fixture
+def hot_path_plans(client, make_cafe, sync_db):
+    """Plays a short shift through the API and returns the plan of every SELECT it ran."""
+    cafe = make_cafe(tables=3)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(app_db.async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        sessions = client.post("/api/v1/staff/sessions/bulk/start", headers=cafe.staff, json={
+            "sessions": [{"table_id": table["id"], "initial_player_count": 2} for table in cafe.tables[:2]],
+        }).json()
+        client.post(
+            "/api/v1/staff/sessions/update_players", json={"session_id": sessions[0]["id"], "numberOfPlayers": 4},
+            headers=cafe.staff,
+        )
+        table_state_cache.invalidate(cafe.cafe["id"])
+        client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+
+        bill = client.post(f"/api/v1/staff/sessions/end/{sessions[0]['id']}", headers=cafe.staff).json()
+        bills = [bill, *client.post(
+            "/api/v1/staff/sessions/bulk/end", json={"session_ids": [sessions[1]["id"]]}, headers=cafe.staff
+        ).json()["bills"]]
+        for bill in bills:
+            client.post("/api/v1/staff/payments/", headers=cafe.staff, json={
+                "game_session_id": bill["session_id"], "total_amount": bill["total_amount_due"], "payment_method": "Cash",
+            })
+
+        client.get("/api/v1/staff/payments/history", headers=cafe.staff)
+        client.get("/api/v1/analytics/staff/today", headers=cafe.staff)
+        page = client.get("/api/v1/owner/payments/", params={"limit": 1}, headers=cafe.owner).json()
+        client.get("/api/v1/owner/payments/", params={"limit": 1, "cursor": page["next_cursor"]}, headers=cafe.owner)
+    finally:
+        event.remove(app_db.async_engine.sync_engine, "before_cursor_execute", record)
+
+    connection = sync_db.connection()
+    return [
+        "\n".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all())
+        for statement, parameters in statements
+    ]
+
+
+@pytest.mark.parametrize("index", list(HOT_INDEXES))
+def test_hot_query_uses_its_index(hot_path_plans, index):
+    plans = [plan for plan in hot_path_plans if re.search(rf"INDEX {index}\b", plan)]
+    assert plans, f"no statement used {index}"
+    if HOT_INDEXES[index]:
+        for plan in plans:
+            assert not _SORT.search(plan), plan
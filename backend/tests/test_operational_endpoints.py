@@ -0,0 +1,38 @@
+"""/metrics and /health/db-pool are for the scraper only, not for whoever finds the API host."""
+import pytest
+
+from app.core.config import settings
+
+TOKEN = "scrape-secret"
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", TOKEN)
+
+
+def test_metrics_needs_the_scrape_token(client, metrics_token):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert "billiards_" in response.text
+
+
+def test_metrics_is_off_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get("/metrics", headers={"Authorization": "Bearer anything"}).status_code == 404
+
+
+def test_db_pool_status_needs_the_same_token(client, metrics_token):
+    assert client.get("/health/db-pool").status_code == 401
+
+    response = client.get("/health/db-pool", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert "sync" in response.json()
+
+
+def test_db_pool_status_is_off_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get("/health/db-pool").status_code == 404
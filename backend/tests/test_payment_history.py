@@ -0,0 +1,78 @@
+"""Keyset pagination of the payment history: every payment exactly once, in order, even with equal timestamps."""
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.models import models
+
+SHARED = datetime(2026, 10, 18, 19, 30, tzinfo=timezone.utc)
+
+
+def _pay(client, cafe, table):
+    session = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2}, headers=cafe.staff
+    ).json()
+    bill = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=cafe.staff).json()
+    response = client.post("/api/v1/staff/payments/", headers=cafe.staff, json={
+        "game_session_id": session["id"], "total_amount": bill["total_amount_due"], "payment_method": "Cash",
+    })
+    assert response.status_code == 200, response.text
+    return uuid.UUID(response.json()["id"])
+
+
+@pytest.fixture
+def paid_cafe(client, make_cafe, sync_db):
+    """Cafe with 7 payments: 5 at the same instant, 2 a minute earlier."""
+    cafe = make_cafe(tables=7)
+    payment_ids = [_pay(client, cafe, table) for table in cafe.tables]
+    for payment_id, timestamp in zip(payment_ids, [SHARED] * 5 + [SHARED - timedelta(minutes=1)] * 2):
+        sync_db.execute(update(models.Payment).where(models.Payment.id == payment_id).values(paymentTimestamp=timestamp))
+    sync_db.commit()
+    cafe.payment_ids = payment_ids
+    return cafe
+
+
+def _pages(client, path, headers, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append([uuid.UUID(item["id"]) for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("path, as_owner", [
+    ("/api/v1/owner/payments/", True),
+    ("/api/v1/staff/payments/history", False),
+])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_pages_cover_every_payment_once_in_order(client, paid_cafe, path, as_owner, limit):
+    pages = _pages(client, path, paid_cafe.owner if as_owner else paid_cafe.staff, limit)
+
+    seen = [payment_id for page in pages for payment_id in page]
+    # Koi duplicate nahi, koi gap nahi, aur (paymentTimestamp, id) DESC order
+    assert len(seen) == len(set(seen)) == 7
+    assert set(seen) == set(paid_cafe.payment_ids)
+    shared, earlier = paid_cafe.payment_ids[:5], paid_cafe.payment_ids[5:]
+    assert seen == sorted(shared, key=str, reverse=True) + sorted(earlier, key=str, reverse=True)
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_cursor_is_the_last_rows_timestamp_and_id(client, paid_cafe):
+    page = client.get("/api/v1/owner/payments/", params={"limit": 2}, headers=paid_cafe.owner).json()
+
+    timestamp, payment_id = base64.urlsafe_b64decode(page["next_cursor"]).decode().split("|")
+    assert payment_id == page["items"][-1]["id"]
+    assert datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc) == SHARED
+
+
+def test_tampered_cursor_is_a_400(client, paid_cafe):
+    response = client.get("/api/v1/owner/payments/", params={"cursor": "not-a-cursor"}, headers=paid_cafe.owner)
+    assert response.status_code == 400
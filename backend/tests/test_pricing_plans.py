@@ -0,0 +1,57 @@
+"""A bill is priced with the pricing in the database, even when another worker changed it."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.cache.pricing_plans import pricing_plan_cache
+from app.models import models
+
+
+def _start(client, cafe, table):
+    response = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2}, headers=cafe.staff
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _reprice_from_another_worker(db, cafe_id, half_hour_price):
+    # Doosre worker ka set_pricing: DB badla, version badha, par is process ka cache invalidate nahi hua
+    db.execute(update(models.Pricing).where(models.Pricing.cafe_id == cafe_id).values(halfHourPrice=half_hour_price))
+    db.execute(update(models.Cafe).where(models.Cafe.id == cafe_id).values(
+        management_version=models.Cafe.management_version + 1
+    ))
+    db.commit()
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_billing_sees_pricing_changed_by_another_worker(client, make_cafe, sync_db, bulk):
+    cafe = make_cafe(tables=1)
+    session = _start(client, cafe, cafe.tables[0])
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)  # pricing plans cache mein
+
+    _reprice_from_another_worker(sync_db, cafe.cafe["id"], "95")
+
+    if bulk:
+        response = client.post("/api/v1/staff/sessions/bulk/end", json={"session_ids": [session["id"]]}, headers=cafe.staff)
+        bill = response.json()["bills"][0]
+    else:
+        response = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=cafe.staff)
+        bill = response.json()
+    assert response.status_code == 200, response.text
+    # Pro-rata, pehle 30 min ke andar: sirf half-hour price
+    assert Decimal(bill["total_amount_due"]) == Decimal("95")
+
+
+def test_cafe_without_pricing_is_cached_at_its_version(client, make_cafe, sync_db):
+    cafe = make_cafe(tables=1)
+    sync_db.execute(delete(models.Pricing).where(models.Pricing.cafe_id == cafe.cafe["id"]))
+    sync_db.commit()
+    pricing_plan_cache.invalidate(cafe.cafe["id"])
+
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+
+    # Khaali plans bhi cafe ke asli version par: billing ka version check har baar reload nahi karta
+    version = sync_db.scalar(select(models.Cafe.management_version).where(models.Cafe.id == cafe.cafe["id"]))
+    assert pricing_plan_cache.get_cached(cafe.cafe["id"], version) == {}
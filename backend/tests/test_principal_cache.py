@@ -0,0 +1,83 @@
+"""
+Cached principals (app/cache/principals.py) must not outlive the rows they were
+built from: a deleted or re-numbered staff member's token stops working at once,
+and an owner whose staff profile was deleted gets a fresh one on the next request.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.cache.principals import principal_cache
+from app.models import models
+from conftest import PIN
+
+STAFF_TODAY = "/api/v1/analytics/staff/today"
+
+
+def _mobile():
+    return f"85{uuid.uuid4().int % 10**8:08d}"
+
+
+def _cached(mobileNo):
+    return [key for key in principal_cache._entries if key[0] == mobileNo]
+
+
+@pytest.fixture
+def staff_member(client, make_cafe):
+    """A cafe with one hired staff member, logged in, whose principal is already cached."""
+    cafe = make_cafe(tables=2)
+    mobile = _mobile()
+    staff = client.post("/api/v1/owner/staff/", headers=cafe.owner, json={
+        "staffName": "Asha", "mobileNo": mobile, "pin": PIN, "cafe_id": cafe.cafe["id"],
+    }).json()
+    token = client.post("/api/v1/auth/login", data={"username": mobile, "password": PIN}).json()["access_token"]
+    cafe.member = staff
+    cafe.member_auth = {"Authorization": f"Bearer {token}"}
+
+    assert client.get(STAFF_TODAY, headers=cafe.member_auth).status_code == 200
+    assert _cached(mobile)
+    return cafe
+
+
+def test_deleted_staff_token_stops_working(client, staff_member):
+    response = client.delete(f"/api/v1/owner/staff/{staff_member.member['id']}", headers=staff_member.owner)
+    assert response.status_code == 204
+
+    assert not _cached(staff_member.member["mobileNo"])
+    assert client.get(STAFF_TODAY, headers=staff_member.member_auth).status_code == 401
+
+
+def test_renumbered_staff_old_token_stops_working(client, staff_member):
+    new_mobile = _mobile()
+    response = client.put(f"/api/v1/owner/staff/{staff_member.member['id']}", headers=staff_member.owner, json={
+        "staffName": "Asha K", "mobileNo": new_mobile,
+    })
+    assert response.status_code == 200, response.text
+
+    assert not _cached(staff_member.member["mobileNo"])
+    assert client.get(STAFF_TODAY, headers=staff_member.member_auth).status_code == 401
+    token = client.post("/api/v1/auth/login", data={"username": new_mobile, "password": PIN}).json()["access_token"]
+    assert client.get(STAFF_TODAY, headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_owner_as_staff_self_heals_after_its_profile_is_deleted(client, make_cafe, sync_db):
+    cafe = make_cafe(tables=2)
+    assert client.get(STAFF_TODAY, headers=cafe.staff).status_code == 200
+    (profile,) = client.get("/api/v1/owner/staff/", params={"cafe_id": cafe.cafe["id"]}, headers=cafe.owner).json()
+    assert _cached(cafe.mobile)
+
+    response = client.delete(f"/api/v1/owner/staff/{profile['id']}", headers=cafe.owner)
+    assert response.status_code == 204
+    assert not _cached(cafe.mobile)
+
+    # Stale profile cache mein rehta toh session purane (deleted) staff_id se banta
+    session = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": cafe.tables[0]["id"], "initial_player_count": 2},
+        headers=cafe.staff,
+    )
+    assert session.status_code == 200, session.text
+    (healed,) = client.get("/api/v1/owner/staff/", params={"cafe_id": cafe.cafe["id"]}, headers=cafe.owner).json()
+    assert healed["id"] != profile["id"] and healed["mobileNo"] == cafe.mobile
+    staff_id = sync_db.scalar(select(models.GameSession.staff_id).where(models.GameSession.id == uuid.UUID(session.json()["id"])))
+    assert str(staff_id) == healed["id"]
@@ -0,0 +1,55 @@
+"""
+Statement counts for the hot paths. A change that adds a query per table (N+1)
+or an extra round trip to start / end fails here instead of in production.
+QUERY_BUDGETS (conftest) caps every request; these pin the warm-cache numbers.
+"""
+import pytest
+
+from app.cache.live_state import table_state_cache
+
+DASHBOARD = ("GET", "/api/v1/staff/dashboard")
+
+
+def _start(client, cafe, table):
+    response = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2}, headers=cafe.staff
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("tables", [2, 12])
+def test_cold_dashboard_is_a_fixed_number_of_queries(client, make_cafe, query_budgets, tables):
+    cafe = make_cafe(tables=tables)
+    _start(client, cafe, cafe.tables[0])
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)  # principal + pricing plan caches warm
+    table_state_cache.invalidate(cafe.cafe["id"])
+
+    response = client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+    assert response.status_code == 200
+    assert len(response.json()["tables"]) == tables
+    # tables + cafe + pricing + active sessions ki player timeline, table count chahe jitna ho
+    assert query_budgets[-1] == (*DASHBOARD, 4)
+
+
+def test_warm_dashboard_runs_no_queries(client, make_cafe, query_budgets):
+    cafe = make_cafe()
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+    _start(client, cafe, cafe.tables[1])  # write-through, cache warm rehta hai
+
+    response = client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+    assert response.status_code == 200
+    assert query_budgets[-1] == (*DASHBOARD, 0)
+
+
+def test_start_and_end_session_query_counts(client, make_cafe, query_budgets):
+    cafe = make_cafe()
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)
+
+    session = _start(client, cafe, cafe.tables[0])
+    response = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=cafe.staff)
+    assert response.status_code == 200, response.text
+    assert query_budgets[-2:] == [
+        ("POST", "/api/v1/staff/sessions/start", 7),
+        ("POST", "/api/v1/staff/sessions/end/{session_id}", 5),
+    ]
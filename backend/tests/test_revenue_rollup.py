@@ -0,0 +1,47 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from app.analytics import rollup
+from app.core import local_time
+from app.models import models
+
+
+def _play(client, cafe, table, method):
+    headers = cafe.staff
+    session = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 3}, headers=headers
+    ).json()
+    bill = client.post(f"/api/v1/staff/sessions/end/{session['id']}", headers=headers).json()
+    response = client.post("/api/v1/staff/payments/", headers=headers, json={
+        "game_session_id": session["id"], "total_amount": bill["total_amount_due"], "payment_method": method,
+    })
+    assert response.status_code == 200, response.text
+
+
+def _rollup_rows(db, cafe_id):
+    return sorted(db.execute(select(
+        models.RevenueRollup.staff_id, models.RevenueRollup.day, models.RevenueRollup.hour,
+        models.RevenueRollup.paymentMethod, models.RevenueRollup.tableType,
+        models.RevenueRollup.totalRevenue, models.RevenueRollup.paymentCount,
+    ).where(models.RevenueRollup.cafe_id == cafe_id)).all(), key=repr)
+
+
+def test_rebuild_matches_the_incrementally_maintained_rollup(client, make_cafe, sync_db, query_budgets):
+    cafe = make_cafe()
+    for table, method in zip(cafe.tables, ["Cash", "Online", "Cash", "Cash"]):
+        _play(client, cafe, table, method)
+
+    maintained = _rollup_rows(sync_db, cafe.cafe["id"])
+    assert sum(row.paymentCount for row in maintained) == 4
+
+    rollup.rebuild(sync_db, cafe_id=cafe.cafe["id"])
+    sync_db.commit()
+    assert _rollup_rows(sync_db, cafe.cafe["id"]) == maintained
+
+
+def test_buckets_use_the_analytics_timezone_not_the_servers(monkeypatch):
+    monkeypatch.setattr(local_time, "ZONE", ZoneInfo("Asia/Kolkata"))
+    # 20:45 UTC = agle din 02:15 IST
+    assert rollup.bucket_for(datetime(2026, 10, 18, 20, 45, tzinfo=timezone.utc)) == (date(2026, 10, 19), 2)
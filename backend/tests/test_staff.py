@@ -0,0 +1,62 @@
+import uuid
+
+from app.core import metrics
+from conftest import PIN
+
+
+def test_deleting_staff_with_a_running_session_frees_the_table(client, make_cafe, query_budgets):
+    cafe = make_cafe()
+    staff = client.post("/api/v1/owner/staff/", headers=cafe.owner, json={
+        "staffName": "Ravi", "mobileNo": "8200000001", "pin": PIN, "cafe_id": cafe.cafe["id"],
+    }).json()
+    token = client.post("/api/v1/auth/login", data={"username": "8200000001", "password": PIN}).json()["access_token"]
+    table = cafe.tables[0]
+    response = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    client.get("/api/v1/staff/dashboard", headers=cafe.staff)  # live state cache warm
+
+    response = client.delete(f"/api/v1/owner/staff/{staff['id']}", headers=cafe.owner)
+    assert response.status_code == 204, response.text
+
+    tables = client.get(f"/api/v1/owner/management/tables/?cafe_id={cafe.cafe['id']}", headers=cafe.owner).json()
+    assert {t["id"]: t["status"] for t in tables}[table["id"]] == "Available"
+    dashboard = client.get("/api/v1/staff/dashboard", headers=cafe.staff).json()
+    freed = next(t for t in dashboard["tables"] if t["id"] == table["id"])
+    assert freed["status"] == "Available" and freed["current_session_id"] is None
+    # Table dobara claim ho sakta hai
+    response = client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2}, headers=cafe.staff
+    )
+    assert response.status_code == 200, response.text
+
+
+def _active_tables(cafe_id):
+    return metrics.active_tables._values.get((str(cafe_id),), 0)
+
+
+def test_deleting_staff_lowers_the_active_tables_gauge_per_freed_table(client, make_cafe):
+    cafe = make_cafe()
+    mobile = f"82{uuid.uuid4().int % 10**8:08d}"
+    staff = client.post("/api/v1/owner/staff/", headers=cafe.owner, json={
+        "staffName": "Ravi", "mobileNo": mobile, "pin": PIN, "cafe_id": cafe.cafe["id"],
+    }).json()
+    token = client.post("/api/v1/auth/login", data={"username": mobile, "password": PIN}).json()["access_token"]
+    for table in cafe.tables[:2]:
+        response = client.post(
+            "/api/v1/staff/sessions/start", json={"table_id": table["id"], "initial_player_count": 2},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200, response.text
+    client.post(
+        "/api/v1/staff/sessions/start", json={"table_id": cafe.tables[2]["id"], "initial_player_count": 2},
+        headers=cafe.staff,
+    )
+    assert _active_tables(cafe.cafe["id"]) == 3
+
+    response = client.delete(f"/api/v1/owner/staff/{staff['id']}", headers=cafe.owner)
+    assert response.status_code == 204, response.text
+    # Dashboard reload se pehle hi: gauge delete ne khud ghataya
+    assert _active_tables(cafe.cafe["id"]) == 1
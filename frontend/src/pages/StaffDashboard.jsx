@@ -1,7 +1,7 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { getStaffDashboard } from '../services/api';
+import { getStaffDashboard, subscribeToDashboard } from '../services/api';
 import SessionModal from '../components/SessionModal';
 import Toast from '../components/Toast';
 import LiveTimer from '../components/LiveTimer';
@@ -37,6 +37,24 @@ const StaffDashboard = () => {
   useEffect(() => {
     fetchDashboard();
   }, [fetchDashboard]);
+
+  // Live updates: server sirf badle hue table ka delta bhejta hai
+  const fetchDashboardRef = useRef(fetchDashboard);
+  fetchDashboardRef.current = fetchDashboard;
+
+  useEffect(() => {
+    const unsubscribe = subscribeToDashboard((eventName, data) => {
+      if (eventName === 'table') {
+        setDashboardData((prev) => ({
+          ...prev,
+          tables: prev.tables.map((table) => (table.id === data.id ? { ...table, ...data } : table)),
+        }));
+      } else if (eventName === 'resync') {
+        fetchDashboardRef.current();
+      }
+    });
+    return unsubscribe;
+  }, []);
   
   const getStatusColor = (status) => {
     switch (status) {
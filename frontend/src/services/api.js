@@ -70,6 +70,61 @@ export const assumeStaffRole = (cafeId) => {
  */
 export const getStaffDashboard = () => apiClient.get('/staff/dashboard');
 
+/**
+ * Subscribes to live per-table dashboard updates (Server-Sent Events).
+ * EventSource auth header nahi bhej sakta, isliye fetch stream use kiya hai.
+ * @param {function} onEvent - Called with (eventName, data) for every message.
+ * @returns {function} Call it to close the stream.
+ */
+export const subscribeToDashboard = (onEvent) => {
+  const controller = new AbortController();
+  let hasConnected = false;
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = localStorage.getItem('authToken');
+        const response = await fetch(`${API_URL}/staff/dashboard/stream`, {
+          headers: token ? { Authorization: `Bearer ${token}` } : {},
+          signal: controller.signal,
+        });
+        if (!response.ok || !response.body) throw new Error('Stream unavailable');
+
+        // Reconnect ke baad jo deltas miss hue unke liye poora grid refetch karein;
+        // pehle connect par nahi, kyunki page mount par grid khud fetch karta hai
+        if (hasConnected) onEvent('resync', {});
+        hasConnected = true;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const messages = buffer.split('\n\n');
+          buffer = messages.pop();
+          messages.forEach((message) => {
+            let eventName = 'message';
+            let data = '';
+            message.split('\n').forEach((line) => {
+              if (line.startsWith('event:')) eventName = line.slice(6).trim();
+              else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (data) onEvent(eventName, JSON.parse(data));
+          });
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
+
 /**
  * Starts a new game session for a specific table.
  * @param {object} sessionData - Contains table_id and initialPlayers.